@@ -123,76 +123,104 @@ class Projection(common.Projection):
                 for i in range(len(self._brian_synapses[i_group][j_group]))
                 )
 
-    def _partition(self, indices):
+    def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
+                            **connection_parameters):
+        presynaptic_indices = numpy.asarray(presynaptic_indices)
+        self._bulk_connect(presynaptic_indices,
+                           numpy.repeat(postsynaptic_index, presynaptic_indices.size),
+                           **connection_parameters)
+
+    def _group_indices(self, population, indices):
         """
-        partition indices, in case of Assemblies
+        Determine, for each of `indices`, which population of an Assembly it
+        belongs to, and its index within the Brian group of that population.
         """
-        if isinstance(self.pre, common.Assembly):
-            boundaries = numpy.cumsum([0] + [p.size for p in self.pre.populations])
-            assert indices.max() < boundaries[-1]
-            partitions = numpy.split(indices, numpy.searchsorted(indices, boundaries[1:-1])) - boundaries[:-1]
-            for i_group, local_indices in enumerate(partitions):
-                if isinstance(self.pre.populations[i_group], common.PopulationView):
-                    partitions[i_group] = self.pre.populations[i_group].index_in_grandparent(local_indices)
-        elif isinstance(self.pre, common.PopulationView):
-            partitions = [self.pre.index_in_grandparent(indices)]
+        indices = numpy.asarray(indices)
+        if isinstance(population, common.Assembly):
+            boundaries = numpy.cumsum([0] + [p.size for p in population.populations])
+            groups = numpy.searchsorted(boundaries, indices, side='right') - 1
+            group_indices = indices - boundaries[groups]
+            for group, p in enumerate(population.populations):
+                if isinstance(p, common.PopulationView):
+                    mask = groups == group
+                    group_indices[mask] = p.index_in_grandparent(group_indices[mask])
+        elif isinstance(population, common.PopulationView):
+            groups = numpy.zeros(indices.shape, dtype=int)
+            group_indices = population.index_in_grandparent(indices)
         else:
-            partitions = [indices]
-        return partitions
-    
-    def _localize_index(self, index):
-        """determine which group the postsynaptic index belongs to """
-        if isinstance(self.post, common.Assembly):
-            boundaries = numpy.cumsum([0] + [p.size for p in self.post.populations])
-            j = numpy.searchsorted(boundaries, index, side='right') - 1
-            local_index = index - boundaries[j]
-            if isinstance(self.post.populations[j], common.PopulationView):
-                return j, self.post.populations[j].index_in_grandparent(local_index)
-            else:
-                return j, local_index
-        elif isinstance(self.post, common.PopulationView):
-            return 0, self.post.index_in_grandparent(index)
+            groups = numpy.zeros(indices.shape, dtype=int)
+            group_indices = indices
+        return groups, group_indices
+
+    def _ungroup_indices(self, population, group, group_indices):
+        """
+        Inverse of `_group_indices()`: return the indices within `population`
+        of the neurons with indices `group_indices` in the Brian group of
+        the `group`th population.
+        """
+        if isinstance(population, common.Assembly):
+            offset = sum(p.size for p in population.populations[:group])
+            population = population.populations[group]
         else:
-            return 0, index
+            offset = 0
+        if isinstance(population, common.PopulationView):
+            grandparent_indices = population.index_in_grandparent(numpy.arange(population.size))
+            order = numpy.argsort(grandparent_indices)
+            group_indices = order[numpy.searchsorted(grandparent_indices, group_indices, sorter=order)]
+        return offset + numpy.asarray(group_indices, dtype=int)
 
-    def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
-                            **connection_parameters):
+    def _round_delays(self, delays):
+        scale = self._simulator.state.dt * ms
+        value = delays / scale        # ensure delays are rounded to the
+        return numpy.round(value) * scale  # nearest time step, rather than truncated
+
+    def _bulk_connect(self, presynaptic_indices, postsynaptic_indices,
+                      **connection_parameters):
         connection_parameters.pop("dendritic_delay_fraction", None)  # TODO: need to to handle this
-        presynaptic_index_partitions = self._partition(presynaptic_indices)
-        j_group, j = self._localize_index(postsynaptic_index)
-        # specify which connections exist
-        for i_group, i in enumerate(presynaptic_index_partitions):
-            if i.size > 0:
-                self._brian_synapses[i_group][j_group][i, j] = True
-                self._n_connections += i.size
-        # set connection parameters
-        for name, value in chain(connection_parameters.items(),
-                                 self.synapse_type.initial_conditions.items()):
-            if name == 'delay':
-                scale = self._simulator.state.dt * ms
-                value /= scale                         # ensure delays are rounded to the
-                value = numpy.round(value) * scale     # nearest time step, rather than truncated
-            for i_group, i in enumerate(presynaptic_index_partitions):
-                if i.size > 0:
-                    brian_var = getattr(self._brian_synapses[i_group][j_group], name)
-                    if is_listlike(value):
-                        for ii, v in zip(i, value):
-                            brian_var[ii, j] = v
-                    else:
-                        for ii in i:
-                            brian_var[ii, j] = value
-                    ##brian_var[i, j] = value  # doesn't work with multiple connections between a given neuron pair. Need to understand the internals of Synapses and SynapticVariable better
+        if 'delay' in connection_parameters:
+            connection_parameters['delay'] = self._round_delays(connection_parameters['delay'])
+        i_groups, i = self._group_indices(self.pre, presynaptic_indices)
+        j_groups, j = self._group_indices(self.post, postsynaptic_indices)
+        for i_group in numpy.unique(i_groups):
+            for j_group in numpy.unique(j_groups):
+                mask = (i_groups == i_group) & (j_groups == j_group)
+                if mask.any():
+                    syn_obj = self._brian_synapses[i_group][j_group]
+                    # new synapses are appended, so we can address them
+                    # directly by synapse index
+                    n_before = len(syn_obj)
+                    syn_obj.create_synapses(i[mask], j[mask])
+                    new_synapses = numpy.arange(n_before, len(syn_obj))
+                    self._n_connections += new_synapses.size
+                    for name, value in chain(connection_parameters.items(),
+                                             self.synapse_type.initial_conditions.items()):
+                        if is_listlike(value):
+                            value = numpy.asarray(value)[mask]
+                        getattr(syn_obj, name)[new_synapses] = value
 
     def _set_attributes(self, connection_parameters):
-        if isinstance(self.post, common.Assembly) or isinstance(self.pre, common.Assembly):
-            raise NotImplementedError
-        syn_obj = self._brian_synapses[0][0]
-        connection_parameters.evaluate()  # inefficient: would be better to evaluate using mask
+        groups = [(i_group, j_group, syn_obj)
+                  for i_group in sorted(self._brian_synapses)
+                  for j_group, syn_obj in sorted(self._brian_synapses[i_group].items())
+                  if len(syn_obj) > 0]
+        if not groups:
+            return
+        # evaluate the parameters only at the (i, j) coordinates of existing synapses
+        i = numpy.hstack([self._ungroup_indices(self.pre, i_group, syn_obj.presynaptic[:])
+                          for i_group, j_group, syn_obj in groups])
+        j = numpy.hstack([self._ungroup_indices(self.post, j_group, syn_obj.postsynaptic[:])
+                          for i_group, j_group, syn_obj in groups])
+        connection_parameters.evaluate(mask=(i, j))
+        boundaries = numpy.cumsum([0] + [len(syn_obj) for i_group, j_group, syn_obj in groups])
         for name, value in connection_parameters.items():
-            value = value.T
-            filtered_value = value[syn_obj.postsynaptic, syn_obj.presynaptic]
-            setattr(syn_obj, name, filtered_value)
-    
+            if name == 'delay':
+                value = self._round_delays(value)
+            for (i_group, j_group, syn_obj), start, stop in zip(groups, boundaries[:-1], boundaries[1:]):
+                if is_listlike(value):
+                    getattr(syn_obj, name)[numpy.arange(stop - start)] = value[start:stop]
+                else:
+                    getattr(syn_obj, name)[numpy.arange(stop - start)] = value
+
     def _get_attributes_as_arrays(self, *attribute_names):
         if isinstance(self.post, common.Assembly) or isinstance(self.pre, common.Assembly):
             raise NotImplementedError
@@ -208,15 +236,15 @@ class Projection(common.Projection):
         # todo: implement parameter translation
         return values  # should put NaN where there is no connection?
 
-    def _get_attributes_as_list(self, *attribute_names):
+    def _get_attributes_as_columns(self, *attribute_names):
         if isinstance(self.post, common.Assembly) or isinstance(self.pre, common.Assembly):
             raise NotImplementedError
         values = []
         for name in attribute_names:
             if name == "presynaptic_index":
-                value = self._brian_synapses[0][0].presynaptic
+                value = self._ungroup_indices(self.pre, 0, self._brian_synapses[0][0].presynaptic[:])
             elif name == "postsynaptic_index":
-                value = self._brian_synapses[0][0].postsynaptic
+                value = self._ungroup_indices(self.post, 0, self._brian_synapses[0][0].postsynaptic[:])
             else:
                 data_obj = getattr(self._brian_synapses[0][0], name).data
                 if hasattr(data_obj, "tolist"):
@@ -229,8 +257,11 @@ class Projection(common.Projection):
                 ps.evaluate()
                 value = ps[name]
             #value = value.tolist()
-            values.append(value)
-        a = numpy.array(values)
+            values.append(numpy.asarray(value))
+        return values
+
+    def _get_attributes_as_list(self, *attribute_names):
+        a = numpy.array(self._get_attributes_as_columns(*attribute_names))
         return [tuple(x) for x in a.T]
 
     def _set_tau_syn_for_tsodyks_markram(self):
@@ -72,6 +72,10 @@ def build_run(simulator):
         now = simulator.state.t
         if time_point - now < -simulator.state.dt / 2.0:  # allow for floating point error
             raise ValueError("Time %g is in the past (current time %g)" % (time_point, now))
+        # recorders which stream data to disk need to be flushed periodically
+        callbacks = list(callbacks or []) + [recorder.flush_callback
+                                             for recorder in simulator.state.recorders
+                                             if recorder.stream_to is not None]
         if callbacks:
             callback_events = [(callback(simulator.state.t), callback)
                                for callback in callbacks]
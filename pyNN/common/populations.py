@@ -406,7 +406,8 @@ class BasePopulation(object):
         """Determine whether `variable` can be recorded from this population."""
         return self.celltype.can_record(variable)
 
-    def record(self, variables, to_file=None, sampling_interval=None):
+    def record(self, variables, to_file=None, sampling_interval=None,
+               stream_to=None, flush_interval=1000.0):
         """
         Record the specified variable or variables for all cells in the
         Population or view.
@@ -420,6 +421,14 @@ class BasePopulation(object):
         
         `sampling_interval` should be a value in milliseconds, and an integer
         multiple of the simulation timestep.
+
+        If `stream_to` is given, as a filename, the recorded data are not kept
+        in memory until they are retrieved, but are written to this file
+        every `flush_interval` ms of simulated time during the simulation, and
+        then cleared from the simulator, so that long simulations can be
+        recorded in bounded memory. `get_data()` and `write_data()` read the
+        data back from the file. With more than one MPI process, each process
+        writes to its own file, with the MPI rank appended to the filename.
         """
         if variables is None:  # reset the list of things to record
                               # note that if record(None) is called on a view of a population
@@ -433,6 +442,8 @@ class BasePopulation(object):
                 self.recorder.record(variables, self._record_filter, sampling_interval)
         if isinstance(to_file, basestring):
             self.recorder.file = to_file
+        if stream_to is not None:
+            self.recorder.stream(stream_to, flush_interval)
 
     @deprecated("record('v')")
     def record_v(self, to_file=True):
@@ -475,7 +486,7 @@ class BasePopulation(object):
         self.recorder.write(variables, io, gather, self._record_filter, clear=clear,
                             annotations=annotations)
 
-    def get_data(self, variables='all', gather=True, clear=False):
+    def get_data(self, variables='all', gather=True, clear=False, format='neo'):
         """
         Return a Neo `Block` containing the data (spikes, state variables)
         recorded from the Population.
@@ -490,7 +501,19 @@ class BasePopulation(object):
         simulated on the local node.
 
         If `clear` is True, recorded data will be deleted from the `Population`.
-        """
+
+        If `format` is 'arrays', the data are instead returned as plain NumPy
+        arrays, which avoids the cost of creating Neo objects for large
+        recordings: a list with one dict per segment, in which the spikes are
+        given by arrays of neuron indices and spike times, sorted by index,
+        and each other variable by an array of sample times and a 2D array of
+        values, with one column per neuron (see
+        :meth:`~pyNN.recording.Recorder.get_arrays`).
+        """
+        if format == 'arrays':
+            return self.recorder.get_arrays(variables, gather, self._record_filter, clear)
+        elif format != 'neo':
+            raise ValueError("format must be 'neo' or 'arrays'")
         return self.recorder.get(variables, gather, self._record_filter, clear)
 
     @deprecated("write_data(file, 'spikes')")
@@ -131,6 +131,38 @@ class Projection(object):
         for i in range(len(self)):
             yield self[i]
 
+    # --- Methods for creating connections ------------------------------------
+
+    def _bulk_connect(self, presynaptic_indices, postsynaptic_indices,
+                      **connection_parameters):
+        """
+        Connect the neurons with indices `presynaptic_indices[k]` and
+        `postsynaptic_indices[k]`, for all k.
+
+        Each connection parameter is either a single value, applying to all
+        connections, or an array with one value per connection.
+
+        This default implementation calls `_convergent_connect()` for each
+        run of connections with the same post-synaptic neuron. Backends should
+        override it where a more efficient implementation is possible.
+        """
+        presynaptic_indices = numpy.asarray(presynaptic_indices)
+        postsynaptic_indices = numpy.asarray(postsynaptic_indices)
+        if postsynaptic_indices.size == 0:
+            return
+        boundaries = numpy.hstack(([0],
+                                   numpy.flatnonzero(numpy.diff(postsynaptic_indices)) + 1,
+                                   [postsynaptic_indices.size]))
+        for start, stop in zip(boundaries[:-1], boundaries[1:]):
+            column_parameters = {}
+            for name, value in connection_parameters.items():
+                if isinstance(value, numpy.ndarray) and value.ndim > 0:
+                    value = value[start:stop]
+                column_parameters[name] = value
+            self._convergent_connect(presynaptic_indices[start:stop],
+                                     postsynaptic_indices[start],
+                                     **column_parameters)
+
     # --- Methods for setting connection parameters ---------------------------
 
     def set(self, **attributes):
@@ -172,9 +204,11 @@ class Projection(object):
 
     def _value_list_to_array(self, attributes):
         """Convert a list of connection parameters/attributes to a 2D array."""
-        connection_mask = ~numpy.isnan(self.get('weight', format='array', gather='all'))
+        connection_mask = None
         for name, value in attributes.items():
             if isinstance(value, list) or (isinstance(value, numpy.ndarray) and value.ndim == 1):
+                if connection_mask is None:  # only needed for list values, and expensive to obtain
+                    connection_mask = ~numpy.isnan(self.get('weight', format='array', gather='all'))
                 array_value = numpy.nan * numpy.ones(self.shape)
                 array_value[connection_mask] = value
                 attributes[name] = array_value
@@ -231,7 +265,7 @@ class Projection(object):
             name of the attributes whose values are wanted, or a list of such
             names.
         `format`:
-            "list" or "array".
+            "list", "array", "sparse" or "columns".
 
         With list format, returns a list of tuples. Each tuple contains the
         indices of the pre- and post-synaptic cell followed by the attribute
@@ -253,6 +287,17 @@ class Projection(object):
             >>> weights.shape
             TODO
 
+        With "sparse" format, returns a tuple of :mod:`scipy.sparse` matrices
+        in CSR format, one for each name in `attribute_names`, with the same
+        shape as in array format. Multiple connections between the same pair
+        of neurons are summed, and there are no entries for absent
+        connections. This format requires scipy, which is an optional
+        dependency.
+
+        With "columns" format, returns a dict of 1D NumPy arrays, with keys
+        "presynaptic_index", "postsynaptic_index" and the names in
+        `attribute_names`, each array containing one element per connection.
+
         TODO: document "with_address"
 
         Values will be expressed in the standard PyNN units (i.e. millivolts,
@@ -263,38 +308,51 @@ class Projection(object):
             return_single = True
         else:
             return_single = False
+        requested_names = list(attribute_names)
         if isinstance(self.synapse_type, StandardSynapseType):
             attribute_names = self.synapse_type.get_native_names(*attribute_names)
         if format == 'list':
             names = list(attribute_names)
             if with_address:
                 names = ["presynaptic_index", "postsynaptic_index"] + names
-            values = self._get_attributes_as_list(*names)
             if gather and self._simulator.state.num_processes > 1:
-                all_values = {self._simulator.state.mpi_rank: values}
-                all_values = recording.gather_dict(all_values, all=(gather == 'all'))
-                if gather == 'all' or self._simulator.state.mpi_rank == 0:
-                    values = reduce(operator.add, all_values.values())
+                # gather typed arrays rather than lists of tuples, and build
+                # the list only at the end
+                columns = recording.gather_columns(self._get_attributes_as_columns(*names),
+                                                   all=(gather == 'all'))
+                values = list(zip(*[column.tolist() for column in columns]))
+            else:
+                values = self._get_attributes_as_list(*names)
             if not with_address and return_single:
                 values = [val[0] for val in values]
             return values
-        elif format == 'array':
-            if gather and self._simulator.state.num_processes > 1:
-                # Node 0 is the only one creating a full connection matrix, and returning it (saving memory)
-                # Slaves nodes are returning list of connections, so this may be inconsistent...
-                names = list(attribute_names)
-                names = ["presynaptic_index", "postsynaptic_index"] + names
-                values = self._get_attributes_as_list(*names)
-                all_values = {self._simulator.state.mpi_rank: values}
-                all_values = recording.gather_dict(all_values, all=(gather == 'all'))
-                if gather == 'all' or self._simulator.state.mpi_rank == 0:
-                    tmp_values = reduce(operator.add, all_values.values())
-                    values = self._get_attributes_as_arrays(*attribute_names)
-                    tmp_values = numpy.array(tmp_values)
-                    for i in xrange(len(values)):
-                        values[i][tmp_values[:, 0].astype(int), tmp_values[:, 1].astype(int)] = tmp_values[:, 2 + i]
-            else:
+        elif format in ('array', 'sparse', 'columns'):
+            if format == 'array' and not (gather and self._simulator.state.num_processes > 1):
                 values = self._get_attributes_as_arrays(*attribute_names)
+            else:
+                columns = self._get_attributes_as_columns("presynaptic_index", "postsynaptic_index",
+                                                          *attribute_names)
+                if gather and self._simulator.state.num_processes > 1:
+                    # Only node 0 receives the connections from all nodes, unless gather is 'all'
+                    columns = recording.gather_columns(columns, all=(gather == 'all'))
+                if format == 'columns':
+                    names = requested_names
+                    if with_address:
+                        names = ["presynaptic_index", "postsynaptic_index"] + names
+                    else:
+                        columns = columns[2:]
+                    return dict(zip(names, columns))
+                elif format == 'sparse':
+                    try:
+                        from scipy.sparse import coo_matrix
+                    except ImportError:
+                        raise ImportError("format='sparse' requires scipy, which is an optional dependency of PyNN")
+                    # conversion to CSR sums the values of multiple connections
+                    values = [coo_matrix((column, (columns[0], columns[1])),
+                                         shape=(self.pre.size, self.post.size)).tocsr()
+                              for column in columns[2:]]
+                else:
+                    values = self._values_to_arrays(columns[0], columns[1], columns[2:])
             if return_single:
                 if gather == 'all' or self._simulator.state.mpi_rank == 0:
                     assert len(values) == 1, values
@@ -302,26 +360,50 @@ class Projection(object):
             else:
                 return values
         else:
-            raise Exception("format must be 'list' or 'array'")
+            raise Exception("format must be 'list', 'array', 'sparse' or 'columns'")
 
     def _get_attributes_as_list(self, *names):
         return [c.as_tuple(*names) for c in self.connections]
 
+    def _get_attributes_as_columns(self, *names):
+        """
+        Return a list containing a 1D array of values for each of the
+        attributes in `names`, with one element per local connection.
+        """
+        values = numpy.array(self._get_attributes_as_list(*names),
+                             dtype=float).reshape((-1, len(names)))
+        columns = list(values.T)
+        for i, name in enumerate(names):
+            if name in ("presynaptic_index", "postsynaptic_index"):
+                columns[i] = columns[i].astype(int)
+        return columns
+
     def _get_attributes_as_arrays(self, *names):
+        names = [name[:-1] if name in ("weights", "delays") else name  # weights --> weight, delays --> delay
+                 for name in names]
+        columns = self._get_attributes_as_columns("presynaptic_index", "postsynaptic_index", *names)
+        return self._values_to_arrays(columns[0], columns[1], columns[2:])
+
+    def _values_to_arrays(self, presynaptic_indices, postsynaptic_indices, columns):
+        """
+        Build a (pre.size, post.size) array for each of the 1D arrays in
+        `columns`, containing the values for the connections
+        (`presynaptic_indices[k]`, `postsynaptic_indices[k]`).
+
+        Elements for which no connection exists are NaN. Where there are
+        multiple connections between the same pair of neurons, the values are
+        summed (this is only appropriate for certain variables, e.g. weight,
+        not for delays).
+        """
+        address = (numpy.asarray(presynaptic_indices, dtype=int),
+                   numpy.asarray(postsynaptic_indices, dtype=int))
+        connected = numpy.zeros((self.pre.size, self.post.size), dtype=bool)
+        connected[address] = True
         all_values = []
-        for attribute_name in names:
-            values = numpy.nan * numpy.ones((self.pre.size, self.post.size))
-            if attribute_name[-1] == "s":  # weights --> weight, delays --> delay
-                attribute_name = attribute_name[:-1]
-            for c in self.connections:
-                value = getattr(c, attribute_name)
-                addr = (c.presynaptic_index, c.postsynaptic_index)
-                if numpy.isnan(values[addr]):
-                    values[addr] = value
-                else:
-                    values[addr] += value   # addition is only appropriate for certain variables
-                                            # e.g. weight. Not appropriate for delays.
-                                            # What about synaptic parameters, e.g. wmax?
+        for column in columns:
+            values = numpy.zeros((self.pre.size, self.post.size))
+            numpy.add.at(values, address, column)
+            values[~connected] = numpy.nan
             all_values.append(values)
         return all_values
 
@@ -344,9 +426,23 @@ class Projection(object):
 
         Values will be expressed in the standard PyNN units (i.e. millivolts,
         nanoamps, milliseconds, microsiemens, nanofarads, event per second).
+
+        With `format='binary'`, the connections are written in the compact
+        binary format of :class:`~pyNN.recording.files.BinaryConnectionFile`,
+        which can be read by :class:`FromFileConnector`. If `gather` is False,
+        each MPI node writes its own connections to the file `file.x`, where
+        `x` is the MPI rank. If `gather` is 'stream', each MPI node writes its
+        own connections directly into a single shared file, using MPI-IO, so
+        that the connections are never gathered onto a single node. In this
+        case, `file` must be a filename.
         """
         if attribute_names in ('all', 'connections'):
             attribute_names = self.synapse_type.get_parameter_names()
+        if isinstance(attribute_names, basestring):
+            attribute_names = [attribute_names]
+        if format == 'binary':
+            self._save_binary(attribute_names, file, gather)
+            return
         if isinstance(file, basestring):
             file = recording.files.StandardTextFile(file, mode='wb')
         all_values = self.get(attribute_names, format=format, gather=gather, with_address=with_address)
@@ -360,6 +456,29 @@ class Projection(object):
             file.write(all_values, metadata)
             file.close()
 
+    def _save_binary(self, attribute_names, file, gather):
+        if gather == 'stream' and self._simulator.state.num_processes > 1:
+            if not isinstance(file, basestring):
+                raise TypeError("With gather='stream', the file must be given as a filename")
+            columns = self.get(attribute_names, format='columns', gather=False)
+            names = ["presynaptic_index", "postsynaptic_index"] + list(attribute_names)
+            # all connections to a given post-synaptic neuron are on the same node
+            recording.files.BinaryConnectionFile.write_parallel(
+                file, [columns[name] for name in names],
+                {"columns": ["i", "j"] + list(attribute_names)},
+                n_targets=self.post.size)
+            return
+        distributed = not gather and self._simulator.state.num_processes > 1
+        if distributed or self._simulator.state.mpi_rank == 0:
+            if isinstance(file, basestring):
+                if distributed:
+                    file = "%s.%d" % (file, self._simulator.state.mpi_rank)
+                file = recording.files.BinaryConnectionFile(file, mode='wb')
+        all_values = self.get(attribute_names, format='list', gather=gather, with_address=True)
+        if distributed or self._simulator.state.mpi_rank == 0:
+            file.write(all_values, {"columns": ["i", "j"] + list(attribute_names)})
+            file.close()
+
     @deprecated("save('all', file, format='list', gather=gather)")
     def saveConnections(self, file, gather=True, compatible_output=True):
         self.save('all', file, format='list', gather=gather)
@@ -376,20 +495,68 @@ class Projection(object):
         """
         self.save('delay', file, format, gather)
 
-    @deprecated("numpy.histogram()")
+    def summarize(self, attribute_name, stats=('mean', 'std', 'min', 'max', 'hist'),
+                  bins=10, range=None, gather=True):
+        """
+        Return summary statistics of a synaptic attribute (weight, delay,
+        etc.) over all connections, as a dict with the names in `stats` as
+        keys. Possible statistics are 'count', 'mean', 'std', 'min', 'max'
+        and 'hist'. The value for 'hist' is a tuple (counts, bin_edges), as
+        returned by :func:`numpy.histogram`, with `bins` bins spanning
+        `range`, which defaults to the minimum and maximum values.
+
+        The statistics are calculated from partial results on each MPI node,
+        which are then combined, so that the attribute values themselves are
+        never gathered. If `gather` is False, only the local connections are
+        taken into account.
+
+        Values will be expressed in the standard PyNN units (i.e. millivolts,
+        nanoamps, milliseconds, microsiemens, nanofarads, event per second).
+        """
+        unknown = set(stats).difference(('count', 'mean', 'std', 'min', 'max', 'hist'))
+        if unknown:
+            raise ValueError("Unknown statistics: %s" % ", ".join(sorted(unknown)))
+        if isinstance(self.synapse_type, StandardSynapseType):
+            attribute_name, = self.synapse_type.get_native_names(attribute_name)
+        values, = self._get_attributes_as_columns(attribute_name)
+        if gather and self._simulator.state.num_processes > 1:
+            total, global_min, global_max = recording.mpi_sum, recording.mpi_min, recording.mpi_max
+        else:
+            total = global_min = global_max = lambda x: x
+        count = total(values.size)
+        mean = std = minimum = maximum = numpy.nan
+        if count > 0 and ('mean' in stats or 'std' in stats):
+            mean = total(values.sum()) / count
+            if 'std' in stats:
+                std = numpy.sqrt(total(((values - mean)**2).sum()) / count)
+        if count > 0 and ('min' in stats or 'max' in stats or ('hist' in stats and range is None)):
+            # nodes with no connections must not contribute to the extremes
+            minimum = global_min(values.min() if values.size > 0 else numpy.inf)
+            maximum = global_max(values.max() if values.size > 0 else -numpy.inf)
+            if range is None:
+                range = (minimum, maximum)
+        all_stats = {'count': count, 'mean': mean, 'std': std, 'min': minimum, 'max': maximum}
+        summary = dict((name, all_stats[name]) for name in stats if name != 'hist')
+        if 'hist' in stats:
+            counts, bin_edges = numpy.histogram(values, bins=bins, range=range)
+            summary['hist'] = (total(counts), bin_edges)
+        return summary
+
+    @deprecated("summarize('weight', stats=('hist',))")
     def weightHistogram(self, min=None, max=None, nbins=10):
         """
         Return a histogram of synaptic weights.
         If min and max are not given, the minimum and maximum weights are
         calculated automatically.
         """
-        weights = numpy.array(self.get('weight', format='list', gather=True, with_address=False))
-        if min is None:
-            min = weights.min()
-        if max is None:
-            max = weights.max()
-        bins = numpy.linspace(min, max, nbins + 1)
-        return numpy.histogram(weights, bins)  # returns n, bins
+        if min is None or max is None:
+            extremes = self.summarize('weight', stats=('min', 'max'))
+            if min is None:
+                min = extremes['min']
+            if max is None:
+                max = extremes['max']
+        return self.summarize('weight', stats=('hist',), bins=nbins,
+                              range=(min, max))['hist']  # returns n, bins
 
     def describe(self, template='projection_default.txt', engine='default'):
         """
@@ -11,7 +11,7 @@ for improved performance.
 from __future__ import division
 from pyNN.random import RandomDistribution, AbstractRNG, NumpyRNG, get_mpi_config
 from pyNN.core import IndexBasedExpression
-from pyNN import errors, descriptions
+from pyNN import errors, descriptions, recording
 from pyNN.recording import files
 from pyNN.parameters import LazyArray
 from pyNN.standardmodels import StandardSynapseType
@@ -25,7 +25,11 @@ try:
 except NameError:
     basestring = str
 from itertools import repeat
+import ast
+import hashlib
 import logging
+import multiprocessing
+import os
 from copy import copy, deepcopy
 
 from lazyarray import arccos, arcsin, arctan, arctan2, ceil, cos, cosh, exp, \
@@ -51,6 +55,423 @@ def _get_rng(rng):
         raise Exception("rng must be either None, or a subclass of pyNN.random.AbstractRNG")
 
 
+def _source_indices(source_mask, size):
+    """
+    Convert a source mask, which may be a single boolean, a boolean array or
+    an array of indices, to an array of indices.
+    """
+    if source_mask is True:
+        return numpy.arange(size, dtype=int)
+    elif source_mask is False:
+        return numpy.array([], dtype=int)
+    source_mask = numpy.asarray(source_mask)
+    if source_mask.dtype == bool:
+        return source_mask.nonzero()[0]
+    else:
+        return source_mask.astype(int, copy=False)
+
+
+def _as_array(value, size):
+    """Return `value` as a 1D array of length `size`."""
+    value = numpy.asarray(value)
+    if value.ndim == 0:
+        value = numpy.repeat(value, size)
+    return value
+
+
+def _is_random(map):
+    """Determine whether evaluating a `LazyArray` consumes random numbers."""
+    return (isinstance(map.base_value, RandomDistribution) or
+            any(isinstance(arg, LazyArray) and _is_random(arg) for f, arg in map.operations))
+
+
+def _positions(starts, sizes):
+    """
+    Return the positions of the elements of a set of contiguous blocks, given
+    the start position and size of each block.
+    """
+    sizes = numpy.asarray(sizes, dtype=int)
+    offsets = numpy.cumsum(sizes) - sizes
+    return numpy.repeat(starts - offsets, sizes) + numpy.arange(sizes.sum())
+
+
+def _cutoff_from_expression(d_expression):
+    """
+    Infer the distance beyond which the probability given by `d_expression`
+    is zero, for expressions such as "d<3" or "exp(-d)*(d<=3)", i.e. a
+    comparison of the form "d < r", possibly multiplied by other factors.
+    Return None if no such cutoff can be found.
+    """
+    if not isinstance(d_expression, basestring):
+        return None
+    try:
+        node = ast.parse(d_expression.strip(), mode='eval').body
+    except SyntaxError:
+        return None
+    factors = [node]
+    cutoffs = []
+    while factors:
+        node = factors.pop()
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+            factors.extend((node.left, node.right))
+        elif (isinstance(node, ast.Compare) and len(node.ops) == 1
+              and isinstance(node.left, ast.Name) and node.left.id == 'd'
+              and isinstance(node.ops[0], (ast.Lt, ast.LtE))):
+            try:
+                cutoffs.append(float(ast.literal_eval(node.comparators[0])))
+            except ValueError:
+                pass
+    if cutoffs:
+        return min(cutoffs)
+    else:
+        return None
+
+
+def _connect_from_list(projection, connections, column_names):
+    """
+    Create those connections in `connections`, an array with one row
+    `(pre_idx, post_idx, p1, p2, ..., pn)` per connection, whose post-synaptic
+    neurons exist on the local MPI node. `column_names` gives the names of the
+    synaptic parameters p1, p2, etc.
+    """
+    if numpy.any(connections[:, 0] >= projection.pre.size):
+        raise errors.ConnectionError("source index out of range")
+    if numpy.any(connections[:, 1] >= projection.post.size):
+        raise errors.ConnectionError("target index out of range")
+    connections = connections[projection.post._mask_local[connections[:, 1].astype(int)]]
+    if connections.shape[0] == 0:
+        return
+    # group the connections by target, keeping the order of the list for
+    # connections with the same target
+    connections = connections[numpy.argsort(connections[:, 1], kind='mergesort')]
+    logger.debug("connections (local, sorted by target) = \n%s", connections)
+    connection_parameters = deepcopy(projection.synapse_type.parameter_space)
+    connection_parameters.shape = (connections.shape[0],)
+    for col, name in enumerate(column_names, 2):
+        connection_parameters.update(**{name: connections[:, col]})
+    if isinstance(projection.synapse_type, StandardSynapseType):
+        connection_parameters = projection.synapse_type.translate(
+                                    connection_parameters)
+    connection_parameters.evaluate()
+    projection._bulk_connect(connections[:, 0].astype(int), connections[:, 1].astype(int),
+                             **connection_parameters)
+
+
+def _intervals(indices):
+    """
+    Return the runs of consecutive values in the sorted array `indices`, as a
+    list of `(first, last)` tuples.
+    """
+    breaks = numpy.nonzero(numpy.diff(indices) != 1)[0] + 1
+    firsts = numpy.hstack(([0], breaks)).astype(int)
+    lasts = numpy.hstack((breaks, [indices.size])).astype(int) - 1
+    return [(int(indices[first]), int(indices[last])) for first, last in zip(firsts, lasts)]
+
+
+class _ConnectionBlock(object):
+    """
+    Accumulates the pre- and post-synaptic indices (and optionally the
+    synaptic parameters) of connections, column by column, until they are
+    passed to the backend as a single block.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._sources = []
+        self._targets = []
+        self._local = []
+        self._parameters = []
+        self.size = 0
+
+    def append(self, sources, col, local, parameters=None):
+        self._sources.append(sources)
+        self._targets.append(numpy.repeat(col, sources.size))
+        self._local.append(numpy.repeat(bool(local), sources.size))
+        if parameters is not None:
+            self._parameters.append(parameters)
+        self.size += sources.size
+
+    def arrays(self):
+        return (numpy.concatenate(self._sources),
+                numpy.concatenate(self._targets),
+                numpy.concatenate(self._local))
+
+    def parameters(self):
+        """
+        Return the parameters of the local connections in the block, as
+        single values for homogeneous parameters, otherwise as arrays.
+        """
+        connection_parameters = {}
+        local = numpy.concatenate(self._local)
+        for name, value in self._parameters[0].items():
+            if numpy.isscalar(value):
+                connection_parameters[name] = value
+            else:
+                connection_parameters[name] = numpy.concatenate(
+                    [_as_array(p[name], l.size) for p, l in zip(self._parameters, self._local)])[local]
+        return connection_parameters
+
+
+#: the state shared with worker processes by `_evaluate_column_block()`. It is
+#: set before the worker processes are forked, so that it need not be pickled.
+_worker_state = {}
+
+
+def _evaluate_column_block(block_index):
+    """
+    Determine which connections exist for a block of post-synaptic neurons,
+    given the state in `_worker_state`.
+
+    Each block uses its own random number stream, derived from the seed and
+    the block index, so that the result does not depend on which process
+    evaluates which block.
+
+    Returns a list of arrays of pre-synaptic indices, one for each of the
+    selected post-synaptic neurons in the block.
+    """
+    state = _worker_state
+    n_pre, n_post = state["shape"]
+    start = block_index * state["block_size"]
+    stop = min(start + state["block_size"], n_post)
+    rng = numpy.random.RandomState([state["seed"], block_index])
+    connected = rng.uniform(size=(n_pre, stop - start)) < state["probability_map"][:, start:stop]
+    if state["allow_self_connections"] is not True:
+        i = numpy.arange(n_pre)[:, numpy.newaxis]
+        j = numpy.arange(start, stop)
+        if state["allow_self_connections"] == 'NoMutual':
+            connected &= i > j
+        else:
+            connected &= i != j
+    return [connected[:, k].nonzero()[0]
+            for k in range(stop - start) if state["columns"][start + k]]
+
+
+def _process_pool(n_workers):
+    """
+    Return a pool of `n_workers` forked processes, or None if `n_workers` is
+    1 or the platform does not support forking.
+    """
+    if n_workers <= 1:
+        return None
+    if hasattr(multiprocessing, "get_context"):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return None
+        return multiprocessing.get_context("fork").Pool(n_workers)
+    elif os.name == "posix":
+        return multiprocessing.Pool(n_workers)
+    else:
+        return None
+
+
+def _cache_key_component(value):
+    """
+    Return a string which uniquely describes `value`, for use in the key of a
+    `ConnectivityCache` entry, or None if this is not possible (e.g. for
+    arbitrary functions, or random number generators whose state is not
+    accessible).
+    """
+    if isinstance(value, numpy.ndarray):
+        digest = hashlib.sha1(numpy.ascontiguousarray(value).tobytes()).hexdigest()
+        return "array(%s, %s, %s)" % (value.dtype.str, value.shape, digest)
+    elif isinstance(value, NumpyRNG):
+        name, keys, pos, has_gauss, cached_gaussian = value.rng.get_state()
+        return "%s(%s, %s, %r, %r, %r)" % (value.__class__.__name__, value.parallel_safe,
+                                           _cache_key_component(keys), pos, has_gauss,
+                                           cached_gaussian)
+    elif isinstance(value, RandomDistribution):
+        rng = _cache_key_component(value.rng)
+        parameters = _cache_key_component(sorted(value.parameters.items()))
+        if rng is None or parameters is None:
+            return None
+        return "RandomDistribution(%s, %s, %s)" % (value.name, parameters, rng)
+    elif isinstance(value, LazyArray):
+        components = [_cache_key_component(value.base_value)]
+        for f, arg in value.operations:
+            if getattr(f, "__name__", "<lambda>") == "<lambda>":
+                return None
+            components.extend((f.__name__, _cache_key_component(arg)))
+        if None in components:
+            return None
+        return "LazyArray(%s)" % ", ".join(components)
+    elif isinstance(value, (list, tuple)):
+        components = [_cache_key_component(item) for item in value]
+        if None in components:
+            return None
+        return "(%s)" % ", ".join(components)
+    elif value is None or isinstance(value, (bool, int, float, basestring, numpy.number)):
+        return repr(value)
+    else:
+        return None
+
+
+class ConnectivityCache(object):
+    """
+    An on-disk cache of the connections created by connectors derived from
+    :class:`MapConnector`, for re-use when identical connectivity is
+    generated many times, e.g. in parameter sweeps.
+
+    The cache is keyed on the connector class and parameters, the state of
+    its random number generators, the sizes, positions and MPI distribution
+    of the pre- and post-synaptic populations and the projection's `Space`.
+    On a cache hit, the connections are read from a
+    :class:`~pyNN.recording.files.BinaryConnectionFile` and passed straight
+    to the backend, and the random number generators are left in the same
+    state as if the connections had been generated.
+
+    To use the cache for a given connector, set its `cache` attribute, or set
+    `MapConnector.cache` to use it for all connectors.
+
+    Arguments:
+        `directory`:
+            the directory in which to store the cached connections.
+        `max_size`:
+            the maximum total size in bytes of the files in the cache. When
+            this is exceeded, the least-recently used entries are removed.
+        `store_parameters`:
+            if True, the evaluated synaptic parameters (weights, delays, etc.)
+            are stored with the connections, and the synaptic parameters form
+            part of the key. Otherwise, only the connectivity is cached and
+            the synaptic parameters are evaluated again on a cache hit (random
+            parameter values will then differ from those in the original
+            projection).
+    """
+    suffix = ".conn"
+
+    def __init__(self, directory, max_size=1e9, store_parameters=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.store_parameters = store_parameters
+        if not os.path.exists(directory):
+            try:  # wrapping in try...except block for MPI
+                os.makedirs(directory)
+            except OSError:
+                pass  # we assume that the directory was already created by another MPI node
+
+    def _random_number_generators(self, connector, parameter_space):
+        rngs = connector._random_number_generators()
+        if self.store_parameters:
+            for name, map in parameter_space.items():
+                for larr in [map] + [arg for f, arg in map.operations if isinstance(arg, LazyArray)]:
+                    if isinstance(larr.base_value, RandomDistribution):
+                        rngs.append(larr.base_value.rng)
+        return rngs
+
+    def key(self, connector, projection, parameter_space):
+        """
+        Return the key of the cache entry for the connections created by
+        `connector` for `projection`, or None if these cannot be cached.
+        """
+        simulator_state = projection._simulator.state
+        components = [connector.__class__.__module__, connector.__class__.__name__,
+                      sorted(connector.get_parameters().items()),
+                      self._random_number_generators(connector, parameter_space),
+                      projection.pre.size, projection.post.size,
+                      projection.pre == projection.post,
+                      projection.pre.positions, projection.post.positions,
+                      sorted(vars(projection.space).items()),
+                      simulator_state.num_processes, simulator_state.mpi_rank,
+                      projection.post._mask_local, self.store_parameters]
+        if self.store_parameters:
+            components.append(sorted(parameter_space.items()))
+        description = _cache_key_component(components)
+        if description is None:
+            logger.debug("Connections created by %s cannot be cached", connector.__class__.__name__)
+            return None
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def replay(self, key, connector, projection, parameter_space):
+        """
+        If the cache contains an entry for `key`, create the connections it
+        contains and return True, otherwise return False.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return False
+        logger.debug("Using cached connections from %s", path)
+        file = files.BinaryConnectionFile(path, mode='rb')
+        metadata = file.get_metadata()
+        parameter_names = metadata["columns"][2:]
+        for chunk in file.read_chunks(connector.block_size):
+            sources = chunk[:, 0].astype(int)
+            targets = chunk[:, 1].astype(int)
+            if parameter_names:
+                connection_parameters = dict((name, chunk[:, k])
+                                             for k, name in enumerate(parameter_names, 2))
+            else:
+                connection_parameters = connector._evaluate_parameters(parameter_space,
+                                                                       sources, targets)
+            projection._bulk_connect(sources, targets, **connection_parameters)
+        file.close()
+        for rng, (keys, pos, has_gauss, cached_gaussian) in zip(
+                self._random_number_generators(connector, parameter_space),
+                metadata["rng_states"]):
+            rng.rng.set_state(("MT19937", numpy.array(keys, dtype=numpy.uint32), pos,
+                               has_gauss, cached_gaussian))
+        os.utime(path, None)  # record the use of the entry, for LRU eviction
+        projection._connectivity_cache_key = key
+        if connector.callback:
+            connector.callback(1.0)
+        return True
+
+    def store(self, key, connector, projection, parameter_space, blocks):
+        """
+        Store the connections contained in `blocks`, a list of
+        `(sources, targets, connection_parameters)` tuples, in the cache.
+        """
+        columns = [numpy.hstack([sources for sources, targets, parameters in blocks] + [[]]),
+                   numpy.hstack([targets for sources, targets, parameters in blocks] + [[]])]
+        parameter_names = []
+        if self.store_parameters and blocks:
+            parameter_names = sorted(blocks[0][2])
+            for name in parameter_names:
+                columns.append(numpy.hstack([_as_array(parameters[name], sources.size)
+                                             for sources, targets, parameters in blocks]))
+        rng_states = []
+        for rng in self._random_number_generators(connector, parameter_space):
+            name, keys, pos, has_gauss, cached_gaussian = rng.rng.get_state()
+            rng_states.append([keys.tolist(), pos, has_gauss, cached_gaussian])
+        file = files.BinaryConnectionFile(self._path(key), mode='wb')
+        file.write(numpy.column_stack(columns),
+                   {"columns": ["i", "j"] + parameter_names, "rng_states": rng_states})
+        projection._connectivity_cache_key = key
+        self._evict()
+
+    def _entries(self):
+        paths = [os.path.join(self.directory, filename)
+                 for filename in os.listdir(self.directory) if filename.endswith(self.suffix)]
+        return sorted(paths, key=os.path.getmtime)
+
+    def _evict(self):
+        """Remove the least-recently used entries until the cache is small enough."""
+        entries = self._entries()
+        total_size = sum(os.path.getsize(path) for path in entries)
+        for path in entries:
+            if total_size <= self.max_size:
+                break
+            total_size -= os.path.getsize(path)
+            os.remove(path)
+
+    def invalidate(self, projection=None):
+        """
+        Remove the entry used to create the connections of `projection` from
+        the cache or, if no projection is given, remove all entries.
+        """
+        if projection is None:
+            paths = self._entries()
+        elif hasattr(projection, "_connectivity_cache_key"):
+            paths = [self._path(projection._connectivity_cache_key)]
+        else:
+            paths = []
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
 class Connector(object):
     """
     Base class for connectors.
@@ -139,7 +560,74 @@ class MapConnector(Connector):
     Abstract base class for Connectors based on connection maps, where a map is a 2D lazy array
     containing either the (boolean) connectivity matrix (aka adjacency matrix, connection set mask, etc.)
     or the values of a synaptic connection parameter.
+
+    Connections are not created one post-synaptic neuron at a time, but are
+    accumulated into blocks of (pre, post, parameters) arrays of up to
+    `block_size` connections, each of which is passed to the backend in a
+    single call to `Projection._bulk_connect()`.
+
+    If `cache` is a :class:`ConnectivityCache`, previously-generated
+    connections are taken from the cache, where possible.
+
+    Connectors that connect with a probability map may use a pool of
+    `n_workers` processes to evaluate it (see `_connect_with_probability_map()`).
     """
+    block_size = 100000
+    cache = None
+    n_workers = None
+
+    def _random_number_generators(self):
+        """
+        Return a list of the RNGs from which the connector itself draws while
+        generating the connection map.
+        """
+        if hasattr(self, "rng"):
+            return [self.rng]
+        else:
+            return []
+
+    def _requires_interleaved_evaluation(self, parameter_space):
+        """
+        Determine whether the synaptic parameters must be evaluated one
+        post-synaptic neuron at a time, interleaved with the generation of the
+        connection map.
+
+        This is the case when two or more of the connection map and the
+        parameters draw from the same RNG, since evaluating them in blocks
+        would then change the sequence of random numbers each one receives.
+        """
+        rngs = self._random_number_generators()
+        for name, map in parameter_space.items():
+            for larr in [map] + [arg for f, arg in map.operations if isinstance(arg, LazyArray)]:
+                if isinstance(larr.base_value, RandomDistribution):
+                    rngs.append(larr.base_value.rng)
+        return len(set(id(rng) for rng in rngs)) < len(rngs)
+
+    def _evaluate_parameters(self, parameter_space, sources, targets, local=None):
+        """
+        Evaluate the synaptic parameters for the connections `(sources[k], targets[k])`.
+
+        Homogeneous parameters are returned as single values, all others as
+        arrays containing one value per connection, restricted to the
+        connections for which `local` is True, if given. Parameters containing
+        random numbers are always evaluated for all connections, so that the
+        same random numbers are used for a given connection whatever the
+        number of MPI processes.
+        """
+        connection_parameters = {}
+        for name, map in parameter_space.items():
+            if map.is_homogeneous:
+                connection_parameters[name] = map.evaluate(simplify=True)
+            elif local is None:
+                connection_parameters[name] = _as_array(map[sources, targets], sources.size)
+            elif _is_random(map):
+                connection_parameters[name] = _as_array(map[sources, targets], sources.size)[local]
+            elif local.any():
+                connection_parameters[name] = _as_array(map[sources[local], targets[local]],
+                                                        local.sum())
+            else:
+                connection_parameters[name] = numpy.array([])
+        return connection_parameters
 
     def _standard_connect(self, projection, connection_map_generator, distance_map=None):
         """
@@ -158,9 +646,20 @@ class MapConnector(Connector):
         The `mask` argument, a boolean array, can be used to limit processing to just
         neurons which exist on the local MPI node.
 
-        todo: explain the argument `distance_map`.
+        `distance_map`, if given, is a `LazyArray` containing the distances
+        between pre- and post-synaptic neurons, which is re-used to evaluate
+        any synaptic parameters given as functions of distance.
         """
 
+        parameter_space = self._parameters_from_synapse_type(projection, distance_map)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(self, projection, parameter_space)
+            if cache_key is not None and self.cache.replay(cache_key, self, projection,
+                                                           parameter_space):
+                return
+        cached_blocks = []
+
         column_indices = numpy.arange(projection.post.size)
 
         if (projection.synapse_type.native_parameters.parallel_safe
@@ -182,54 +681,61 @@ class MapConnector(Connector):
                 repeat(True),
                 connection_map_generator(mask))
 
-        parameter_space = self._parameters_from_synapse_type(projection, distance_map)
+        interleaved = self._requires_interleaved_evaluation(parameter_space)
+
+        block = _ConnectionBlock()
+        n_local_columns = 0
+
+        def connect_block():
+            sources, targets, local = block.arrays()
+            if interleaved:
+                connection_parameters = block.parameters()
+            else:
+                connection_parameters = self._evaluate_parameters(parameter_space, sources,
+                                                                  targets, local)
+
+#           # Check that parameter values are valid
+#           if self.safe:
+#               # (might be cheaper to do the weight and delay check before evaluating the larray)
+#               weights = check_weights(weights, projection.synapse_type, is_conductance(projection.post.local_cells[0]))
+#               delays = check_delays(delays,
+#                                     projection._simulator.state.min_delay,
+#                                     projection._simulator.state.max_delay)
+#               # TODO: add checks for plasticity parameters
+
+            if local.any():
+                projection._bulk_connect(sources[local], targets[local], **connection_parameters)
+                if cache_key is not None:
+                    cached_blocks.append((sources[local], targets[local], connection_parameters))
+            block.clear()
+            if self.callback:
+                self.callback(n_local_columns / projection.post.local_size)
 
         # Loop over columns of the connection_map array (equivalent to looping over post-synaptic neurons)
-        for count, (col, local, source_mask) in enumerate(izip(*components)):
+        for col, local, source_mask in izip(*components):
             # `col`: index of the post-synaptic neuron
             # `local`: boolean - does the post-synaptic neuron exist on this MPI node
             # `source_mask` - boolean numpy array, indicating which of the pre-synaptic neurons should be connected to,
             #                 or a single boolean, meaning connect to all/none of the pre-synaptic neurons
             #                 It can also be an array of addresses
-            _proceed = False 
-            if source_mask is True or source_mask.any():
-                _proceed = True
-            elif type(source_mask) == numpy.ndarray:
-                if source_mask.dtype == bool:
-                    if source_mask.any():
-                        _proceed = True
-                elif len(source_mask) > 0:
-                    _proceed = True
-            if _proceed:
-                # Convert from boolean to integer mask, if necessary
-                if source_mask is True:
-                    source_mask = numpy.arange(projection.pre.size, dtype=int)
-                elif source_mask.dtype == bool:
-                    source_mask = source_mask.nonzero()[0]
-            
-                # Evaluate the lazy arrays containing the synaptic parameters
-                connection_parameters = {}
-                for name, map in parameter_space.items():
-                    if map.is_homogeneous:
-                        connection_parameters[name] = map.evaluate(simplify=True)
-                    else:
-                        connection_parameters[name] = map[source_mask, col]
-
-#                # Check that parameter values are valid
-#                if self.safe:
-#                    # (might be cheaper to do the weight and delay check before evaluating the larray)
-#                    weights = check_weights(weights, projection.synapse_type, is_conductance(projection.post.local_cells[0]))
-#                    delays = check_delays(delays,
-#                                          projection._simulator.state.min_delay,
-#                                          projection._simulator.state.max_delay)
-#                    # TODO: add checks for plasticity parameters
-
-                if local:
-                    # Connect the neurons
-                    #logger.debug("Connecting to %d from %s" % (col, source_mask))
-                    projection._convergent_connect(source_mask, col, **connection_parameters)
-                    if self.callback:
-                        self.callback(count / projection.post.local_size)
+            source_mask = _source_indices(source_mask, projection.pre.size)
+            if local:
+                n_local_columns += 1
+            if source_mask.size > 0:
+                if interleaved:
+                    # Evaluate the lazy arrays containing the synaptic parameters column by column
+                    connection_parameters = self._evaluate_parameters(
+                                                parameter_space, source_mask,
+                                                numpy.repeat(col, source_mask.size))
+                else:
+                    connection_parameters = None
+                block.append(source_mask, col, local, connection_parameters)
+                if block.size >= self.block_size:
+                    connect_block()
+        if block.size > 0:
+            connect_block()
+        if cache_key is not None:
+            self.cache.store(cache_key, self, projection, parameter_space, cached_blocks)
 
     def _connect_with_map(self, projection, connection_map, distance_map=None):
         """
@@ -247,6 +753,67 @@ class MapConnector(Connector):
         logger.debug("Connecting %s using a connection map" % projection.label)
         self._standard_connect(projection, connection_map.by_column, distance_map)
 
+    def _connect_with_probability_map(self, projection, probability_map, distance_map=None):
+        """
+        Create connections with the probabilities given by a probability map,
+        drawing random numbers from `self.rng` and taking account of
+        `self.allow_self_connections`.
+
+        If `self.n_workers` is not None, the connection map is evaluated in
+        blocks of post-synaptic neurons by a pool of `n_workers` processes.
+        Each block draws from its own random number stream, derived from a
+        seed drawn from `self.rng`, so the connections do not depend on the
+        number of workers (but are not the same as with `n_workers=None`).
+        """
+        if projection.pre == projection.post:
+            allow_self_connections = self.allow_self_connections
+        else:
+            allow_self_connections = True
+        if self.n_workers is None:
+            random_map = LazyArray(RandomDistribution('uniform', (0, 1), rng=self.rng),
+                                   projection.shape)
+            connection_map = random_map < probability_map
+            if not allow_self_connections:
+                connection_map *= LazyArray(lambda i, j: i != j, shape=projection.shape)
+            elif allow_self_connections == 'NoMutual':
+                connection_map *= LazyArray(lambda i, j: i > j, shape=projection.shape)
+            self._connect_with_map(projection, connection_map, distance_map)
+            return
+
+        seed = int(self.rng.next(1, 'uniform_int', {"low": 0, "high": 2**31 - 1},
+                                 mask_local=False)[0])
+        n_pre, n_post = projection.shape
+        block_size = max(1, 10 * self.block_size // n_pre)
+        if not isinstance(probability_map, LazyArray):
+            # e.g. a constant probability, for an expression which does not depend on d
+            probability_map = LazyArray(probability_map, shape=projection.shape)
+
+        def build_source_masks(mask=None):
+            if mask is None:
+                columns = numpy.ones((n_post,), dtype=bool)
+            else:
+                columns = numpy.asarray(mask, dtype=bool)
+            blocks = [b for b in range(-(-n_post // block_size))
+                      if columns[b * block_size:(b + 1) * block_size].any()]
+            _worker_state.update(shape=(n_pre, n_post), block_size=block_size, seed=seed,
+                                 probability_map=probability_map, columns=columns,
+                                 allow_self_connections=allow_self_connections)
+            pool = _process_pool(self.n_workers)
+            try:
+                if pool is None:
+                    results = (_evaluate_column_block(b) for b in blocks)
+                else:
+                    results = pool.imap(_evaluate_column_block, blocks)
+                for block_sources in results:
+                    for sources in block_sources:
+                        yield sources
+            finally:
+                if pool is not None:
+                    pool.terminate()
+                    pool.join()
+                _worker_state.clear()
+        self._standard_connect(projection, build_source_masks, distance_map)
+
 
 class AllToAllConnector(MapConnector):
     """
@@ -341,11 +908,28 @@ class DistanceDependentProbabilityConnector(MapConnector):
             or only to other neurons in the Population.
         `rng`:
             an :class:`RNG` instance used to evaluate whether connections exist
+        `cutoff`:
+            the distance beyond which the connection probability is zero, or
+            "auto" to infer it, where possible, from expressions such as
+            "d<3" or "exp(-d)*(d<3)". With a cutoff, only pairs of cells
+            closer than the cutoff are considered, which is much faster than
+            evaluating the full distance matrix for large, sparsely-connected
+            populations, but the random numbers are drawn in a different
+            order, so the connections differ from those created without a
+            cutoff, for the same random seed.
+        `n_workers`:
+            if given, the number of processes used to evaluate the connection
+            probabilities when there is no cutoff. The connections do not
+            depend on the number of processes, but differ from those created
+            with `n_workers=None`.
     """
-    parameter_names = ('allow_self_connections', 'd_expression')
+    parameter_names = ('allow_self_connections', 'd_expression', 'cutoff')
+    #: approximate number of post-synaptic cells for which candidate pairs
+    #: are found at one time when using a cutoff.
+    cutoff_block_size = 1000
 
     def __init__(self, d_expression, allow_self_connections=True,
-                 rng=None, safe=True, callback=None):
+                 rng=None, safe=True, callback=None, cutoff=None, n_workers=None):
         """
         Create a new connector.
         """
@@ -362,19 +946,54 @@ class DistanceDependentProbabilityConnector(MapConnector):
         self.allow_self_connections = allow_self_connections
         self.distance_function = eval("lambda d: %s" % self.d_expression)
         self.rng = _get_rng(rng)
+        if cutoff == 'auto':
+            cutoff = _cutoff_from_expression(d_expression)
+        self.cutoff = cutoff
+        self.n_workers = n_workers
 
     def connect(self, projection):
+        if self.cutoff is not None:
+            self._connect_within_cutoff(projection)
+            return
         distance_map = self._generate_distance_map(projection)
         probability_map = self.distance_function(distance_map)
-        random_map = LazyArray(RandomDistribution('uniform', (0, 1), rng=self.rng),
-                               projection.shape)
-        connection_map = random_map < probability_map
-        if projection.pre == projection.post:
-            if not self.allow_self_connections:
-                connection_map *= LazyArray(lambda i, j: i != j, shape=projection.shape)
-            elif self.allow_self_connections == 'NoMutual':
-                connection_map *= LazyArray(lambda i, j: i > j, shape=projection.shape)
-        self._connect_with_map(projection, connection_map, distance_map)
+        self._connect_with_probability_map(projection, probability_map, distance_map)
+
+    def _connect_within_cutoff(self, projection):
+        """
+        Connect using a spatial index to enumerate only those pairs of cells
+        which are within `self.cutoff` of one another.
+        """
+        pre_positions = projection.pre.positions.T
+        post_positions = projection.post.positions.T
+        same_population = projection.pre == projection.post
+
+        def build_source_masks(mask=None):
+            columns = numpy.arange(projection.post.size)
+            if mask is not None:
+                columns = columns[mask]
+            pairs = projection.space.pairs_within_distance(pre_positions,
+                                                           post_positions[columns],
+                                                           self.cutoff,
+                                                           block_size=self.cutoff_block_size)
+            # the pairs are produced in consecutive blocks of columns, sorted by column
+            for block_start, (i, j, d) in izip(range(0, columns.size, self.cutoff_block_size), pairs):
+                block_columns = columns[block_start:block_start + self.cutoff_block_size]
+                random_values = self.rng.next(d.size, 'uniform', {'low': 0.0, 'high': 1.0},
+                                              mask_local=False)
+                connected = random_values < _as_array(self.distance_function(d), d.size)
+                j = columns[j]
+                if same_population:
+                    if not self.allow_self_connections:
+                        connected &= i != j
+                    elif self.allow_self_connections == 'NoMutual':
+                        connected &= i > j
+                i, j = i[connected], j[connected]
+                indptr = numpy.searchsorted(j, numpy.append(block_columns, projection.post.size))
+                for k in range(block_columns.size):
+                    yield i[indptr[k]:indptr[k + 1]]
+        self._standard_connect(projection, build_source_masks,
+                               self._generate_distance_map(projection))
 
 
 class IndexBasedProbabilityConnector(MapConnector):
@@ -394,11 +1013,15 @@ class IndexBasedProbabilityConnector(MapConnector):
             or only to other neurons in the Population.
         `rng`:
             an :class:`RNG` instance used to evaluate whether connections exist
+        `n_workers`:
+            if given, the number of processes used to evaluate the connection
+            probabilities. The connections do not depend on the number of
+            processes, but differ from those created with `n_workers=None`.
     """
     parameter_names = ('allow_self_connections', 'index_expression')
 
     def __init__(self, index_expression, allow_self_connections=True,
-                 rng=None, safe=True, callback=None):
+                 rng=None, safe=True, callback=None, n_workers=None):
         """
         Create a new connector.
         """
@@ -409,6 +1032,7 @@ class IndexBasedProbabilityConnector(MapConnector):
         self.index_expression = index_expression
         self.allow_self_connections = allow_self_connections
         self.rng = _get_rng(rng)
+        self.n_workers = n_workers
 
     def connect(self, projection):
         # The index function is copied so as to avoid the connector being altered by the "connect"
@@ -416,15 +1040,7 @@ class IndexBasedProbabilityConnector(MapConnector):
         index_expression = copy(self.index_expression)
         index_expression.projection = projection
         probability_map = LazyArray(index_expression, projection.shape)
-        random_map = LazyArray(RandomDistribution('uniform', (0, 1), rng=self.rng),
-                               projection.shape)
-        connection_map = random_map < probability_map
-        if projection.pre == projection.post:
-            if not self.allow_self_connections:
-                connection_map *= LazyArray(lambda i, j: i != j, shape=projection.shape)
-            elif self.allow_self_connections == 'NoMutual':
-                connection_map *= LazyArray(lambda i, j: i > j, shape=projection.shape)
-        self._connect_with_map(projection, connection_map)
+        self._connect_with_probability_map(projection, probability_map)
 
 
 class DisplacementDependentProbabilityConnector(IndexBasedProbabilityConnector):
@@ -447,10 +1063,11 @@ class DisplacementDependentProbabilityConnector(IndexBasedProbabilityConnector):
             return self._disp_function(disp)
 
     def __init__(self, disp_function, allow_self_connections=True,
-                 rng=None, safe=True, callback=None):
+                 rng=None, safe=True, callback=None, n_workers=None):
         super(DisplacementDependentProbabilityConnector, self).__init__(
                 self.DisplacementExpression(disp_function),
-                allow_self_connections=allow_self_connections, rng=rng, callback=callback)
+                allow_self_connections=allow_self_connections, rng=rng, callback=callback,
+                n_workers=n_workers)
 
 
 class FromListConnector(Connector):
@@ -464,7 +1081,11 @@ class FromListConnector(Connector):
             (i.e. order in the Population, not the ID) of the presynaptic
             neuron, `post_idx` is the index of the postsynaptic neuron, and
             p1, p2, etc. are the synaptic parameters (e.g. weight, delay,
-            plasticity parameters).
+            plasticity parameters). This may also be a two-dimensional
+            array-like object which supports slicing, such as a memory-mapped
+            NumPy array (e.g. from `numpy.load(filename, mmap_mode='r')`) or
+            an HDF5 dataset, in which case it is read in chunks of
+            `chunk_size` rows, without loading the whole list into memory.
         `column_names`:
             the names of the parameters p1, p2, etc. If not provided, it is
             assumed the parameters are 'weight', 'delay' (for backwards
@@ -476,13 +1097,18 @@ class FromListConnector(Connector):
             if True, display a progress bar on the terminal.
     """
     parameter_names = ('conn_list',)
+    #: number of connections read, filtered and created at one time.
+    chunk_size = 1000000
 
     def __init__(self, conn_list, column_names=None, safe=True, callback=None):
         """
         Create a new connector.
         """
         Connector.__init__(self, safe=safe, callback=callback)
-        self.conn_list = numpy.array(conn_list)
+        if hasattr(conn_list, "shape") and hasattr(conn_list, "__getitem__"):
+            self.conn_list = conn_list  # array-like: avoid copying/loading it
+        else:
+            self.conn_list = numpy.array(conn_list)
         if len(conn_list) > 0:
             n_columns = self.conn_list.shape[1]
         if column_names is None:
@@ -498,56 +1124,45 @@ class FromListConnector(Connector):
                 raise ValueError("connection list has %d parameter columns, but %d column names provided." % (
                                  n_columns - 2, len(self.column_names)))
 
+    def _read_chunks(self, projection):
+        """
+        Return an iterator over the connection list, in chunks of at most
+        `chunk_size` rows, together with the fraction of the list read so far
+        (or None, if this is not known).
+        """
+        n_connections = len(self.conn_list)
+        for start in range(0, n_connections, self.chunk_size):
+            stop = min(start + self.chunk_size, n_connections)
+            yield numpy.asarray(self.conn_list[start:stop]), stop / float(n_connections)
+
     def connect(self, projection):
         """Connect-up a Projection."""
-        logger.debug("conn_list (original) = \n%s", self.conn_list)
         synapse_parameter_names = projection.synapse_type.get_parameter_names()
         for name in self.column_names:
             if name not in synapse_parameter_names:
                 raise ValueError("%s is not a valid parameter for %s" % (
                                  name, projection.synapse_type.__class__.__name__))
-        if numpy.any(self.conn_list[:, 0] >= projection.pre.size):
-            raise errors.ConnectionError("source index out of range")
-        # need to do some profiling, to figure out the best way to do this:
-        #  - order of sorting/filtering by local
-        #  - use numpy.unique, or just do in1d(self.conn_list)?
-        idx = numpy.argsort(self.conn_list[:, 1])
-        targets = numpy.unique(self.conn_list[:, 1]).astype(numpy.int)
-        local = numpy.in1d(targets,
-                           numpy.arange(projection.post.size)[projection.post._mask_local],
-                           assume_unique=True)
-        local_targets = targets[local]
-        self.conn_list = self.conn_list[idx]
-        left = numpy.searchsorted(self.conn_list[:, 1], local_targets, 'left')
-        right = numpy.searchsorted(self.conn_list[:, 1], local_targets, 'right')
-        logger.debug("idx = %s", idx)
-        logger.debug("targets = %s", targets)
-        logger.debug("local_targets = %s", local_targets)
-        logger.debug("conn_list (sorted by target) = \n%s", self.conn_list)
-        logger.debug("left = %s", left)
-        logger.debug("right = %s", right)
-
-        for tgt, l, r in zip(local_targets, left, right):
-            sources = self.conn_list[l:r, 0].astype(numpy.int)
-            connection_parameters = deepcopy(projection.synapse_type.parameter_space)
-            connection_parameters.shape = (r - l,)
-            for col, name in enumerate(self.column_names, 2):
-                connection_parameters.update(**{name: self.conn_list[l:r, col]})
-            if isinstance(projection.synapse_type, StandardSynapseType):
-                connection_parameters = projection.synapse_type.translate(
-                                            connection_parameters)
-            connection_parameters.evaluate()
-            projection._convergent_connect(sources, tgt, **connection_parameters)
+        for chunk, progress in self._read_chunks(projection):
+            if chunk.size > 0:
+                _connect_from_list(projection, chunk, self.column_names)
+            if self.callback and progress is not None:
+                self.callback(progress)
 
 
 class FromFileConnector(FromListConnector):
     """
     Make connections according to a list read from a file.
 
+    The file is read in chunks of `chunk_size` connections, so that the whole
+    list need never be held in memory.
+
     Arguments:
         `file`:
             either an open file object or the filename of a file containing a
-            list of connections, in the format required by `FromListConnector`.
+            list of connections, in the format required by `FromListConnector`,
+            or in the binary format written by `Projection.save(format='binary')`.
+            Binary files are detected automatically and memory-mapped, and
+            only the connections to local post-synaptic neurons are read.
         `distributed`:
             if this is True, then each node will read connections from a file
             called `filename.x`, where `x` is the MPI rank. This speeds up
@@ -570,22 +1185,34 @@ class FromFileConnector(FromListConnector):
         self.file = file
         self.distributed = distributed
 
+    def _read_chunks(self, projection):
+        if isinstance(self.file, files.BinaryConnectionFile):
+            # the file is indexed by target, so we need only read the connections we own
+            local_targets = numpy.arange(projection.post.size)[projection.post._mask_local]
+            chunks = self.file.read_targets(local_targets, self.chunk_size)
+        else:
+            chunks = self.file.read_chunks(self.chunk_size)
+        return ((chunk, None) for chunk in chunks)
+
     def connect(self, projection):
         """Connect-up a Projection."""
         if self.distributed:
             self.file.rename("%s.%d" % (self.file.name,
                                         projection._simulator.state.mpi_rank))
+        if (isinstance(self.file, files.StandardTextFile)
+                and files.BinaryConnectionFile.is_binary_connection_file(self.file.name)):
+            self.file.close()
+            self.file = files.BinaryConnectionFile(self.file.name, mode='rb')
         self.column_names = self.file.get_metadata().get('columns', ('weight', 'delay'))
         for ignore in "ij":
             if ignore in self.column_names:
                 self.column_names.remove(ignore)
-        self.conn_list = self.file.read()
         FromListConnector.connect(self, projection)
 
 
 class FixedNumberConnector(MapConnector):
     # base class - should not be instantiated
-    parameter_names = ('allow_self_connections', 'n')
+    parameter_names = ('allow_self_connections', 'n', 'with_replacement')
 
     def __init__(self, n, allow_self_connections=True, with_replacement=False,
                  rng=None, safe=True, callback=None):
@@ -606,17 +1233,97 @@ class FixedNumberConnector(MapConnector):
             raise TypeError("n must be an integer or a RandomDistribution object")
         self.rng = _get_rng(rng)
 
-    def _rng_uniform_int_exclude(self, n, size, exclude):
-        res = self.rng.next(n, 'uniform_int', {"low": 0, "high": size}, mask_local=False)
-        logger.debug("RNG0 res=%s" % res)
-        idx = numpy.where(res == exclude)[0]
-        logger.debug("RNG1 exclude=%d, res=%s idx=%s" % (exclude, res, idx))
-        while idx.size > 0:
-            redrawn = self.rng.next(idx.size, 'uniform_int', {"low": 0, "high": size}, mask_local=False)
-            res[idx] = redrawn
-            idx = idx[numpy.where(res == exclude)[0]]
-            logger.debug("RNG2 exclude=%d redrawn=%s res=%s idx=%s" % (exclude, redrawn, res, idx))
-        return res
+    def _random_number_generators(self):
+        rngs = [self.rng]
+        if isinstance(self.n, RandomDistribution):
+            rngs.append(self.n.rng)
+        return rngs
+
+    def _uniform_int(self, n, high):
+        """Draw `n` integers from the range [0, `high`) in a single call to the RNG."""
+        if n == 0:
+            return numpy.array([], dtype=int)
+        return self.rng.next(n, 'uniform_int', {"low": 0, "high": high},
+                             mask_local=False).astype(int)
+
+    def _sample(self, counts, size, exclude=None):
+        """
+        Draw `counts[k]` indices from the range [0, `size`) for each row k.
+
+        If `exclude` is given, row k never contains the index `exclude[k]`.
+        The sampling is with or without replacement according to the
+        `with_replacement` attribute, and all rows are drawn together, in a
+        small number of calls to the RNG.
+
+        Returns the samples in compressed sparse row format, as a tuple
+        `(indptr, indices)`, where the indices for row k are
+        `indices[indptr[k]:indptr[k + 1]]`.
+        """
+        counts = numpy.asarray(counts, dtype=int)
+        n_allowed = size if exclude is None else size - 1
+        if counts.sum() > 0 and n_allowed < 1:
+            raise errors.ConnectionError("No neurons available to connect to")
+        indptr = numpy.hstack(([0], numpy.cumsum(counts)))
+        if self.with_replacement:
+            indices = self._uniform_int(indptr[-1], n_allowed)
+        else:
+            # where a count is greater than the number of allowed indices, all
+            # indices are taken one or more times, then the remainder are
+            # chosen randomly
+            full_sets, remainder = divmod(counts, n_allowed)
+            n_full = full_sets * n_allowed
+            indices = numpy.empty(indptr[-1], dtype=int)
+            indices[_positions(indptr[:-1], n_full)] = numpy.tile(numpy.arange(n_allowed),
+                                                                  full_sets.sum())
+            indices[_positions(indptr[:-1] + n_full, remainder)] = \
+                self._sample_without_replacement(remainder, n_allowed)
+        if exclude is not None:
+            # we sampled from a range one smaller than `size`, so skip over
+            # the excluded index
+            indices[indices >= numpy.repeat(exclude, counts)] += 1
+        return indptr, indices
+
+    def _sample_without_replacement(self, counts, size):
+        """
+        Draw `counts[k]` distinct indices from the range [0, `size`) for each
+        row k, where all counts are less than `size`.
+
+        Indices are drawn by rejection sampling, redrawing duplicates until
+        each row is complete. Where more than half of the range is to be
+        drawn, we instead draw the indices to leave out.
+
+        Returns the indices, grouped by row and in ascending order within
+        each row.
+        """
+        rows = numpy.arange(counts.size)
+        complement = counts > size // 2
+        n_draw = numpy.where(complement, size - counts, counts)
+        # each key identifies a (row, index) pair, and sorting the keys sorts
+        # by row, then by index
+        keys = numpy.array([], dtype=int)
+        n_missing = n_draw
+        while n_missing.sum() > 0:
+            new_keys = numpy.repeat(rows * size, n_missing) + self._uniform_int(n_missing.sum(), size)
+            new_keys = numpy.unique(new_keys)
+            positions = numpy.searchsorted(keys, new_keys)
+            if keys.size > 0:
+                is_new = keys[numpy.minimum(positions, keys.size - 1)] != new_keys
+                positions = positions[is_new]
+                new_keys = new_keys[is_new]
+            keys = numpy.insert(keys, positions, new_keys)
+            n_missing = n_draw - numpy.bincount(keys // size, minlength=counts.size)
+        index_rows, indices = divmod(keys, size)
+        if complement.any():
+            is_omitted = complement[index_rows]
+            selected = numpy.ones((complement.sum(), size), dtype=bool)
+            complement_rows = numpy.cumsum(complement) - 1
+            selected[complement_rows[index_rows[is_omitted]], indices[is_omitted]] = False
+            starts = numpy.cumsum(counts) - counts
+            all_indices = numpy.empty(counts.sum(), dtype=int)
+            all_indices[_positions(starts[~complement], counts[~complement])] = indices[~is_omitted]
+            all_indices[_positions(starts[complement], counts[complement])] = selected.nonzero()[1]
+            indices = all_indices
+        return indices
 
 
 class FixedNumberPostConnector(FixedNumberConnector):
@@ -658,43 +1365,33 @@ class FixedNumberPostConnector(FixedNumberConnector):
             are created.
     """
 
-    def _get_num_post(self):
+    def _get_num_post(self, size):
         if isinstance(self.n, int):
-            n_post = self.n
+            n_post = numpy.repeat(self.n, size)
         else:
-            n_post = self.n.next()
-        return n_post
+            n_post = self.n.next(size, mask_local=False)
+        return numpy.asarray(n_post, dtype=int)
 
     def connect(self, projection):
-        connections = [[] for i in range(projection.post.size)]
-        for source_index in range(projection.pre.size):
-            n = self._get_num_post()
-            if self.with_replacement:
-                if not self.allow_self_connections and projection.pre == projection.post:
-                    targets = self._rng_uniform_int_exclude(n, projection.post.size, source_index)
-                else:
-                    targets = self.rng.next(n, 'uniform_int', {"low": 0, "high": projection.post.size}, mask_local=False)
-            else:
-                all_cells = numpy.arange(projection.post.size)
-                if not self.allow_self_connections and projection.pre == projection.post:
-                    all_cells = all_cells[all_cells != source_index]
-                full_sets = n // all_cells.size
-                remainder = n % all_cells.size
-                target_sets = []
-                if full_sets > 0:
-                    target_sets = [all_cells] * full_sets
-                if remainder > 0:
-                    target_sets.append(self.rng.permutation(all_cells)[:remainder])
-                targets = numpy.hstack(target_sets)
-            assert targets.size == n
-            for target_index in targets:
-                connections[target_index].append(source_index)
+        n_post = self._get_num_post(projection.pre.size)
+        if not self.allow_self_connections and projection.pre == projection.post:
+            exclude = numpy.arange(projection.pre.size)
+        else:
+            exclude = None
+        indptr, targets = self._sample(n_post, projection.post.size, exclude)
+        sources = numpy.repeat(numpy.arange(projection.pre.size), n_post)
+        # convert from rows of targets (one per source) to columns of sources
+        # (one per target), keeping the sources in ascending order
+        order = numpy.argsort(targets, kind='mergesort')
+        sources = sources[order]
+        column_indptr = numpy.hstack(([0], numpy.cumsum(numpy.bincount(targets,
+                                                                        minlength=projection.post.size))))
 
         def build_source_masks(mask=None):
-            if mask is None:
-                return [numpy.array(x) for x in connections]
-            else:
-                return [numpy.array(x) for x in numpy.array(connections)[mask]]
+            columns = numpy.arange(projection.post.size)
+            if mask is not None:
+                columns = columns[mask]
+            return [sources[column_indptr[j]:column_indptr[j + 1]] for j in columns]
         self._standard_connect(projection, build_source_masks)
 
 
@@ -740,9 +1437,9 @@ class FixedNumberPreConnector(FixedNumberConnector):
     def _get_num_pre(self, size, mask=None):
         if isinstance(self.n, int):
             if mask is None:
-                n_pre = repeat(self.n, size)
+                n_pre = numpy.repeat(self.n, size)
             else:
-                n_pre = repeat(self.n, mask.sum())
+                n_pre = numpy.repeat(self.n, mask.sum())
         else:
             if mask is None:
                 n_pre = self.n.next(size)
@@ -751,69 +1448,21 @@ class FixedNumberPreConnector(FixedNumberConnector):
                     n_pre = self.n.next(size)[mask]
                 else:
                     n_pre = self.n.next(mask.sum())
-        return n_pre
+        return numpy.asarray(n_pre, dtype=int)
 
     def connect(self, projection):
-        if self.with_replacement:
-            if self.allow_self_connections or projection.pre != projection.post:
-                def build_source_masks(mask=None):
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    for n in n_pre:
-                        sources = self.rng.next(n, 'uniform_int', {"low": 0, "high": projection.pre.size}, mask_local=False)
-                        assert sources.size == n
-                        yield sources
-            else:
-                def build_source_masks(mask=None):
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    if self.rng.parallel_safe or mask is None:
-                        for i, n in enumerate(n_pre):
-                            sources = self._rng_uniform_int_exclude(n, projection.pre.size, i)
-                            assert sources.size == n
-                            yield sources
-                    else:
-                        # TODO: use mask to obtain indices i
-                        raise NotImplementedError("allow_self_connections=False currently requires a parallel safe RNG.")
-        else:
-            if self.allow_self_connections or projection.pre != projection.post:
-                def build_source_masks(mask=None):
-                    # where n > projection.pre.size, first all pre-synaptic cells
-                    # are connected one or more times, then the remainder
-                    # are chosen randomly
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    all_cells = numpy.arange(projection.pre.size)
-                    for n in n_pre:
-                        full_sets = n // projection.pre.size
-                        remainder = n % projection.pre.size
-                        source_sets = []
-                        if full_sets > 0:
-                            source_sets = [all_cells] * full_sets
-                        if remainder > 0:
-                            source_sets.append(self.rng.permutation(all_cells)[:remainder])
-                        sources = numpy.hstack(source_sets)
-                        assert sources.size == n
-                        yield sources
+        def build_source_masks(mask=None):
+            # `mask` is only given if the RNG is not parallel-safe, in which
+            # case we draw sources only for the local columns
+            n_pre = self._get_num_pre(projection.post.size, mask)
+            if not self.allow_self_connections and projection.pre == projection.post:
+                exclude = numpy.arange(projection.post.size)
+                if mask is not None:
+                    exclude = exclude[mask]
             else:
-                def build_source_masks(mask=None):
-                    # where n > projection.pre.size, first all pre-synaptic cells
-                    # are connected one or more times, then the remainder
-                    # are chosen randomly
-                    n_pre = self._get_num_pre(projection.post.size, mask)
-                    all_cells = numpy.arange(projection.pre.size)
-                    if self.rng.parallel_safe or mask is None:
-                        for i, n in enumerate(n_pre):
-                            full_sets = n // (projection.pre.size - 1)
-                            remainder = n % (projection.pre.size - 1)
-                            allowed_cells = all_cells[all_cells != i]
-                            source_sets = []
-                            if full_sets > 0:
-                                source_sets = [allowed_cells] * full_sets
-                            if remainder > 0:
-                                source_sets.append(self.rng.permutation(allowed_cells)[:remainder])
-                            sources = numpy.hstack(source_sets)
-                            assert sources.size == n
-                            yield sources
-                    else:
-                        raise NotImplementedError("allow_self_connections=False currently requires a parallel safe RNG.")
+                exclude = None
+            indptr, sources = self._sample(n_pre, projection.pre.size, exclude)
+            return [sources[start:stop] for start, stop in zip(indptr[:-1], indptr[1:])]
 
         self._standard_connect(projection, build_source_masks)
 
@@ -834,10 +1483,15 @@ class OneToOneConnector(MapConnector):
         self._connect_with_map(projection, connection_map)
 
 
-class SmallWorldConnector(Connector):
+class SmallWorldConnector(MapConnector):
     """
     Connect cells so as to create a small-world network.
 
+    Each pre-synaptic neuron is first connected to all post-synaptic neurons
+    within a distance `degree` (a regular lattice, if the neurons are
+    arranged regularly), then each of these connections is rewired, with
+    probability `rewiring`, to a post-synaptic neuron chosen at random.
+
     Takes any of the standard :class:`Connector` optional arguments and, in
     addition:
 
@@ -850,12 +1504,16 @@ class SmallWorldConnector(Connector):
             flag determines whether a neuron is allowed to connect to itself,
             or only to other neurons in the Population.
         `n_connections`:
-            if specified, the number of efferent synaptic connections per neuron.
+            if specified, the number of efferent synaptic connections per
+            neuron: each neuron is connected locally only to its
+            `n_connections` nearest neighbours within the region.
         `rng`:
             an :class:`RNG` instance used to evaluate which connections
             are created.
     """
     parameter_names = ('allow_self_connections', 'degree', 'rewiring', 'n_connections')
+    #: number of post-synaptic cells for which the local neighbours are found at one time.
+    lattice_block_size = 10000
 
     def __init__(self, degree, rewiring, allow_self_connections=True,
                  n_connections=None, rng=None, safe=True, callback=None):
@@ -865,15 +1523,94 @@ class SmallWorldConnector(Connector):
         Connector.__init__(self, safe, callback)
         assert 0 <= rewiring <= 1
         assert isinstance(allow_self_connections, bool) or allow_self_connections == 'NoMutual'
+        self.degree = degree
         self.rewiring = rewiring
         self.d_expression = "d < %g" % degree
         self.allow_self_connections = allow_self_connections
         self.n_connections = n_connections
         self.rng = _get_rng(rng)
 
+    def _lattice(self, projection):
+        """
+        Return the pre- and post-synaptic indices of the local connections,
+        i.e. those between neurons closer than `degree`.
+        """
+        same_population = projection.pre == projection.post
+        sources = []
+        targets = []
+        distances = []
+        for i, j, d in projection.space.pairs_within_distance(projection.pre.positions.T,
+                                                              projection.post.positions.T,
+                                                              self.degree,
+                                                              block_size=self.lattice_block_size):
+            keep = d < self.degree
+            if same_population:
+                if not self.allow_self_connections:
+                    keep &= i != j
+                elif self.allow_self_connections == 'NoMutual':
+                    keep &= i > j
+            sources.append(i[keep])
+            targets.append(j[keep])
+            distances.append(d[keep])
+        sources = numpy.hstack(sources + [[]]).astype(int)
+        targets = numpy.hstack(targets + [[]]).astype(int)
+        if self.n_connections is not None:
+            # keep the nearest neighbours of each pre-synaptic neuron
+            distances = numpy.hstack(distances + [[]])
+            order = numpy.lexsort((targets, distances, sources))
+            sources, targets = sources[order], targets[order]
+            rank = numpy.arange(sources.size) - numpy.searchsorted(sources, sources, 'left')
+            keep = rank < self.n_connections
+            sources, targets = sources[keep], targets[keep]
+        return sources, targets
+
+    def _rewire(self, projection, sources, targets):
+        """
+        Replace the post-synaptic neuron of each connection by a randomly
+        chosen one, with probability `rewiring`.
+
+        Random numbers are drawn for every connection, whether or not its
+        post-synaptic neuron is local, so that the network is independent of
+        the number of MPI processes if the RNG is parallel safe.
+        """
+        rewired = (self.rng.next(sources.size, 'uniform', {'low': 0.0, 'high': 1.0},
+                                 mask_local=False) < self.rewiring).nonzero()[0]
+        pre = sources[rewired]
+        if projection.pre != projection.post or self.allow_self_connections is True:
+            new_targets = self.rng.next(rewired.size, 'uniform_int',
+                                        {'low': 0, 'high': projection.post.size},
+                                        mask_local=False)
+        elif self.allow_self_connections == 'NoMutual':
+            # choose from the neurons with a lower index
+            new_targets = numpy.floor(pre * self.rng.next(rewired.size, 'uniform',
+                                                          {'low': 0.0, 'high': 1.0},
+                                                          mask_local=False))
+        else:
+            # choose from all the other neurons
+            new_targets = self.rng.next(rewired.size, 'uniform_int',
+                                        {'low': 0, 'high': projection.post.size - 1},
+                                        mask_local=False)
+            new_targets = new_targets + (new_targets >= pre)
+        targets = targets.copy()
+        targets[rewired] = numpy.asarray(new_targets, dtype=int).reshape(rewired.shape)
+        return sources, targets
+
     def connect(self, projection):
         """Connect-up a Projection."""
-        raise NotImplementedError
+        sources, targets = self._rewire(projection, *self._lattice(projection))
+        # convert to columns of sources (one per target)
+        order = numpy.argsort(targets, kind='mergesort')
+        sources = sources[order]
+        column_indptr = numpy.hstack(([0], numpy.cumsum(numpy.bincount(targets,
+                                                                        minlength=projection.post.size))))
+
+        def build_source_masks(mask=None):
+            columns = numpy.arange(projection.post.size)
+            if mask is not None:
+                columns = columns[mask]
+            return (sources[column_indptr[j]:column_indptr[j + 1]] for j in columns)
+        self._standard_connect(projection, build_source_masks,
+                               self._generate_distance_map(projection))
 
 
 class CSAConnector(MapConnector):
@@ -885,8 +1622,12 @@ class CSAConnector(MapConnector):
 
         `cset`:
             a connection set object.
+
+    The connection set is evaluated for blocks of `columns_per_block`
+    post-synaptic neurons at a time.
     """
     parameter_names = ('cset',)
+    columns_per_block = 1000
 
     if haveCSA:
         def __init__(self, cset, safe=True, callback=None):
@@ -902,21 +1643,36 @@ class CSAConnector(MapConnector):
         def __init__(self, cset, safe=True, callback=None):
             raise RuntimeError("CSAConnector not available---couldn't import csa module")
 
+    def _column_blocks(self, projection, mask=None):
+        """
+        Return an iterator over blocks of the (selected) post-synaptic
+        indices, together with the part of the connection set which lies
+        within the columns of each block.
+        """
+        columns = numpy.arange(projection.post.size)
+        if mask is not None:
+            columns = columns[mask]
+        for start in range(0, columns.size, self.columns_per_block):
+            block = columns[start:start + self.columns_per_block]
+            yield block, csa.cross((0, projection.pre.size - 1), _intervals(block)) * self.cset
+
     def connect(self, projection):
         """Connect-up a Projection."""
-        # Cut out finite part
-        c = csa.cross((0, projection.pre.size - 1), (0, projection.post.size - 1)) * self.cset  # can't we cut out just the columns we want?
-
         if csa.arity(self.cset) == 2:
-            # Connection-set with arity 2
-            for (i, j, weight, delay) in c:
-                projection._convergent_connect([projection.pre[i]], projection.post[j], weight, delay)
+            # Connection-set with arity 2: the weights and delays come from the connection set
+            for block, c in self._column_blocks(projection, projection.post._mask_local):
+                connections = numpy.array([tuple(x) for x in c], dtype=float).reshape((-1, 4))
+                if connections.size > 0:
+                    _connect_from_list(projection, connections, ('weight', 'delay'))
         elif csa.arity(self.cset) == 0:
-            # inefficient implementation as a starting point
-            connection_map = numpy.zeros((projection.pre.size, projection.post.size), dtype=bool)
-            for addr in c:
-                connection_map[addr] = True
-            self._connect_with_map(projection, LazyArray(connection_map))
+            def build_source_masks(mask=None):
+                for block, c in self._column_blocks(projection, mask):
+                    pairs = numpy.array([tuple(x) for x in c], dtype=int).reshape((-1, 2))
+                    pairs = pairs[numpy.argsort(pairs[:, 1], kind='mergesort')]
+                    bounds = numpy.searchsorted(pairs[:, 1], numpy.append(block, block[-1] + 1))
+                    for k in range(block.size):
+                        yield pairs[bounds[k]:bounds[k + 1], 0]
+            self._standard_connect(projection, build_source_masks)
         else:
             raise NotImplementedError
 
@@ -924,6 +1680,10 @@ class CSAConnector(MapConnector):
 class CloneConnector(MapConnector):
     """
     Connects cells with the same connectivity pattern as a previous projection.
+
+    The connections are copied directly from the reference projection, on
+    each MPI node, including any multiple connections between the same pair
+    of neurons.
     """
     parameter_names = ('reference_projection',)
 
@@ -945,9 +1705,39 @@ class CloneConnector(MapConnector):
                                          .format(self.reference_projection.pre,
                                                  self.reference_projection.post,
                                                  projection.pre, projection.post))
-        connection_map = LazyArray(~numpy.isnan(self.reference_projection.get(['weight'], 'array',
-                                                                              gather='all')[0]))
-        self._connect_with_map(projection, connection_map)
+        parameter_space = self._parameters_from_synapse_type(projection)
+        if (projection._simulator.state.num_processes > 1
+            and parameter_space.parallel_safe):
+            # random values must be drawn for all connections, whichever
+            # node they are on, so that they do not depend on the number of nodes
+            sources, targets = recording.gather_columns(
+                                   self.reference_projection._get_attributes_as_columns(
+                                       "presynaptic_index", "postsynaptic_index"),
+                                   all=True)
+            local = projection.post._mask_local[targets]
+        else:
+            # the post-synaptic neurons on this node are the same as for the
+            # reference projection, so we need only the local connections
+            sources, targets = self.reference_projection._get_attributes_as_columns(
+                                   "presynaptic_index", "postsynaptic_index")
+            local = numpy.ones(sources.shape, dtype=bool)
+        # connections are created in the same order as by the other connectors,
+        # i.e. grouped by post-synaptic neuron, with multiple connections
+        # between a given pair of neurons retained.
+        order = numpy.lexsort((sources, targets))
+        sources = sources[order].astype(int)
+        targets = targets[order].astype(int)
+        local = local[order]
+        for start in range(0, sources.size, self.block_size):
+            block = slice(start, start + self.block_size)
+            block_local = local[block]
+            connection_parameters = self._evaluate_parameters(parameter_space, sources[block],
+                                                              targets[block], block_local)
+            if block_local.any():
+                projection._bulk_connect(sources[block][block_local], targets[block][block_local],
+                                         **connection_parameters)
+            if self.callback:
+                self.callback(min(start + self.block_size, sources.size) / sources.size)
 
 
 class ArrayConnector(MapConnector):
@@ -971,7 +1761,7 @@ class ArrayConnector(MapConnector):
 
 
 class FixedTotalNumberConnector(FixedNumberConnector):
-    parameter_names = ('allow_self_connections', 'n')
+    parameter_names = ('allow_self_connections', 'n', 'with_replacement')
 
     def __init__(self, n, allow_self_connections=True, with_replacement=True,
                  rng=None, safe=True, callback=None):
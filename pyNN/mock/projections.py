@@ -1,26 +1,67 @@
+import numpy
 from itertools import repeat
-try:
-    from itertools import izip
-except ImportError:
-    izip = zip  # Python 3 zip returns an iterator already
 from pyNN import common
-from pyNN.core import ezip
 from pyNN.space import Space
 from . import simulator
 
 
+class ColumnBuffer(object):
+    """
+    A one-dimensional, typed NumPy array which can be extended in amortised
+    constant time, by doubling its capacity whenever it is full.
+    """
+
+    def __init__(self, dtype, size=0, fill_value=0):
+        self._data = numpy.empty((max(size, 16),), dtype=dtype)
+        self._data[:size] = fill_value
+        self.size = size
+
+    def extend(self, values, n):
+        """
+        Append `n` elements, given either as an array of length `n` or as a
+        single value.
+        """
+        new_size = self.size + n
+        if new_size > self._data.size:
+            data = numpy.empty((max(new_size, 2 * self._data.size),), dtype=self._data.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self._data[self.size:new_size] = values
+        self.size = new_size
+
+    @property
+    def values(self):
+        """A view of the elements stored so far."""
+        return self._data[:self.size]
+
+    @property
+    def nbytes(self):
+        """The memory allocated for the buffer, in bytes."""
+        return self._data.nbytes
+
+
 class Connection(common.Connection):
     """
-    Store an individual plastic connection and information about it. Provide an
-    interface that allows access to the connection's weight, delay and other
-    attributes.
+    Provide an interface that allows access to the attributes of an individual
+    connection, which are stored in the columns of the parent Projection.
     """
 
-    def __init__(self, pre, post, **attributes):
-        self.presynaptic_index = pre
-        self.postsynaptic_index = post
-        for name, value in attributes.items():
-            setattr(self, name, value)
+    def __init__(self, projection, index):
+        object.__setattr__(self, "projection", projection)
+        object.__setattr__(self, "index", index)
+
+    def __getattr__(self, name):
+        try:
+            column = self.projection._columns[name]
+        except KeyError:
+            raise AttributeError(name)
+        return column.values[self.index]
+
+    def __setattr__(self, name, value):
+        if name in self.projection._columns:
+            self.projection._columns[name].values[self.index] = value
+        else:
+            object.__setattr__(self, name, value)
 
     def as_tuple(self, *attribute_names):
         # should return indices, not IDs for source and target
@@ -38,23 +79,65 @@ class Projection(common.Projection):
                                    connector, synapse_type, source, receptor_type,
                                    space, label)
 
-        #  Create connections
-        self.connections = []
+        #  Create connections, which are stored column-wise, with one
+        #  column for each of the connection indices and attributes
+        self._columns = {"presynaptic_index": ColumnBuffer(int),
+                         "postsynaptic_index": ColumnBuffer(int)}
         connector.connect(self)
 
     def __len__(self):
-        return len(self.connections)
+        return self._columns["presynaptic_index"].size
 
-    def set(self, **attributes):
-        raise NotImplementedError
+    def __getitem__(self, i):
+        """Return the `i`th connection on the local MPI node."""
+        if isinstance(i, slice):
+            return [Connection(self, j) for j in range(*i.indices(len(self)))]
+        if not -len(self) <= i < len(self):
+            raise IndexError("%d > %d" % (i, len(self) - 1))
+        return Connection(self, i % len(self))
+
+    @property
+    def connections(self):
+        return (Connection(self, i) for i in range(len(self)))
 
     def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
                             **connection_parameters):
-        for name, value in connection_parameters.items():
-            if isinstance(value, float):
-                connection_parameters[name] = repeat(value)
-        for pre_idx, other in ezip(presynaptic_indices, *connection_parameters.values()):
-            other_attributes = dict(zip(connection_parameters.keys(), other))
-            self.connections.append(
-                Connection(pre_idx, postsynaptic_index, **other_attributes)
-            )
+        presynaptic_indices = numpy.asarray(presynaptic_indices, dtype=int)
+        self._bulk_connect(presynaptic_indices,
+                           repeat(postsynaptic_index, presynaptic_indices.size),
+                           **connection_parameters)
+
+    def _bulk_connect(self, presynaptic_indices, postsynaptic_indices,
+                      **connection_parameters):
+        presynaptic_indices = numpy.asarray(presynaptic_indices, dtype=int)
+        n = presynaptic_indices.size
+        if not isinstance(postsynaptic_indices, numpy.ndarray):
+            postsynaptic_indices = numpy.fromiter(postsynaptic_indices, dtype=int, count=n)
+        for name in connection_parameters:
+            if name not in self._columns:
+                self._columns[name] = ColumnBuffer(float, len(self), numpy.nan)
+        for name, column in self._columns.items():
+            if name == "presynaptic_index":
+                column.extend(presynaptic_indices, n)
+            elif name == "postsynaptic_index":
+                column.extend(postsynaptic_indices, n)
+            else:
+                column.extend(connection_parameters.get(name, numpy.nan), n)
+
+    def _set_attributes(self, parameter_space):
+        if len(self) == 0:
+            return
+        # evaluate the parameters only for the (i, j) pairs that are connected
+        parameter_space.evaluate(mask=(self._columns["presynaptic_index"].values,
+                                       self._columns["postsynaptic_index"].values))
+        for name, value in parameter_space.items():
+            if name not in self._columns:
+                self._columns[name] = ColumnBuffer(float, len(self), numpy.nan)
+            self._columns[name].values[:] = value
+
+    def _get_attributes_as_columns(self, *names):
+        return [self._columns[name].values.copy() for name in names]
+
+    def _get_attributes_as_list(self, *names):
+        columns = self._get_attributes_as_columns(*names)
+        return list(zip(*[column.tolist() for column in columns]))
@@ -14,7 +14,8 @@ class Recorder(recording.Recorder):
 
     def _get_all_signals(self, variable, ids, clear=False):
         # assuming not using cvode, otherwise need to get times as well and use IrregularlySampledAnalogSignal
-        n_samples = int(round(self._simulator.state.t / self._simulator.state.dt)) + 1
+        duration = self._simulator.state.t - float(self._recording_start_time)
+        n_samples = int(round(duration / self._simulator.state.dt)) + 1
         return numpy.vstack((numpy.random.uniform(size=n_samples) for id in ids)).T
 
     def _local_count(self, variable, filter_ids=None):
@@ -139,6 +139,8 @@ def end():
         logger.debug("%s%s --> %s" % (population.label, variables, filename))
         io = recording.get_io(filename)
         population.write_data(io, variables)
+    for recorder in simulator.state.recorders:
+        recorder.flush()  # write any remaining data for streaming recorders
     for tempdir in simulator.state.tempdirs:
         shutil.rmtree(tempdir)
     simulator.state.tempdirs = []
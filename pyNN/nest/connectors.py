@@ -7,6 +7,8 @@ Connection method classes for nest
 """
 
 import logging
+from numbers import Integral
+import numpy
 import nest
 try:
     import csa
@@ -91,21 +93,87 @@ else:
                                model=projection.nest_synapse_model)
 
             projection._connections = None  # reset the caching of the connection list, since this will have to be recalculated
-            projection._sources.extend(presynaptic_cells)
 
 
 class NESTConnectorMixin(object):
+    """
+    Creates connections with one of NEST's built-in connection rules, so that
+    connection creation takes place in NEST's (multi-threaded) C++ code.
+
+    This is used when the random numbers are to be drawn by NEST's own RNGs,
+    i.e. when the connector's RNG or one of the synaptic parameters uses a
+    :class:`NativeRNG`, and when all the synaptic parameters can be expressed
+    as NEST synapse specifications (single values or NEST random
+    distributions). Otherwise, PyNN's own connection algorithm is used.
+
+    Subclasses should implement `rule_params()`, returning the NEST
+    connection rule dictionary, or None if the connector's configuration
+    cannot be expressed as a NEST connection rule.
+    """
+    ignored_parameters = ('tau_minus', 'dendritic_delay_fraction', 'w_min_always_zero_in_NEST')
+
+    def connect(self, projection):
+        if self.native_connect_possible(projection):
+            self.native_connect(projection)
+        else:
+            self.python_connect(projection)
+
+    def native_connect(self, projection):
+        syn_params = self.synapse_parameters(projection)
+        projection._connect(self.rule_params(projection), syn_params)
+
+    def python_connect(self, projection):
+        """Connect using PyNN's own connection algorithm."""
+        native_rng = getattr(self, "rng", None)
+        if isinstance(native_rng, NativeRNG):
+            # PyNN's connection algorithms cannot draw random numbers from NEST's RNGs
+            logger.warning("Connections cannot be created with NEST's own RNGs for %s. "
+                           "Using a NumpyRNG instead." % self.__class__.__name__)
+            self.rng = random.NumpyRNG(seed=native_rng.seed)
+        try:
+            super(NESTConnectorMixin, self).connect(projection)
+        finally:
+            if isinstance(native_rng, NativeRNG):
+                self.rng = native_rng
+
+    def rule_params(self, projection):
+        raise NotImplementedError
+
+    def native_connect_possible(self, projection):
+        uses_native_rngs = (projection.synapse_type.native_parameters.has_native_rngs
+                            or isinstance(getattr(self, "rng", None), NativeRNG))
+        if not uses_native_rngs or self.rule_params(projection) is None:
+            return False
+        receptor_types = projection._get_receptor_types(projection.post.all_cells.astype(int))
+        if receptor_types is not None and numpy.unique(receptor_types).size > 1:
+            return False
+        parameter_space = self._parameters_from_synapse_type(projection, distance_map=None)
+        for name, value in parameter_space.items():
+            if name in self.ignored_parameters:
+                continue
+            if isinstance(value.base_value, random.RandomDistribution):
+                if not isinstance(value.base_value.rng, NativeRNG):
+                    return False
+            elif not value.is_homogeneous:
+                return False
+        return True
 
     def synapse_parameters(self, projection):
         params = {'model': projection.nest_synapse_model}
         parameter_space = self._parameters_from_synapse_type(projection, distance_map=None)
         for name, value in parameter_space.items():
-            if name in ('tau_minus', 'dendritic_delay_fraction', 'w_min_always_zero_in_NEST'):
+            if name in self.ignored_parameters:
                 continue
+            invert = (name == "weight" and projection.receptor_type == 'inhibitory'
+                      and projection.post.conductance_based)
             if isinstance(value.base_value, random.RandomDistribution):     # Random Distribution specified
                 if isinstance(value.base_value.rng, NativeRNG):
                     logger.warning("Random values will be created inside NEST with NEST's own RNGs")
-                    params[name] = value.evaluate().repr()
+                    distribution = value.evaluate()
+                    if invert:
+                        distribution = distribution * -1
+                    params[name] = distribution.repr()
+                    continue
                 else:
                     value.shape = (projection.pre.size, projection.post.size)
                     params[name] = value.evaluate()
@@ -117,109 +185,76 @@ class NESTConnectorMixin(object):
                 else:
                     value.shape = (1, 1)
                     params[name] = float(value.evaluate())  # If parameter is given as a single number. Checking of the dimensions should be done in NEST
-                if name == "weight" and projection.receptor_type == 'inhibitory' and self.post.conductance_based:
-                    params[name] *= -1  # NEST wants negative values for inhibitory weights, even if these are conductances
+            if invert:
+                params[name] *= -1  # NEST wants negative values for inhibitory weights, even if these are conductances
         return params
 
 
-class FixedProbabilityConnector(FixedProbabilityConnector, NESTConnectorMixin):
+class FixedProbabilityConnector(NESTConnectorMixin, FixedProbabilityConnector):
 
-    def connect(self, projection):
-        if projection.synapse_type.native_parameters.has_native_rngs or isinstance(self.rng, NativeRNG):
-            return self.native_connect(projection)
-        else:
-            return super(FixedProbabilityConnector, self).connect(projection)
+    def rule_params(self, projection):
+        if not isinstance(self.allow_self_connections, bool):
+            return None
+        return {'autapses': self.allow_self_connections,
+                'multapses': False,
+                'rule': 'pairwise_bernoulli',
+                'p': self.p_connect}
 
-    def native_connect(self, projection):
-        syn_params = self.synapse_parameters(projection)
-        rule_params = {'autapses': self.allow_self_connections,
-                       'multapses': False,
-                       'rule': 'pairwise_bernoulli',
-                       'p': self.p_connect}
-        projection._connect(rule_params, syn_params)
 
+class AllToAllConnector(NESTConnectorMixin, AllToAllConnector):
 
-class AllToAllConnector(AllToAllConnector, NESTConnectorMixin):
+    def rule_params(self, projection):
+        if not isinstance(self.allow_self_connections, bool):
+            return None
+        return {'autapses': self.allow_self_connections,
+                'multapses': False,
+                'rule': 'all_to_all'}
 
-    def connect(self, projection):
-        if projection.synapse_type.native_parameters.has_native_rngs:  # or projection.synapse_type.native_parameters.non_random:  TODO
-            return self.native_connect(projection)
-        else:
-            return super(AllToAllConnector, self).connect(projection)
 
-    def native_connect(self, projection):
-        syn_params = self.synapse_parameters(projection)
-        rule_params = {'autapses': self.allow_self_connections,
-                       'multapses': False,
-                       'rule': 'all_to_all'}
-        projection._connect(rule_params, syn_params)
-
-
-#class OneToOneConnector():
-#
-#    def __init__(self, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'one_to_one'}
-#
-#        projection._connect(rule_params, syn_params)
-#
-#
-#class FixedNumberPreConnector():
-#
-#    def __init__(self, n, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None, rng=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#        self.n = n
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'fixed_indegree',
-#                       'indegree': self.n }
-#
-#        projection._connect(rule_params, syn_params)
-#
-#
-#class FixedNumberPostConnector():
-#
-#    def __init__(self, n, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None, rng=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#        self.n = n
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'fixed_outdegree',
-#                       'outdegree': self.n }
-#
-#        projection._connect(rule_params, syn_params)
-#
-#
-#class FixedTotalNumberConnector():
-#
-#    def __init__(self, n, allow_self_connections=True, with_replacement=True, safe=True,
-#                 callback=None):
-#        self.allow_self_connections = allow_self_connections
-#        self.with_replacement = with_replacement
-#        self.n = n
-#
-#    def connect(self, projection):
-#        syn_params = projection.synapse_parameters()
-#        rule_params = {'autapses': self.allow_self_connections,
-#                       'multapses': self.with_replacement,
-#                       'rule': 'fixed_total_number',
-#                       'N': self.n
-#                   }
-#        projection._connect(rule_params, syn_params)
+class OneToOneConnector(NESTConnectorMixin, OneToOneConnector):
+
+    def rule_params(self, projection):
+        if projection.pre.size != projection.post.size:
+            return None
+        return {'rule': 'one_to_one'}
+
+
+class FixedNumberPreConnector(NESTConnectorMixin, FixedNumberPreConnector):
+
+    def rule_params(self, projection):
+        if not isinstance(self.n, Integral) or not isinstance(self.allow_self_connections, bool):
+            return None
+        if not self.with_replacement and self.n > projection.pre.size:
+            # PyNN then takes all the sources, plus a random selection; NEST raises an error
+            return None
+        return {'autapses': self.allow_self_connections,
+                'multapses': self.with_replacement,
+                'rule': 'fixed_indegree',
+                'indegree': int(self.n)}
+
+
+class FixedNumberPostConnector(NESTConnectorMixin, FixedNumberPostConnector):
+
+    def rule_params(self, projection):
+        if not isinstance(self.n, Integral) or not isinstance(self.allow_self_connections, bool):
+            return None
+        if not self.with_replacement and self.n > projection.post.size:
+            # PyNN then takes all the targets, plus a random selection; NEST raises an error
+            return None
+        return {'autapses': self.allow_self_connections,
+                'multapses': self.with_replacement,
+                'rule': 'fixed_outdegree',
+                'outdegree': int(self.n)}
+
+
+class FixedTotalNumberConnector(NESTConnectorMixin, FixedTotalNumberConnector):
+
+    def rule_params(self, projection):
+        if not isinstance(self.n, Integral) or not isinstance(self.allow_self_connections, bool):
+            return None
+        if not self.with_replacement and self.n > projection.pre.size * projection.post.size:
+            return None
+        return {'autapses': self.allow_self_connections,
+                'multapses': self.with_replacement,
+                'rule': 'fixed_total_number',
+                'N': int(self.n)}
@@ -34,6 +34,15 @@ def listify(obj):
         return obj
 
 
+def _take(values, index):
+    """
+    Select the values for the connections given by `index` from a dict whose
+    values are either single values, applying to all connections, or arrays.
+    """
+    return dict((name, value[index] if isinstance(value, numpy.ndarray) and value.ndim > 0 else value)
+                for name, value in values.items())
+
+
 class Projection(common.Projection):
     __doc__ = common.Projection.__doc__
     _simulator = simulator
@@ -48,8 +57,9 @@ class Projection(common.Projection):
         self.nest_synapse_model = self.synapse_type._get_nest_synapse_model()
         self.nest_synapse_label = Projection._nProj
         self.synapse_type._set_tau_minus(self.post.local_cells)
-        self._sources = []
-        self._connections = None
+        self._connections = None  # cache of the handles of the local connections
+        self._connection_table = None
+        self._connection_indices = None
         # This is used to keep track of common synapse properties (to my
         # knowledge they only become apparent once connections are created
         # within nest --obreitwi, 13-02-14)
@@ -75,21 +85,57 @@ class Projection(common.Projection):
 
     def __len__(self):
         """Return the number of connections on the local MPI node."""
-        local_nodes = nest.GetNodes([0], local_only=True)[0]
-        local_connections = nest.GetConnections(target=local_nodes,
-                                                synapse_model=self.nest_synapse_model,
-                                                synapse_label=self.nest_synapse_label)
-        return len(local_connections)
+        return len(self.nest_connections)
 
     @property
     def nest_connections(self):
+        """
+        The NEST handles of the local connections.
+
+        These are obtained from NEST once, and cached until connections are
+        added to the projection.
+        """
         if self._connections is None:
-            self._sources = numpy.unique(self._sources)
-            self._connections = nest.GetConnections(self._sources.tolist(),
-                                                    synapse_model=self.nest_synapse_model,
-                                                    synapse_label=self.nest_synapse_label)
+            local_cells = self.post.local_cells.astype(int).tolist()
+            if local_cells:
+                self._connections = nest.GetConnections(self.pre.all_cells.astype(int).tolist(),
+                                                        local_cells,
+                                                        synapse_model=self.nest_synapse_model,
+                                                        synapse_label=self.nest_synapse_label)
+            else:
+                self._connections = ()
+            self._connection_table = None
+            self._connection_indices = None
         return self._connections
 
+    @property
+    def connection_table(self):
+        """
+        The handles of the local connections as an integer array, with one
+        row (source, target, thread, synapse model id, port) per connection,
+        in the same order as `nest_connections`.
+        """
+        connections = self.nest_connections
+        if self._connection_table is None:
+            self._connection_table = numpy.array(connections, dtype=int).reshape((len(connections), -1))
+        return self._connection_table
+
+    @property
+    def connection_indices(self):
+        """
+        The pre- and post-synaptic indices of the local connections, as a
+        pair of arrays in the same order as `nest_connections`.
+        """
+        table = self.connection_table
+        if self._connection_indices is None:
+            if table.shape[0] > 0:
+                self._connection_indices = (self.pre.id_to_index(table[:, 0]),
+                                            self.post.id_to_index(table[:, 1]))
+            else:
+                self._connection_indices = (numpy.array([], dtype=int),
+                                            numpy.array([], dtype=int))
+        return self._connection_indices
+
     @property
     def connections(self):
         """
@@ -104,7 +150,7 @@ class Projection(common.Projection):
             # creating the Projection, tau_psc ought to be changed as well.
             assert self.receptor_type in ('excitatory', 'inhibitory'), "only basic synapse types support Tsodyks-Markram connections"
             logger.debug("setting tau_psc")
-            targets = nest.GetStatus(self.nest_connections, 'target')
+            targets = self.connection_table[:, 1].tolist()
             if self.receptor_type == 'inhibitory':
                 param_name = self.post.local_cells[0].celltype.translations['tau_syn_I']['translated_name']
             if self.receptor_type == 'excitatory':
@@ -118,11 +164,15 @@ class Projection(common.Projection):
         with the parameters provided by params.
         """
         syn_params.update({'synapse_label': self.nest_synapse_label})
+        postsynaptic_cells = self.post.all_cells.astype(int)
+        receptor_types = self._get_receptor_types(postsynaptic_cells)
+        if receptor_types is not None:
+            assert numpy.unique(receptor_types).size == 1
+            syn_params['receptor_type'] = int(receptor_types[0])
         nest.Connect(self.pre.all_cells.astype(int).tolist(),
-                     self.post.all_cells.astype(int).tolist(),
+                     postsynaptic_cells.tolist(),
                      rule_params, syn_params)
-        self._sources = [cid[0] for cid in nest.GetConnections(synapse_model=self.nest_synapse_model,
-                                                               synapse_label=self.nest_synapse_label)]
+        self._connections = None  # reset the caching of the connection list, since this will have to be recalculated
 
     def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
                             **connection_parameters):
@@ -134,94 +184,130 @@ class Projection(common.Projection):
 
         TO UPDATE
         """
-        #logger.debug("Connecting to index %s from %s with %s" % (postsynaptic_index, presynaptic_indices, connection_parameters))
-        presynaptic_cells = self.pre.all_cells[presynaptic_indices]
-        postsynaptic_cell = self.post[postsynaptic_index]
-        assert presynaptic_cells.size == presynaptic_indices.size
-        assert len(presynaptic_cells) > 0, presynaptic_cells
+        presynaptic_indices = numpy.asarray(presynaptic_indices)
+        self._bulk_connect(presynaptic_indices,
+                           numpy.repeat(postsynaptic_index, presynaptic_indices.size),
+                           **connection_parameters)
+
+    def _bulk_connect(self, presynaptic_indices, postsynaptic_indices,
+                      **connection_parameters):
+        """
+        Connect the neurons with indices `presynaptic_indices[k]` and
+        `postsynaptic_indices[k]`, for all k, with a single call to
+        `nest.Connect()` using the 'one_to_one' rule.
+
+        Weights, delays and other local synapse parameters are passed to NEST
+        as arrays in the synapse specification. Common synapse properties
+        are set on the synapse model.
+        """
+        presynaptic_cells = self.pre.all_cells[presynaptic_indices].astype(int)
+        postsynaptic_cells = self.post.all_cells[postsynaptic_indices].astype(int)
+        assert presynaptic_cells.size == postsynaptic_cells.size
+        assert presynaptic_cells.size > 0, presynaptic_cells
 
         weights = connection_parameters.pop('weight')
         if self.receptor_type == 'inhibitory' and self.post.conductance_based:
-            weights *= -1  # NEST wants negative values for inhibitory weights, even if these are conductances
+            weights = -1 * weights  # NEST wants negative values for inhibitory weights, even if these are conductances
         if hasattr(self.post, "celltype") and hasattr(self.post.celltype, "receptor_scale"):  # this is a bit of a hack
-            weights *= self.post.celltype.receptor_scale                                      # needed for the Izhikevich model
+            weights = weights * self.post.celltype.receptor_scale                              # needed for the Izhikevich model
         delays = connection_parameters.pop('delay')
 
-        # Create connections, with weights and delays
-        # Setting other connection parameters is done afterwards
-        if postsynaptic_cell.celltype.standard_receptor_type:
-            try:
-                if not numpy.isscalar(weights):
-                    weights = numpy.array([weights])
-                if not numpy.isscalar(delays):
-                    delays = numpy.array([delays])
-                syn_dict = {'model': self.nest_synapse_model,
-                            'weight': weights, 'delay': delays,
-                            'synapse_label': self.nest_synapse_label}
-                nest.Connect(presynaptic_cells.astype(int).tolist(),
-                             [int(postsynaptic_cell)],
-                             'all_to_all',
-                             syn_dict)
-            except nest.NESTError as e:
-                errmsg = "%s. presynaptic_cells=%s, postsynaptic_cell=%s, weights=%s, delays=%s, synapse model='%s'" % (
-                            e, presynaptic_cells, postsynaptic_cell,
-                            weights, delays, self.nest_synapse_model)
-                raise errors.ConnectionError(errmsg)
-        else:
-            receptor_type = postsynaptic_cell.celltype.get_receptor_type(self.receptor_type)
-            if numpy.isscalar(weights):
-                weights = repeat(weights)
-            if numpy.isscalar(delays):
-                delays = repeat(delays)
-            for pre, w, d in zip(presynaptic_cells, weights, delays):
-                nest.Connect([pre], [postsynaptic_cell],
-                             'one_to_one',
-                             {'weight': w, 'delay': d, 'receptor_type': receptor_type,
-                              'model': self.nest_synapse_model,
-                              'synapse_label': self.nest_synapse_label})
-
-        # Book-keeping
-        self._connections = None  # reset the caching of the connection list, since this will have to be recalculated
-        self._sources.extend(presynaptic_cells)
-
         # Clean the connection parameters
         connection_parameters.pop('tau_minus', None)  # TODO: set tau_minus on the post-synaptic cells
         connection_parameters.pop('dendritic_delay_fraction', None)
         connection_parameters.pop('w_min_always_zero_in_NEST', None)
 
-        # We need to distinguish between common synapse parameters and local ones
-        # We just get the parameters of the first connection (is there an easier way?)
-        if self._common_synapse_property_names is None:
+        syn_dict = {'weight': weights, 'delay': delays}
+        if connection_parameters and self._common_synapse_property_names is None:
+            # We need to distinguish between common synapse parameters and local ones,
+            # which is only possible once a connection exists, so we create the
+            # first connection on its own.
+            self._connect_one_to_one(presynaptic_cells[:1], postsynaptic_cells[:1],
+                                     _take(syn_dict, slice(0, 1)))
             self._identify_common_synapse_properties()
+            local_parameters = dict((name, value) for name, value in connection_parameters.items()
+                                    if name not in self._common_synapse_property_names)
+            if local_parameters:
+                first_connection = nest.GetConnections(source=presynaptic_cells[:1].tolist(),
+                                                       target=postsynaptic_cells[:1].tolist(),
+                                                       synapse_model=self.nest_synapse_model,
+                                                       synapse_label=self.nest_synapse_label)[-1:]
+                nest.SetStatus(first_connection,
+                               make_sli_compatible(_take(local_parameters, 0)))
+            presynaptic_cells = presynaptic_cells[1:]
+            postsynaptic_cells = postsynaptic_cells[1:]
+            syn_dict = _take(syn_dict, slice(1, None))
+            connection_parameters = _take(connection_parameters, slice(1, None))
 
         # Set connection parameters other than weight and delay
-        if connection_parameters:
-            #logger.debug(connection_parameters)
-            sort_indices = numpy.argsort(presynaptic_cells)
-            connections = nest.GetConnections(source=numpy.unique(presynaptic_cells.astype(int)).tolist(),
-                                              target=[int(postsynaptic_cell)],
-                                              synapse_model=self.nest_synapse_model,
-                                              synapse_label=self.nest_synapse_label)
-            for name, value in connection_parameters.items():
-                value = make_sli_compatible(value)
-                if name not in self._common_synapse_property_names:
-                    #logger.debug("Setting %s=%s for connections %s" % (name, value, connections))
-                    if isinstance(value, numpy.ndarray):
-                        # the str() is to work around a bug handling unicode names in SetStatus in NEST 2.4.1 when using Python 2
-                        nest.SetStatus(connections, str(name), value[sort_indices].tolist())
-                    else:
-                        nest.SetStatus(connections, str(name), value)
-                else:
-                    self._set_common_synapse_property(name, value)
+        for name, value in connection_parameters.items():
+            if name in self._common_synapse_property_names:
+                self._set_common_synapse_property(name, make_sli_compatible(value))
+            else:
+                syn_dict[name] = value
+
+        if presynaptic_cells.size > 0:
+            self._connect_one_to_one(presynaptic_cells, postsynaptic_cells, syn_dict)
+
+    def _connect_one_to_one(self, presynaptic_cells, postsynaptic_cells, syn_dict):
+        """
+        Create a connection from `presynaptic_cells[k]` to `postsynaptic_cells[k]`
+        for all k. Values in `syn_dict` may be single values or arrays.
+        """
+        syn_dict = dict((str(name), value if numpy.isscalar(value) else numpy.asarray(value, dtype=float))
+                        for name, value in syn_dict.items())
+        syn_dict.update({'model': self.nest_synapse_model,
+                         'synapse_label': self.nest_synapse_label})
+        receptor_types = self._get_receptor_types(postsynaptic_cells)
+        if receptor_types is None:
+            groups = [(None, slice(None))]
+        else:
+            groups = [(receptor_type, receptor_types == receptor_type)
+                      for receptor_type in numpy.unique(receptor_types)]
+        for receptor_type, mask in groups:
+            group_dict = _take(syn_dict, mask)
+            if receptor_type is not None:
+                group_dict['receptor_type'] = int(receptor_type)
+            try:
+                nest.Connect(presynaptic_cells[mask].tolist(),
+                             postsynaptic_cells[mask].tolist(),
+                             'one_to_one',
+                             group_dict)
+            except nest.NESTError as e:
+                errmsg = "%s. presynaptic_cells=%s, postsynaptic_cells=%s, weights=%s, delays=%s, synapse model='%s'" % (
+                            e, presynaptic_cells, postsynaptic_cells,
+                            syn_dict['weight'], syn_dict['delay'], self.nest_synapse_model)
+                raise errors.ConnectionError(errmsg)
+
+        # Book-keeping
+        self._connections = None  # reset the caching of the connection list, since this will have to be recalculated
+
+    def _get_receptor_types(self, postsynaptic_cells):
+        """
+        Return the NEST receptor type for each of the post-synaptic cells, or
+        None if all the cells have the standard excitatory/inhibitory receptors.
+        """
+        if hasattr(self.post, "celltype"):
+            celltype = self.post.celltype
+            if celltype.standard_receptor_type:
+                return None
+            return numpy.repeat(celltype.get_receptor_type(self.receptor_type),
+                                postsynaptic_cells.size)
+        else:  # Assembly
+            celltypes = dict((cell, self.post[self.post.id_to_index(cell)].celltype)
+                             for cell in numpy.unique(postsynaptic_cells))
+            if all(celltype.standard_receptor_type for celltype in celltypes.values()):
+                return None
+            receptor_types = dict((cell, celltype.get_receptor_type(self.receptor_type))
+                                  for cell, celltype in celltypes.items())
+            return numpy.array([receptor_types[cell] for cell in postsynaptic_cells])
 
     def _identify_common_synapse_properties(self):
         """
             Use the connection between the sample indices to distinguish
             between local and common synapse properties.
         """
-        sample_connection = nest.GetConnections(source=[int(self._sources[0])],
-                                                synapse_model=self.nest_synapse_model,
-                                                synapse_label=self.nest_synapse_label)[:1]
+        sample_connection = self.nest_connections[:1]
 
         local_parameters = nest.GetStatus(sample_connection)[0].keys()
         all_parameters = nest.GetDefaults(self.nest_synapse_model).keys()
@@ -229,31 +315,28 @@ class Projection(common.Projection):
                                                if name not in local_parameters]
 
     def _set_attributes(self, parameter_space):
-        parameter_space.evaluate(mask=(slice(None), self.post._mask_local))  # only columns for connections that exist on this machine
-        sources = numpy.unique(self._sources).tolist()
+        connections = self.nest_connections
+        if len(connections) == 0:
+            return
         if self._common_synapse_property_names is None:
             self._identify_common_synapse_properties()
-        for postsynaptic_cell, connection_parameters in zip(self.post.local_cells,
-                                                            parameter_space.columns()):
-            connections = nest.GetConnections(source=sources,
-                                              target=[postsynaptic_cell],
-                                              synapse_model=self.nest_synapse_model,
-                                              synapse_label=self.nest_synapse_label)
-            if connections:
-                source_mask = self.pre.id_to_index([x[0] for x in connections])
-                for name, value in connection_parameters.items():
-                    if name == "weight" and self.receptor_type == 'inhibitory' and self.post.conductance_based:
-                        value *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
-                    value = make_sli_compatible(value)
-                    if name not in self._common_synapse_property_names:
-                        if len(source_mask) > 1:
-                            nest.SetStatus(connections, name, value[source_mask])
-                        elif isinstance(value, numpy.ndarray):  # OneToOneConnector
-                            nest.SetStatus(connections, name, value[source_mask])
-                        else:
-                            nest.SetStatus(connections, name, value)
-                    else:
-                        self._set_common_synapse_property(name, value)
+        # evaluate the parameters only for the (i, j) pairs that are connected on this machine
+        parameter_space.evaluate(mask=self.connection_indices)
+        for name, value in parameter_space.items():
+            if name == "weight" and self.receptor_type == 'inhibitory' and self.post.conductance_based:
+                value = -1 * value  # NEST uses negative values for inhibitory weights, even if these are conductances
+            if name not in self._common_synapse_property_names:
+                value = make_sli_compatible(value)
+                if isinstance(value, numpy.ndarray):
+                    value = value.astype(float).tolist()
+                nest.SetStatus(connections, name, value)
+            else:
+                if isinstance(value, numpy.ndarray) and value.size > 0:
+                    if (value != value.flat[0]).any():
+                        raise ValueError("{} cannot be heterogeneous "
+                                         "within a single Projection.".format(name))
+                    value = value.flat[0]
+                self._set_common_synapse_property(name, make_sli_compatible(value))
 
     def _set_common_synapse_property(self, name, value):
         """
@@ -306,54 +389,26 @@ class Projection(common.Projection):
     #        file.close()
 
     def _get_attributes_as_list(self, *names):
-        nest_names = []
+        columns = self._get_attributes_as_columns(*names)
+        return list(zip(*[column.tolist() for column in columns]))
+
+    def _get_attributes_as_columns(self, *names):
+        nest_names = [name for name in names
+                      if name not in ('presynaptic_index', 'postsynaptic_index')]
+        if nest_names:
+            values = numpy.array(nest.GetStatus(self.nest_connections, nest_names),
+                                 dtype=float).reshape((-1, len(nest_names)))
+        columns = []
         for name in names:
             if name == 'presynaptic_index':
-                nest_names.append('source')
+                columns.append(self.connection_indices[0])
             elif name == 'postsynaptic_index':
-                nest_names.append('target')
+                columns.append(self.connection_indices[1])
             else:
-                nest_names.append(name)
-        values = nest.GetStatus(self.nest_connections, nest_names)
-        if 'weight' in names:  # other attributes could also have scale factors - need to use translation mechanisms
-            values = numpy.array(values)  # ought to preserve int type for source, target
-            scale_factors = numpy.ones(len(names))
-            scale_factors[names.index('weight')] = 0.001
-            if self.receptor_type == 'inhibitory' and self.post.conductance_based:
-                scale_factors[names.index('weight')] *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
-            values *= scale_factors
-            values = values.tolist()
-        if 'presynaptic_index' in names:
-            values = numpy.array(values)
-            values[:, names.index('presynaptic_index')] -= self.pre.first_id
-            values = values.tolist()
-        if 'postsynaptic_index' in names:
-            values = numpy.array(values)
-            values[:, names.index('postsynaptic_index')] -= self.post.first_id
-            values = values.tolist()
-        for i in xrange(len(values)):
-            values[i] = tuple(values[i])
-        return values
-
-    def _get_attributes_as_arrays(self, *names):
-        all_values = []
-        for attribute_name in names:
-            if attribute_name[-1] == "s":  # weights --> weight, delays --> delay
-                attribute_name = attribute_name[:-1]
-            value_arr = numpy.nan * numpy.ones((self.pre.size, self.post.size))
-            connection_attributes = nest.GetStatus(self.nest_connections,
-                                                   ('source', 'target', attribute_name))
-            for conn in connection_attributes:
-                # (offset is always 0,0 for connections created with connect())
-                src, tgt, value = conn
-                addr = self.pre.id_to_index(src), self.post.id_to_index(tgt)
-                if numpy.isnan(value_arr[addr]):
-                    value_arr[addr] = value
-                else:
-                    value_arr[addr] += value
-            if attribute_name == 'weight':
-                value_arr *= 0.001
-                if self.receptor_type == 'inhibitory' and self.post.conductance_based:
-                    value_arr *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
-            all_values.append(value_arr)
-        return all_values
+                column = values[:, nest_names.index(name)]
+                if name == 'weight':
+                    column *= 0.001
+                    if self.receptor_type == 'inhibitory' and self.post.conductance_based:
+                        column *= -1  # NEST uses negative values for inhibitory weights, even if these are conductances
+                columns.append(column)
+        return columns
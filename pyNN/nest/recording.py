@@ -26,6 +26,21 @@ def _set_status(obj, parameters):
         raise nest.hl_api.NESTError("%s. Parameter dictionary was: %s" % (e, parameters))
 
 
+def _group_by_sender(senders, desired_ids):
+    """
+    Return the order that sorts events by sender, and, for each of
+    `desired_ids`, the start and end of its events in the sorted arrays.
+    Events from the same sender remain in the order in which they were recorded.
+    """
+    senders = numpy.asarray(senders, dtype=int)
+    order = numpy.argsort(senders, kind='mergesort')
+    sorted_senders = senders[order]
+    desired_ids = numpy.array([int(id) for id in desired_ids], dtype=int)
+    starts = numpy.searchsorted(sorted_senders, desired_ids, side='left')
+    stops = numpy.searchsorted(sorted_senders, desired_ids, side='right')
+    return order, starts, stops
+
+
 class RecordingDevice(object):
     """Base class for SpikeDetector and Multimeter"""
 
@@ -53,11 +68,16 @@ class RecordingDevice(object):
         scale_factor = SCALE_FACTORS.get(variable, 1)
         nest_variable = VARIABLE_MAP.get(variable, variable)
         events = nest.GetStatus(self.device, 'events')[0]
-        ids = events['senders']
-        values = events[nest_variable] * scale_factor  # I'm hoping numpy optimises for the case where scale_factor = 1, otherwise should avoid this multiplication in that case
+        desired_ids = list(desired_ids)
+        # group the events by sender in a single pass, rather than
+        # searching all events for each id
+        order, starts, stops = _group_by_sender(events['senders'], desired_ids)
+        values = events[nest_variable][order]
+        if scale_factor != 1:
+            values = values * scale_factor
         data = {}
-        for id in desired_ids:
-            data[id] = values[ids == id]
+        for id, start, stop in zip(desired_ids, starts, stops):
+            data[id] = values[start:stop]
             if variable != 'times':
                 # NEST does not record values at the zeroth time step, so we
                 # add them here.
@@ -100,13 +120,23 @@ class SpikeDetector(RecordingDevice):
         """
         return self.get_data('times', desired_ids)
 
+    def get_spike_arrays(self, desired_ids):
+        """
+        Return the spikes of the neurons in `desired_ids` as two arrays, the
+        sender ids and the spike times, sorted by sender.
+        """
+        events = nest.GetStatus(self.device, 'events')[0]
+        senders = numpy.asarray(events['senders'], dtype=int)
+        order = numpy.argsort(senders, kind='mergesort')
+        senders = senders[order]
+        mask = numpy.in1d(senders, numpy.array([int(id) for id in desired_ids], dtype=int))
+        return senders[mask], events['times'][order][mask]
+
     def get_spike_counts(self, desired_ids):
         events = nest.GetStatus(self.device, 'events')[0]
-        N = {}
-        for id in desired_ids:
-            mask = events['senders'] == int(id)
-            N[int(id)] = len(events['times'][mask])
-        return N
+        desired_ids = list(desired_ids)
+        order, starts, stops = _group_by_sender(events['senders'], desired_ids)
+        return dict((int(id), int(n)) for id, n in zip(desired_ids, stops - starts))
 
 
 class Multimeter(RecordingDevice):
@@ -417,7 +447,13 @@ class Recorder(recording.Recorder):
         self._spike_detector = SpikeDetector()
 
     def _get_spiketimes(self, id):
-        return self._spike_detector.get_spiketimes([id])[id]  # hugely inefficient - to be optimized later
+        return self._spike_detector.get_spiketimes([id])[id]
+
+    def _get_all_spiketimes(self, ids):
+        return self._spike_detector.get_spiketimes(ids)
+
+    def _get_spike_arrays(self, ids):
+        return self._spike_detector.get_spike_arrays(ids)
 
     def _get_all_signals(self, variable, ids, clear=False):
         data = self._multimeter.get_data(variable, ids, clear=clear)
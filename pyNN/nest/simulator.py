@@ -208,7 +208,7 @@ class Connection(common.Connection):
     @property
     def source(self):
         """The ID of the pre-synaptic neuron."""
-        src = ID(nest.GetStatus([self.id()], 'source')[0])
+        src = ID(self.parent.connection_table[self.index, 0])
         src.parent = self.parent.pre
         return src
     presynaptic_cell = source
@@ -216,7 +216,7 @@ class Connection(common.Connection):
     @property
     def target(self):
         """The ID of the post-synaptic neuron."""
-        tgt = ID(nest.GetStatus([self.id()], 'target')[0])
+        tgt = ID(self.parent.connection_table[self.index, 1])
         tgt.parent = self.parent.post
         return tgt
     postsynaptic_cell = target
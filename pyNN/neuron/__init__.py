@@ -96,6 +96,8 @@ def end(compatible_output=True):
     for (population, variables, filename) in simulator.state.write_on_end:
         io = get_io(filename)
         population.write_data(io, variables)
+    for recorder in simulator.state.recorders:
+        recorder.flush()  # write any remaining data for streaming recorders
     simulator.state.write_on_end = []
     #simulator.state.finalize()
 
@@ -14,7 +14,6 @@ try:
 except ImportError:
     izip = zip  # Python 3 zip returns an iterator already
 from itertools import repeat, chain
-from collections import defaultdict
 from pyNN import common, errors, core
 from pyNN.random import RandomDistribution, NativeRNG
 from pyNN.space import Space
@@ -39,7 +38,16 @@ class Projection(common.Projection):
         common.Projection.__init__(self, presynaptic_population, postsynaptic_population,
                                    connector, synapse_type, source, receptor_type,
                                    space, label)
-        self._connections = dict((index, defaultdict(list)) for index in self.post._mask_local.nonzero()[0])
+        # Connections are stored column-wise: arrays of pre- and post-synaptic
+        # indices, and a list of handles. For static synapses, the handles are
+        # NetCons, and Connection objects are only created on demand. For other
+        # synapse types, the handles are the connection objects themselves.
+        self._static = (self.synapse_type.connection_type is simulator.Connection
+                        and self.synapse_type.model is None)
+        self._presynaptic_index_blocks = []
+        self._postsynaptic_index_blocks = []
+        self._connection_indices = None
+        self._handles = []
         connector.connect(self)
         self._presynaptic_components = dict((index, {}) for index in 
                                             self.pre._mask_local.nonzero()[0])
@@ -48,29 +56,52 @@ class Projection(common.Projection):
         _projections.append(self)
         logger.info("--- Projection[%s].__init__() ---" % self.label)
 
+    @property
+    def connection_indices(self):
+        """
+        The pre- and post-synaptic indices of the local connections, as a
+        pair of arrays.
+        """
+        if self._connection_indices is None:
+            empty = [numpy.array([], dtype=int)]
+            self._presynaptic_index_blocks = [numpy.concatenate(self._presynaptic_index_blocks + empty)]
+            self._postsynaptic_index_blocks = [numpy.concatenate(self._postsynaptic_index_blocks + empty)]
+            self._connection_indices = (self._presynaptic_index_blocks[0],
+                                        self._postsynaptic_index_blocks[0])
+        return self._connection_indices
+
+    def _connection(self, k):
+        """Return the `k`th local connection, as a Connection object."""
+        if self._static:
+            presynaptic_indices, postsynaptic_indices = self.connection_indices
+            return simulator.Connection.from_netcon(self, presynaptic_indices[k],
+                                                    postsynaptic_indices[k], self._handles[k])
+        else:
+            return self._handles[k]
+
     @property
     def connections(self):
-        for x in self._connections.values():
-            for y in x.values():
-                for z in y:
-                    yield z
+        if self._static:
+            return (self._connection(k) for k in range(len(self)))
+        else:
+            return iter(self._handles)
 
     def __getitem__(self, i):
         __doc__ = common.Projection.__getitem__.__doc__
         if isinstance(i, int):
             if i < len(self):
-                return self.connections[i]
+                return self._connection(i)
             else:
                 raise IndexError("%d > %d" % (i, len(self) - 1))
         elif isinstance(i, slice):
             if i.stop < len(self):
-                return [self.connections[j] for j in range(*i.indices(i.stop))]
+                return [self._connection(j) for j in range(*i.indices(i.stop))]
             else:
                 raise IndexError("%d > %d" % (i.stop, len(self) - 1))
 
     def __len__(self):
         """Return the number of connections on the local MPI node."""
-        return len(list(self.connections))
+        return len(self._handles)
 
     def _convergent_connect(self, presynaptic_indices, postsynaptic_index,
                             **connection_parameters):
@@ -83,20 +114,48 @@ class Projection(common.Projection):
                                    1D array of the same length as `sources`, or
                                    a single value.
         """
-        #logger.debug("Convergent connect. Weights=%s" % connection_parameters['weight'])
-        postsynaptic_cell = self.post[postsynaptic_index]
-        if not isinstance(postsynaptic_cell, int) or postsynaptic_cell > simulator.state.gid_counter or postsynaptic_cell < 0:
-            errmsg = "Invalid post-synaptic cell: %s (gid_counter=%d)" % (postsynaptic_cell, simulator.state.gid_counter)
-            raise errors.ConnectionError(errmsg)
+        presynaptic_indices = numpy.asarray(presynaptic_indices, dtype=int)
+        self._bulk_connect(presynaptic_indices,
+                           numpy.repeat(postsynaptic_index, presynaptic_indices.size),
+                           **connection_parameters)
+
+    def _bulk_connect(self, presynaptic_indices, postsynaptic_indices,
+                      **connection_parameters):
+        """
+        Connect the neurons with indices `presynaptic_indices[k]` and
+        `postsynaptic_indices[k]`, for all k.
+
+        `connection_parameters` -- each parameter should be either a
+                                   1D array of the same length as
+                                   `presynaptic_indices`, or a single value.
+        """
+        presynaptic_indices = numpy.asarray(presynaptic_indices, dtype=int)
+        postsynaptic_indices = numpy.asarray(postsynaptic_indices, dtype=int)
+        for postsynaptic_index in numpy.unique(postsynaptic_indices):
+            postsynaptic_cell = self.post[postsynaptic_index]
+            if not isinstance(postsynaptic_cell, int) or postsynaptic_cell > simulator.state.gid_counter or postsynaptic_cell < 0:
+                errmsg = "Invalid post-synaptic cell: %s (gid_counter=%d)" % (postsynaptic_cell, simulator.state.gid_counter)
+                raise errors.ConnectionError(errmsg)
+            assert postsynaptic_cell.local
         for name, value in connection_parameters.items():
-            if isinstance(value, (float, int)):
+            if numpy.isscalar(value):
                 connection_parameters[name] = repeat(value)
-        assert postsynaptic_cell.local
-        for pre_idx, values in core.ezip(presynaptic_indices, *connection_parameters.values()):
-            parameters = dict(zip(connection_parameters.keys(), values))
-            #logger.debug("Connecting neuron #%s to neuron #%s with synapse type %s, receptor type %s, parameters %s", pre_idx, postsynaptic_index, self.synapse_type, self.receptor_type, parameters)
-            self._connections[postsynaptic_index][pre_idx].append(
-                self.synapse_type.connection_type(self, pre_idx, postsynaptic_index, **parameters))
+        if self._static:
+            presynaptic_cells = self.pre.all_cells[presynaptic_indices]
+            postsynaptic_cells = self.post.all_cells[postsynaptic_indices]
+            for pre_cell, post_cell, weight, delay in core.ezip(presynaptic_cells, postsynaptic_cells,
+                                                                connection_parameters['weight'],
+                                                                connection_parameters['delay']):
+                self._handles.append(simulator.create_netcon(self, pre_cell, post_cell, weight, delay))
+        else:
+            connection_type = self.synapse_type.connection_type
+            for (pre_idx, post_idx), values in core.ezip(izip(presynaptic_indices, postsynaptic_indices),
+                                                         *connection_parameters.values()):
+                parameters = dict(zip(connection_parameters.keys(), values))
+                self._handles.append(connection_type(self, pre_idx, post_idx, **parameters))
+        self._presynaptic_index_blocks.append(presynaptic_indices)
+        self._postsynaptic_index_blocks.append(postsynaptic_indices)
+        self._connection_indices = None
 
     def _configure_presynaptic_components(self):
         """
@@ -129,11 +188,40 @@ class Projection(common.Projection):
                 for name, value in connection_parameters.items():
                     for index in component:
                         setattr(component[index], name, value[index])
-        # Evaluate the parameters for the post-synaptic components (typically the "Connection" object)
-        parameter_space.evaluate(mask=(slice(None), self.post._mask_local))  # only columns for connections that exist on this machine
-        for connection_group, connection_parameters in zip(self._connections.values(),
-                                                           parameter_space.columns()):
-            for name, value in connection_parameters.items():
-                for index in connection_group:
-                    for connection in connection_group[index]:
-                        setattr(connection, name, value[index])
+        # Evaluate the parameters only for the (i, j) pairs that are connected on this machine
+        if len(self) == 0:
+            return
+        parameter_space.evaluate(mask=self.connection_indices)
+        for name, values in parameter_space.items():
+            values = numpy.resize(values, len(self))
+            if self._static and name == 'weight':
+                for nc, value in izip(self._handles, values):
+                    nc.weight[0] = value
+            elif self._static and name == 'delay':
+                for nc, value in izip(self._handles, values):
+                    nc.delay = value
+            else:
+                for connection, value in izip(self.connections, values):
+                    setattr(connection, name, value)
+
+    def _get_attributes_as_columns(self, *names):
+        columns = []
+        for name in names:
+            if name == 'presynaptic_index':
+                columns.append(self.connection_indices[0])
+            elif name == 'postsynaptic_index':
+                columns.append(self.connection_indices[1])
+            elif self._static and name == 'weight':
+                columns.append(numpy.fromiter((nc.weight[0] for nc in self._handles),
+                                              dtype=float, count=len(self)))
+            elif self._static and name == 'delay':
+                columns.append(numpy.fromiter((nc.delay for nc in self._handles),
+                                              dtype=float, count=len(self)))
+            else:
+                columns.append(numpy.fromiter((getattr(c, name) for c in self.connections),
+                                              dtype=float, count=len(self)))
+        return columns
+
+    def _get_attributes_as_list(self, *names):
+        columns = self._get_attributes_as_columns(*names)
+        return list(zip(*[column.tolist() for column in columns]))
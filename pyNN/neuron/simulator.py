@@ -337,6 +337,27 @@ class ID(int, common.IDMixin):
         setattr(self._cell, "%s_init" % variable, value)
 
 
+def create_netcon(projection, presynaptic_cell, postsynaptic_cell, weight, delay):
+    """
+    Create a NetCon from `presynaptic_cell` to the synaptic mechanism given by
+    the receptor type of `projection` on `postsynaptic_cell`.
+    """
+    if "." in projection.receptor_type:
+        section, target = projection.receptor_type.split(".")
+        target_object = getattr(getattr(postsynaptic_cell._cell, section), target)
+    else:
+        target_object = getattr(postsynaptic_cell._cell, projection.receptor_type)
+    nc = state.parallel_context.gid_connect(int(presynaptic_cell), target_object)
+    nc.weight[0] = weight
+    # if we have a mechanism (e.g. from 9ML) that includes multiple
+    # synaptic channels, need to set nc.weight[1] here
+    if nc.wcnt() > 1 and hasattr(postsynaptic_cell._cell, "type"):
+        nc.weight[1] = postsynaptic_cell._cell.type.receptor_types.index(projection.receptor_type)
+    nc.delay = delay
+    # nc.threshold is supposed to be set by ParallelContext.threshold, called in _build_cell(), above, but this hasn't been tested
+    return nc
+
+
 class Connection(common.Connection):
     """
     Store an individual plastic connection and information about it. Provide an
@@ -353,21 +374,24 @@ class Connection(common.Connection):
         self.postsynaptic_index = post
         self.presynaptic_cell = projection.pre[pre]
         self.postsynaptic_cell = projection.post[post]
-        if "." in projection.receptor_type:
-            section, target = projection.receptor_type.split(".")
-            target_object = getattr(getattr(self.postsynaptic_cell._cell, section), target)
-        else:
-            target_object = getattr(self.postsynaptic_cell._cell, projection.receptor_type)
-        self.nc = state.parallel_context.gid_connect(int(self.presynaptic_cell), target_object)
-        self.nc.weight[0] = parameters.pop('weight')
-        # if we have a mechanism (e.g. from 9ML) that includes multiple
-        # synaptic channels, need to set nc.weight[1] here
-        if self.nc.wcnt() > 1 and hasattr(self.postsynaptic_cell._cell, "type"):
-            self.nc.weight[1] = self.postsynaptic_cell._cell.type.receptor_types.index(projection.receptor_type)
-        self.nc.delay = parameters.pop('delay')
+        self.nc = create_netcon(projection, self.presynaptic_cell, self.postsynaptic_cell,
+                                parameters.pop('weight'), parameters.pop('delay'))
         if projection.synapse_type.model is not None:
             self._setup_plasticity(projection.synapse_type, parameters)
-        # nc.threshold is supposed to be set by ParallelContext.threshold, called in _build_cell(), above, but this hasn't been tested
+
+    @classmethod
+    def from_netcon(cls, projection, pre, post, nc):
+        """
+        Return a Connection giving access to an existing static connection,
+        without creating a new NetCon.
+        """
+        connection = cls.__new__(cls)
+        connection.presynaptic_index = pre
+        connection.postsynaptic_index = post
+        connection.presynaptic_cell = projection.pre[pre]
+        connection.postsynaptic_cell = projection.post[post]
+        connection.nc = nc
+        return connection
 
     def _setup_plasticity(self, synapse_type, parameters):
         """
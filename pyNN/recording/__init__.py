@@ -13,8 +13,10 @@ internal use.
 import logging
 import numpy
 import os
+import shutil
+import tempfile
 from copy import copy
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from pyNN import errors
 import neo
 from datetime import datetime
@@ -23,6 +25,10 @@ try:
     basestring
 except NameError:
     basestring = str
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 logger = logging.getLogger("PyNN")
 
@@ -34,7 +40,8 @@ def get_mpi_comm():
         from mpi4py import MPI
     except ImportError:
         raise Exception("Trying to gather data without MPI installed. If you are not running a distributed simulation, this is a bug in PyNN.")
-    return MPI.COMM_WORLD, {'DOUBLE': MPI.DOUBLE, 'SUM': MPI.SUM}
+    return MPI.COMM_WORLD, {'DOUBLE': MPI.DOUBLE, 'INT': MPI.INT, 'INT64': MPI.INT64_T,
+                            'SUM': MPI.SUM, 'MIN': MPI.MIN, 'MAX': MPI.MAX}
 
 
 def rename_existing(filename):
@@ -43,25 +50,93 @@ def rename_existing(filename):
         logger.warning("File %s already exists. Renaming the original file to %s_old" % (filename, filename))
 
 
-def gather_array(data):
+def gather_array(data, all=False):
     # gather 1D or 2D numpy arrays
     mpi_comm, mpi_flags = get_mpi_comm()
     assert isinstance(data, numpy.ndarray)
     assert len(data.shape) < 3
     # first we pass the data size
     size = data.size
-    sizes = mpi_comm.gather(size, root=MPI_ROOT) or []
+    if all:
+        sizes = mpi_comm.allgather(size)
+    else:
+        sizes = mpi_comm.gather(size, root=MPI_ROOT) or []
     # now we pass the data
     displacements = [sum(sizes[:i]) for i in range(len(sizes))]
     gdata = numpy.empty(sum(sizes))
-    mpi_comm.Gatherv([data.flatten(), size, mpi_flags['DOUBLE']],
-                     [gdata, (sizes, displacements), mpi_flags['DOUBLE']],
-                     root=MPI_ROOT)
+    if all:
+        mpi_comm.Allgatherv([data.flatten(), size, mpi_flags['DOUBLE']],
+                            [gdata, (sizes, displacements), mpi_flags['DOUBLE']])
+    else:
+        mpi_comm.Gatherv([data.flatten(), size, mpi_flags['DOUBLE']],
+                         [gdata, (sizes, displacements), mpi_flags['DOUBLE']],
+                         root=MPI_ROOT)
     if len(data.shape) == 1:
         return gdata
     else:
         num_columns = data.shape[1]
-        return gdata.reshape((gdata.size / num_columns, num_columns))
+        return gdata.reshape((gdata.size // num_columns, num_columns))
+
+
+def _column_info(column):
+    """
+    Return whether `column` has an integer dtype, whether it contains any
+    data, and the largest absolute value of an integer column.
+    """
+    column = numpy.asarray(column)
+    is_integer = bool(numpy.issubdtype(column.dtype, numpy.integer))
+    max_abs = int(numpy.abs(column).max()) if (is_integer and column.size > 0) else 0
+    return is_integer, column.size > 0, max_abs
+
+
+def gather_columns(columns, all=False):
+    """
+    Gather a list of 1D arrays of equal length (e.g. the columns of a table of
+    connections) from all MPI nodes, with one `Gatherv` per column. The sizes,
+    displacements and data types are exchanged only once. Integer columns are
+    sent as 32-bit integers, or as 64-bit integers if any value on any node
+    does not fit in 32 bits, other columns as 64-bit floats. A column is
+    treated as integer if it has an integer dtype on all nodes which have
+    data for it.
+
+    Returns the concatenated columns on the root node (on all nodes if `all`
+    is True); other nodes get back their local columns.
+    """
+    mpi_comm, mpi_flags = get_mpi_comm()
+    size = len(columns[0]) if columns else 0
+    # all nodes must agree on the data type of each column
+    node_info = mpi_comm.allgather((size, [_column_info(column) for column in columns]))
+    sizes = [n for n, info in node_info]
+    receiving = all or mpi_comm.rank == MPI_ROOT
+    if receiving:
+        displacements = numpy.hstack(([0], numpy.cumsum(sizes)[:-1])).tolist()
+    gathered = []
+    for k, column in enumerate(columns):
+        column_info = [info[k] for n, info in node_info]
+        is_integer = (any(is_int for is_int, has_data, max_abs in column_info)
+                      and not any(has_data and not is_int for is_int, has_data, max_abs in column_info))
+        if is_integer:
+            if max(max_abs for is_int, has_data, max_abs in column_info) > numpy.iinfo(numpy.int32).max:
+                data = numpy.ascontiguousarray(column, dtype=numpy.int64)
+                mpi_type = mpi_flags['INT64']
+            else:
+                data = numpy.ascontiguousarray(column, dtype=numpy.int32)
+                mpi_type = mpi_flags['INT']
+        else:
+            data = numpy.ascontiguousarray(column, dtype=numpy.float64)
+            mpi_type = mpi_flags['DOUBLE']
+        if receiving:
+            result = numpy.empty((sum(sizes),), dtype=data.dtype)
+            recvbuf = [result, (sizes, displacements), mpi_type]
+        else:
+            result = data
+            recvbuf = None
+        if all:
+            mpi_comm.Allgatherv([data, size, mpi_type], recvbuf)
+        else:
+            mpi_comm.Gatherv([data, size, mpi_type], recvbuf, root=MPI_ROOT)
+        gathered.append(result)
+    return gathered
 
 
 def gather_dict(D, all=False):
@@ -78,24 +153,115 @@ def gather_dict(D, all=False):
     return D
 
 
+def _segment_metadata(segment):
+    """
+    Return the information needed to rebuild the spike trains and signals in
+    `segment`, other than the data themselves.
+    """
+    spikes = None
+    if segment.spiketrains:
+        st = segment.spiketrains[0]
+        spikes = {'t_start': float(st.t_start.rescale(pq.ms)),
+                  't_stop': float(st.t_stop.rescale(pq.ms)),
+                  'source_population': st.annotations.get('source_population')}
+    signals = {}
+    for signal in segment.analogsignalarrays:
+        annotations = dict(signal.annotations)
+        annotations.pop('source_ids', None)
+        signals[signal.name] = {'units': signal.units.dimensionality.string,
+                                't_start': float(signal.t_start.rescale(pq.ms)),
+                                'sampling_period': float(signal.sampling_period.rescale(pq.ms)),
+                                'n_samples': signal.shape[0],
+                                'annotations': annotations}
+    return {'spikes': spikes, 'signals': signals}
+
+
+def _gather_spiketrains(segment, metadata, ordered, root):
+    spiketrains = segment.spiketrains
+    ids = numpy.array([st.annotations['source_id'] for st in spiketrains], dtype=int)
+    indices = numpy.array([st.annotations['source_index'] for st in spiketrains], dtype=int)
+    counts = numpy.array([len(st) for st in spiketrains], dtype=int)
+    if spiketrains:
+        times = numpy.hstack([st.rescale(pq.ms).magnitude for st in spiketrains])
+    else:
+        times = numpy.array([], dtype=float)
+    ids, indices, counts = gather_columns([ids, indices, counts])
+    times, = gather_columns([times])
+    spikes = [m['spikes'] for m in metadata if m['spikes'] is not None]
+    if not (root and spikes):
+        return []
+    order = numpy.argsort(ids, kind='mergesort') if ordered else numpy.arange(ids.size)
+    trains = numpy.split(times, numpy.cumsum(counts)[:-1]) if counts.size > 0 else []
+    return [neo.SpikeTrain(trains[k],
+                           t_start=spikes[0]['t_start'],
+                           t_stop=spikes[0]['t_stop'],
+                           units='ms',
+                           source_population=spikes[0]['source_population'],
+                           source_id=int(ids[k]),
+                           source_index=int(indices[k]))
+            for k in order]
+
+
+def _gather_signal(segment, name, metadata, ordered, root):
+    signals = [sig for sig in segment.analogsignalarrays if sig.name == name]
+    if signals:
+        signal = signals[0]
+        index = numpy.asarray(signal.channel_index, dtype=int)
+        source_ids = numpy.asarray(signal.annotations.get('source_ids', index), dtype=int)
+        values = signal.magnitude.T.ravel()  # one channel after another
+    else:  # none of the recorded cells are on this MPI node
+        index = source_ids = numpy.array([], dtype=int)
+        values = numpy.array([], dtype=float)
+    index, source_ids = gather_columns([index, source_ids])
+    values, = gather_columns([values])
+    if not root:
+        return None
+    info = [m['signals'][name] for m in metadata if name in m['signals']][0]
+    values = values.reshape((index.size, info['n_samples'])).T
+    if ordered:
+        order = numpy.argsort(index, kind='mergesort')
+        index, source_ids, values = index[order], source_ids[order], values[:, order]
+    return neo.AnalogSignalArray(values,
+                                 units=info['units'],
+                                 t_start=info['t_start'] * pq.ms,
+                                 sampling_period=info['sampling_period'] * pq.ms,
+                                 name=name,
+                                 channel_index=index,
+                                 source_ids=source_ids,
+                                 **info['annotations'])
+
+
 def gather_blocks(data, ordered=True):
-    """Gather Neo Blocks"""
+    """
+    Gather Neo Blocks from all MPI nodes onto the root node.
+
+    Rather than pickling the Blocks, the spike times and signals are packed
+    into contiguous arrays, which are gathered with `Gatherv` (see
+    `gather_columns()`), and the Block is rebuilt once on the root node.
+    Only a small amount of metadata (units, start times, etc.) is pickled.
+    Other nodes get back their local data.
+    """
     mpi_comm, mpi_flags = get_mpi_comm()
     assert isinstance(data, neo.Block)
-    # for now, use gather_dict, which will probably be slow. Can optimize later
-    D = {mpi_comm.rank: data}
-    D = gather_dict(D)
-    blocks = D.values()
-    merged = data
-    if mpi_comm.rank == MPI_ROOT:    
-        merged = blocks[0]
-        for block in blocks[1:]:
-            merged.merge(block)
-    if ordered:
-        for segment in merged.segments:
-            ordered_spiketrains = sorted(segment.spiketrains, key=lambda s: s.annotations['source_id'])
-            segment.spiketrains = ordered_spiketrains
-    return merged
+    # all nodes need the metadata, so that they take part in the same
+    # sequence of collective operations
+    metadata = mpi_comm.allgather([_segment_metadata(segment) for segment in data.segments])
+    root = mpi_comm.rank == MPI_ROOT
+    merged = neo.Block(name=data.name, description=data.description,
+                       rec_datetime=data.rec_datetime, **data.annotations)
+    for k, segment in enumerate(data.segments):
+        segment_metadata = [node_metadata[k] for node_metadata in metadata]
+        new_segment = neo.Segment(name=segment.name, description=segment.description,
+                                  rec_datetime=segment.rec_datetime, **segment.annotations)
+        new_segment.spiketrains = _gather_spiketrains(segment, segment_metadata, ordered, root)
+        names = sorted(set().union(*[m['signals'].keys() for m in segment_metadata]))
+        new_segment.analogsignalarrays = [_gather_signal(segment, name, segment_metadata, ordered, root)
+                                          for name in names]
+        merged.segments.append(new_segment)
+    if root:
+        return merged
+    else:
+        return data
 
 
 def mpi_sum(x):
@@ -106,6 +272,22 @@ def mpi_sum(x):
         return x
 
 
+def mpi_min(x):
+    mpi_comm, mpi_flags = get_mpi_comm()
+    if mpi_comm.size > 1:
+        return mpi_comm.allreduce(x, op=mpi_flags['MIN'])
+    else:
+        return x
+
+
+def mpi_max(x):
+    mpi_comm, mpi_flags = get_mpi_comm()
+    if mpi_comm.size > 1:
+        return mpi_comm.allreduce(x, op=mpi_flags['MAX'])
+    else:
+        return x
+
+
 def normalize_variables_arg(variables):
     """If variables is a single string, encapsulate it in a list."""
     if isinstance(variables, basestring) and variables != 'all':
@@ -162,6 +344,36 @@ def filter_by_variables(segment, variables):
         return new_segment
 
 
+def filter_by_ids(segment, indices):
+    """
+    Return a new `Segment` containing only recordings from the neurons whose
+    indices within the population are given in `indices`. If `indices` is
+    `None`, return `segment` unchanged.
+    """
+    if indices is None:
+        return segment
+    indices = numpy.asarray(indices, dtype=int)
+    new_segment = copy(segment)  # shallow copy
+    new_segment.spiketrains = [st for st in segment.spiketrains
+                               if st.annotations["source_index"] in indices]
+    new_segment.analogsignalarrays = []
+    for signal in segment.analogsignalarrays:
+        mask = numpy.in1d(signal.channel_index, indices)
+        if mask.any():
+            annotations = dict(signal.annotations)
+            if "source_ids" in annotations:
+                annotations["source_ids"] = numpy.asarray(annotations["source_ids"])[mask]
+            new_segment.analogsignalarrays.append(
+                neo.AnalogSignalArray(signal.magnitude[:, mask],
+                                      units=signal.units,
+                                      t_start=signal.t_start,
+                                      sampling_period=signal.sampling_period,
+                                      name=signal.name,
+                                      channel_index=numpy.asarray(signal.channel_index)[mask],
+                                      **annotations))
+    return new_segment
+
+
 def remove_duplicate_spiketrains(data):
     for segment in data.segments:
         spiketrains = {}
@@ -174,26 +386,266 @@ def remove_duplicate_spiketrains(data):
     return data
 
 
+def _segment_id(segment):
+    """Return a key which identifies a segment stored in a cache."""
+    return (segment.name, segment.rec_datetime)
+
+
+def _segment_to_arrays(segment, variables):
+    """
+    Convert a Neo `Segment` to the plain NumPy representation returned by
+    `Recorder.get_arrays()`.
+    """
+    data = {}
+    if segment.spiketrains and (variables == 'all' or 'spikes' in variables):
+        counts = [len(st) for st in segment.spiketrains]
+        data['spikes'] = {
+            'index': numpy.repeat([st.annotations["source_index"] for st in segment.spiketrains],
+                                  counts).astype(int),
+            'times': numpy.hstack([st.rescale(pq.ms).magnitude for st in segment.spiketrains])
+        }
+    for signal in segment.analogsignalarrays:
+        if variables == 'all' or signal.name in variables:
+            data[signal.name] = {'times': signal.times.rescale(pq.ms).magnitude,
+                                 'values': signal.magnitude,
+                                 'index': numpy.asarray(signal.channel_index, dtype=int)}
+    return data
+
+
+def _sort_arrays(data):
+    """Sort the arrays returned by `Recorder.get_arrays()` by neuron index."""
+    for variable, arrays in data.items():
+        order = numpy.argsort(arrays['index'], kind='mergesort')
+        arrays['index'] = arrays['index'][order]
+        if variable == 'spikes':
+            arrays['times'] = arrays['times'][order]
+        else:
+            arrays['values'] = arrays['values'][:, order]
+
+
+def gather_arrays(data):
+    """
+    Gather the plain NumPy representation of a segment, as returned by
+    `Recorder.get_arrays()`, from all MPI nodes to all nodes, with one
+    `Gatherv` per array.
+    """
+    mpi_comm, mpi_flags = get_mpi_comm()
+    # all nodes must take part in the same sequence of collective operations,
+    # including those which have no data for some of the variables
+    variables = sorted(set().union(*mpi_comm.allgather(list(data.keys()))))
+    gathered = {}
+    for variable in variables:
+        if variable == 'spikes':
+            arrays = data.get(variable, {'index': numpy.array([], dtype=int),
+                                         'times': numpy.array([], dtype=float)})
+            index, times = gather_columns([arrays['index'], arrays['times']], all=True)
+            gathered[variable] = {'index': index.astype(int), 'times': times}
+        else:
+            arrays = data.get(variable, {'index': numpy.array([], dtype=int),
+                                         'values': numpy.empty((0, 0)),
+                                         'times': numpy.array([], dtype=float)})
+            index, = gather_columns([arrays['index']], all=True)
+            # the values are sent column by column, i.e. one neuron after another
+            values, = gather_columns([arrays['values'].T.ravel()], all=True)
+            times, = gather_columns([arrays['times']], all=True)
+            n_samples = values.size // index.size if index.size > 0 else 0
+            gathered[variable] = {'times': times[:n_samples],  # identical on all nodes which have data
+                                  'values': values.reshape((index.size, n_samples)).T,
+                                  'index': index.astype(int)}
+    return gathered
+
+
 class DataCache(object):
-    # primitive implementation for now, storing in memory - later can consider caching to disk
+    """
+    Storage in memory for the Neo `Segment`s containing the data recorded
+    before each call to `reset()`.
+    """
 
     def __init__(self):
         self._data = []
+        self._ids = set()
 
     def __iter__(self):
         return iter(self._data)
 
+    def __len__(self):
+        return len(self._data)
+
     def store(self, obj):
-        if obj not in self._data:
+        if _segment_id(obj) not in self._ids:
             logger.debug("Adding %s to cache" % obj)
+            self._ids.add(_segment_id(obj))
             self._data.append(obj)
 
     def clear(self):
         self._data = []
+        self._ids = set()
+
+
+class DiskDataCache(DataCache):
+    """
+    Storage on disk for the Neo `Segment`s containing the data recorded
+    before each call to `reset()`, for experiments with many trials.
+
+    Each segment is pickled to its own file in `directory` (by default, a new
+    temporary directory, which is deleted with the cache) when it is stored.
+    The files in a directory given explicitly are kept when the cache is
+    deleted, and removed only by `clear()`.
+    Only the `max_in_memory` most recently used segments are kept in memory;
+    the others are loaded from disk when needed, while iterating over the
+    cache.
+
+    To use this cache for all recorders, set `Recorder.cache_class`, e.g.
+    to `DiskDataCache` or to `functools.partial(DiskDataCache, directory=...)`.
+    """
+
+    def __init__(self, directory=None, max_in_memory=2):
+        self._temporary = directory is None
+        if self._temporary:
+            directory = tempfile.mkdtemp(prefix="pyNN_cache_")
+        else:
+            safe_makedirs(directory)
+        self.directory = directory
+        self.max_in_memory = max_in_memory
+        self._working_set = OrderedDict()
+        DataCache.__init__(self)
+
+    def __del__(self):
+        # files in a directory given by the user are kept. At interpreter
+        # shutdown, module globals such as `shutil` may already be None.
+        if getattr(self, "_temporary", False) and shutil is not None:
+            try:
+                shutil.rmtree(self.directory, ignore_errors=True)
+            except Exception:
+                pass
+
+    def __iter__(self):
+        for path in self._data:
+            yield self._load(path)
+
+    def _load(self, path):
+        if path in self._working_set:
+            segment = self._working_set.pop(path)
+        else:
+            logger.debug("Loading cached segment from %s" % path)
+            with open(path, 'rb') as f:
+                segment = pickle.load(f)
+        self._remember(path, segment)
+        return segment
+
+    def _remember(self, path, segment):
+        self._working_set[path] = segment  # most recently used last
+        while len(self._working_set) > self.max_in_memory:
+            self._working_set.popitem(last=False)
+
+    def store(self, obj):
+        if _segment_id(obj) not in self._ids:
+            path = os.path.join(self.directory, "segment%d_%d.pkl" % (id(self), len(self._data)))
+            logger.debug("Adding %s to cache in %s" % (obj, path))
+            with open(path, 'wb') as f:
+                pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+            self._ids.add(_segment_id(obj))
+            self._data.append(path)
+            self._remember(path, obj)
+
+    def clear(self):
+        for path in getattr(self, "_data", []):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        DataCache.clear(self)
+        self._working_set = OrderedDict()
+
+
+def _append_chunk(segment, chunk):
+    """
+    Extend the spike trains and signals in `segment` with those in `chunk`,
+    which contains the data recorded immediately after those in `segment`.
+    """
+    segment.annotate(**chunk.annotations)
+    spiketrains = dict((st.annotations["source_index"], k)
+                       for k, st in enumerate(segment.spiketrains))
+    for st in chunk.spiketrains:
+        k = spiketrains.get(st.annotations["source_index"])
+        if k is None:
+            segment.spiketrains.append(st)
+        else:
+            previous = segment.spiketrains[k]
+            segment.spiketrains[k] = neo.SpikeTrain(
+                numpy.hstack((previous.magnitude, st.rescale(previous.units).magnitude)),
+                t_start=previous.t_start,
+                t_stop=st.t_stop,
+                units=previous.units,
+                **previous.annotations)
+    signals = dict((sig.name, k) for k, sig in enumerate(segment.analogsignalarrays))
+    for sig in chunk.analogsignalarrays:
+        k = signals.get(sig.name)
+        if k is None:
+            segment.analogsignalarrays.append(sig)
+        else:
+            previous = segment.analogsignalarrays[k]
+            # depending on the backend, the sample at the time of the flush
+            # may be present in both chunks
+            overlap = int(round(float(((previous.t_stop - sig.t_start) / previous.sampling_period).simplified)))
+            segment.analogsignalarrays[k] = neo.AnalogSignalArray(
+                numpy.vstack((previous.magnitude,
+                              sig.rescale(previous.units).magnitude[max(overlap, 0):])),
+                units=previous.units,
+                t_start=previous.t_start,
+                sampling_period=previous.sampling_period,
+                name=previous.name,
+                channel_index=previous.channel_index,
+                **previous.annotations)
+
+
+class SegmentStream(object):
+    """
+    Storage on disk for recorded data, as a sequence of chunks, each of which
+    is a Neo `Segment` containing the data recorded between two flushes. The
+    chunks are pickled and appended to the file one at a time, so that the
+    data need not all be held in memory.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        safe_makedirs(os.path.dirname(filename))
+        self.clear()
+
+    def __iter__(self):
+        """Iterate over the chunks."""
+        with open(self.filename, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    break
+
+    def append(self, chunk):
+        with open(self.filename, 'ab') as f:
+            pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+
+    def read(self):
+        """
+        Return a list of Neo `Segment`s, in which all the chunks belonging to
+        the same segment (i.e. recorded between two calls to `reset()`) have
+        been merged.
+        """
+        segments = []
+        for chunk in self:
+            if segments and segments[-1].name == chunk.name:
+                _append_chunk(segments[-1], chunk)
+            else:
+                segments.append(chunk)
+        return segments
+
+    def clear(self):
+        open(self.filename, 'wb').close()
 
 
 class Recorder(object):
     """Encapsulates data and functions related to recording model variables."""
+    cache_class = DataCache
 
     def __init__(self, population, file=None):
         """
@@ -209,11 +661,13 @@ class Recorder(object):
         self.file = file
         self.population = population  # needed for writing header information
         self.recorded = defaultdict(set)
-        self.cache = DataCache()
+        self.cache = self.cache_class()
         self._simulator.state.recorders.add(self)
         self.clear_flag = False
         self._recording_start_time = self._simulator.state.t * pq.ms
         self.sampling_interval = self._simulator.state.dt
+        self.stream_to = None
+        self.flush_interval = None
 
     def record(self, variables, ids, sampling_interval=None):
         """
@@ -232,6 +686,43 @@ class Recorder(object):
             self.recorded[variable] = self.recorded[variable].union(ids)
             self._record(variable, new_ids, sampling_interval)
 
+    def stream(self, filename, flush_interval):
+        """
+        Instead of keeping the recorded data in memory until they are
+        retrieved, write them to the file `filename` every `flush_interval`
+        ms during the simulation, and clear them from the simulator.
+        """
+        if self._simulator.state.num_processes > 1:
+            filename += '.%d' % self._simulator.state.mpi_rank
+        self.stream_to = SegmentStream(filename)
+        self.flush_interval = flush_interval
+        self._next_flush = self._simulator.state.t + flush_interval
+
+    def flush(self, annotations=None):
+        """
+        If streaming, write the data recorded since the last flush to the
+        stream file and clear them from the simulator.
+        """
+        if self.stream_to is None:
+            return
+        if self._simulator.state.t * pq.ms > self._recording_start_time:
+            chunk = self._get_current_segment(clear=True)
+            if annotations:
+                chunk.annotate(**annotations)
+            self.stream_to.append(chunk)
+            self._clear_simulator()
+            self._recording_start_time = self._simulator.state.t * pq.ms
+
+    def flush_callback(self, t):
+        """
+        Callback for `run_until()`, which flushes the data every
+        `flush_interval` ms.
+        """
+        if t + 1e-9 >= self._next_flush:
+            self.flush()
+            self._next_flush = t + self.flush_interval
+        return self._next_flush
+
     def reset(self):
         """Reset the list of things to be recorded."""
         self._reset()
@@ -253,15 +744,17 @@ class Recorder(object):
         for variable in variables_to_include:
             if variable == 'spikes':
                 t_stop = self._simulator.state.t * pq.ms  # must run on all MPI nodes
+                ids = sorted(self.filter_recorded('spikes', filter_ids))
+                spiketimes = self._get_all_spiketimes(ids)
                 segment.spiketrains = [
-                    neo.SpikeTrain(self._get_spiketimes(id),
+                    neo.SpikeTrain(spiketimes[id],
                                    t_start=self._recording_start_time,
                                    t_stop=t_stop,
                                    units='ms',
                                    source_population=self.population.label,
                                    source_id=int(id),
                                    source_index=self.population.id_to_index(id))
-                    for id in sorted(self.filter_recorded('spikes', filter_ids))]
+                    for id in ids]
             else:
                 ids = sorted(self.filter_recorded(variable, filter_ids))
                 signal_array = self._get_all_signals(variable, ids, clear=clear)
@@ -289,15 +782,110 @@ class Recorder(object):
                     # need to add `Unit` and `RecordingChannelGroup` objects
         return segment
 
+    def _get_all_spiketimes(self, ids):
+        """
+        Return a dict containing an array of spike times for each of the
+        cells in `ids`. Backends which can retrieve the spike times of many
+        cells at once more efficiently than one at a time should override this.
+        """
+        return dict((id, self._get_spiketimes(id)) for id in ids)
+
+    def _get_spike_arrays(self, ids):
+        """
+        Return the spikes of the cells in `ids` as two arrays, containing the
+        ID of the cell which emitted each spike and the spike time, in ms.
+        Backends which hold the spikes as arrays of events should override
+        this, so that no per-cell arrays are created.
+        """
+        spiketimes = self._get_all_spiketimes(ids)
+        counts = [len(spiketimes[id]) for id in ids]
+        senders = numpy.repeat(numpy.array(ids, dtype=int), counts)
+        if ids:
+            times = numpy.hstack([spiketimes[id] for id in ids]).astype(float)
+        else:
+            times = numpy.array([], dtype=float)
+        return senders, times
+
+    def _ids_to_indices(self, ids):
+        if len(ids) == 0:
+            return numpy.array([], dtype=int)
+        return numpy.asarray(self.population.id_to_index(numpy.asarray(ids, dtype=int)), dtype=int)
+
+    def _get_current_arrays(self, filter_ids=None, variables='all', clear=False):
+        data = {}
+        variables_to_include = set(self.recorded.keys())
+        if variables != 'all':
+            variables_to_include = variables_to_include.intersection(set(variables))
+        # the variables are retrieved in the same order on all MPI nodes
+        for variable in sorted(variables_to_include):
+            ids = sorted(self.filter_recorded(variable, filter_ids))
+            if variable == 'spikes':
+                senders, times = self._get_spike_arrays(ids)
+                data['spikes'] = {'index': self._ids_to_indices(senders), 'times': times}
+            else:
+                signal_array = self._get_all_signals(variable, ids, clear=clear)
+                if signal_array.size > 0:
+                    index = self._ids_to_indices(ids)
+                    t_start = float(self._recording_start_time.rescale(pq.ms))
+                    times = t_start + numpy.arange(signal_array.shape[0]) * self.sampling_interval
+                else:  # none of the recorded cells are on this MPI node
+                    signal_array = numpy.empty((0, 0))
+                    index = numpy.array([], dtype=int)
+                    times = numpy.array([], dtype=float)
+                data[variable] = {'times': times, 'values': signal_array, 'index': index}
+        return data
+
+    def get_arrays(self, variables, gather=False, filter_ids=None, clear=False):
+        """
+        Return the recorded data as plain NumPy arrays, rather than as a Neo
+        `Block`, as a list containing one dict per segment.
+
+        For spikes, the dict contains an entry 'spikes', a dict containing
+        arrays 'index' (the index of the neuron in the population) and 'times'
+        (in ms), sorted by index. For each other variable, it contains a dict
+        with an array 'times' (in ms), a 2D array 'values', with one row per
+        time point and one column per neuron, and an array 'index' giving the
+        neuron for each column, sorted by index.
+        """
+        variables = normalize_variables_arg(variables)
+        indices = None
+        if filter_ids is not None:
+            indices = self._ids_to_indices(sorted(filter_ids))
+        if self.stream_to is not None:
+            self.flush()
+            segments = [_segment_to_arrays(filter_by_ids(segment, indices), variables)
+                        for segment in self.stream_to.read()]
+        else:
+            segments = [_segment_to_arrays(filter_by_ids(segment, indices), variables)
+                        for segment in self.cache]
+            if self._simulator.state.running:  # reset() has not been called, so current segment is not in cache
+                segments.append(self._get_current_arrays(filter_ids, variables, clear))
+        if (gather and self._simulator.state.num_processes > 1
+                and not getattr(self.population.celltype, "always_local", False)):
+            segments = [gather_arrays(segment) for segment in segments]
+        for segment in segments:
+            _sort_arrays(segment)
+        if clear:
+            self.clear()
+        return segments
+
     def get(self, variables, gather=False, filter_ids=None, clear=False,
             annotations=None):
         """Return the recorded data as a Neo `Block`."""
         variables = normalize_variables_arg(variables)
         data = neo.Block()
-        data.segments = [filter_by_variables(segment, variables)
-                         for segment in self.cache]
-        if self._simulator.state.running:  # reset() has not been called, so current segment is not in cache
-            data.segments.append(self._get_current_segment(filter_ids=filter_ids, variables=variables, clear=clear))
+        if self.stream_to is not None:
+            self.flush()
+            indices = None
+            if filter_ids is not None:
+                indices = self._ids_to_indices(sorted(filter_ids))
+            data.segments = [filter_by_ids(filter_by_variables(segment, variables), indices)
+                             for segment in self.stream_to.read()]
+        else:
+            data.segments = [filter_by_variables(segment, variables)
+                             for segment in self.cache]
+            if self._simulator.state.running:  # reset() has not been called, so current segment is not in cache
+                data.segments.append(self._get_current_segment(filter_ids=filter_ids, variables=variables, clear=clear))
         data.name = self.population.label
         data.description = self.population.describe()
         data.rec_datetime = data.segments[0].rec_datetime
@@ -317,6 +905,8 @@ class Recorder(object):
         Clear all recorded data, both from the cache and the simulator.
         """
         self.cache.clear()
+        if self.stream_to is not None:
+            self.stream_to.clear()
         self.clear_flag = True
         self._recording_start_time = self._simulator.state.t * pq.ms
         self._clear_simulator()
@@ -372,8 +962,13 @@ class Recorder(object):
         if (self._simulator.state.t != 0) and (not self.clear_flag):
             if annotations is None:
                 annotations = {}
-            segment = self._get_current_segment()
-            segment.annotate(**annotations)
-            self.cache.store(segment)
+            if self.stream_to is not None:
+                self.flush(annotations)
+            else:
+                segment = self._get_current_segment()
+                segment.annotate(**annotations)
+                self.cache.store(segment)
         self.clear_flag = False
         self._recording_start_time = 0.0 * pq.ms
+        if self.stream_to is not None:
+            self._next_flush = self.flush_interval
@@ -7,6 +7,7 @@ Classes:
     StandardTextFile
     PickleFile
     NumpyBinaryFile
+    BinaryConnectionFile
     HDF5ArrayFile - requires PyTables
 
 :copyright: Copyright 2006-2016 by the PyNN team, see AUTHORS.
@@ -17,6 +18,9 @@ Classes:
 import numpy
 import os
 import shutil
+import json
+import struct
+from itertools import islice
 try:
     import cPickle as pickle
 except ImportError:
@@ -130,6 +134,18 @@ class BaseFile(object):
         """
         raise NotImplementedError
 
+    def read_chunks(self, chunk_size):
+        """
+        Read data from the file and return an iterator over NumPy arrays
+        containing at most `chunk_size` rows each.
+
+        Subclasses should override this if they can avoid reading the entire
+        array into memory.
+        """
+        data = self.read()
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
     def get_metadata(self):
         """
         Read metadata from the file and return a dict.
@@ -166,6 +182,17 @@ class StandardTextFile(BaseFile):
         self._check_open()
         return numpy.loadtxt(self.fileobj)
 
+    def read_chunks(self, chunk_size):
+        __doc__ = BaseFile.read_chunks.__doc__
+        self._check_open()
+        lines = (line for line in self.fileobj
+                 if line.strip() and line.lstrip()[:1] not in ("#", b"#"))
+        chunk = list(islice(lines, chunk_size))
+        while chunk:
+            yield numpy.loadtxt(chunk, ndmin=2)
+            chunk = list(islice(lines, chunk_size))
+        self.fileobj.seek(0)
+
     def get_metadata(self):
         self._check_open()
         D = {}
@@ -242,6 +269,203 @@ class NumpyBinaryFile(BaseFile):
         return D
 
 
+class BinaryConnectionFile(BaseFile):
+    """
+    Connection data are saved in a compact binary format, which may be
+    memory-mapped when reading.
+
+    The file contains a short header (a magic string, and the column names,
+    data types and metadata encoded as JSON), followed by the connections as
+    packed records, sorted by post-synaptic index (the second column), and by
+    an index giving the offset of the first record for each post-synaptic
+    index. The first two columns are stored as integers, the remaining ones as
+    floating-point numbers of type `dtype`.
+
+    The index makes it possible to read only the connections for a given set
+    of post-synaptic neurons (see `read_targets()`), e.g. those on the local
+    MPI node.
+    """
+    magic = b"PYNNCONN"
+    version = 1
+
+    def __init__(self, filename, mode='rb', dtype=numpy.float64):
+        BaseFile.__init__(self, filename, mode)
+        self.dtype = numpy.dtype(dtype)
+        self._header = None
+
+    @classmethod
+    def is_binary_connection_file(cls, filename):
+        """Determine whether the file `filename` is in this format."""
+        try:
+            with open(filename, 'rb') as f:
+                return f.read(len(cls.magic)) == cls.magic
+        except IOError:
+            return False
+
+    @staticmethod
+    def _record_type(columns, index_type, dtype):
+        return numpy.dtype([(str(name), index_type if k < 2 else dtype)
+                            for k, name in enumerate(columns)]).newbyteorder('<')
+
+    @classmethod
+    def _encode_header(cls, record_type, n_rows, n_targets, metadata):
+        header = json.dumps({"version": cls.version,
+                             "columns": list(record_type.names),
+                             "dtypes": [record_type[name].str for name in record_type.names],
+                             "n_rows": n_rows,
+                             "n_targets": n_targets,
+                             "metadata": metadata}, default=str).encode('utf-8')
+        header += b" " * (-(len(cls.magic) + 8 + len(header)) % 8)  # align the data
+        return cls.magic + struct.pack("<Q", len(header)) + header
+
+    def write(self, data, metadata):
+        __doc__ = BaseFile.write.__doc__
+        self._check_open()
+        columns = metadata.get("columns", ["i", "j", "weight", "delay"])
+        data = numpy.asarray(data, dtype=float).reshape((-1, len(columns)))
+        index_type = numpy.int32
+        if data.size > 0 and data[:, :2].max() >= numpy.iinfo(numpy.int32).max:
+            index_type = numpy.int64
+        record_type = self._record_type(columns, index_type, self.dtype)
+        data = data[numpy.argsort(data[:, 1], kind='mergesort')]
+        records = numpy.empty((data.shape[0],), dtype=record_type)
+        for k, name in enumerate(record_type.names):
+            records[name] = data[:, k]
+        targets = records[record_type.names[1]]
+        n_targets = int(targets.max()) + 1 if targets.size > 0 else 0
+        index = numpy.hstack(([0], numpy.cumsum(numpy.bincount(targets, minlength=n_targets))))
+        self.fileobj.write(self._encode_header(record_type, records.size, n_targets, metadata))
+        self.fileobj.write(records.tobytes())
+        self.fileobj.write(index.astype('<i8').tobytes())
+        self.fileobj.close()
+
+    @classmethod
+    def write_parallel(cls, filename, columns, metadata, n_targets, dtype=numpy.float64):
+        """
+        Write connection data that are distributed over several MPI nodes to
+        a single file, each node writing its own connections directly into
+        the file with MPI-IO, so that no node needs to hold all the data.
+
+        `columns` is a list of 1D arrays, containing the pre- and post-
+        synaptic indices followed by the attribute values, with one element
+        per local connection. All the connections to a given post-synaptic
+        neuron must be on the same node. `n_targets` is the number of
+        post-synaptic neurons.
+
+        Must be called on all nodes.
+        """
+        from mpi4py import MPI
+        mpi_comm = MPI.COMM_WORLD
+        local_max = max([int(column.max()) for column in columns[:2] if column.size > 0] + [0])
+        index_type = numpy.int32
+        if mpi_comm.allreduce(local_max, op=MPI.MAX) >= numpy.iinfo(numpy.int32).max:
+            index_type = numpy.int64
+        record_type = cls._record_type(metadata["columns"], index_type, numpy.dtype(dtype))
+        # local connections, sorted by post-synaptic index
+        order = numpy.argsort(columns[1], kind='mergesort')
+        records = numpy.empty((order.size,), dtype=record_type)
+        for name, column in zip(record_type.names, columns):
+            records[name] = column[order]
+        local_counts = numpy.bincount(records[record_type.names[1]], minlength=n_targets).astype(numpy.int64)
+        counts = numpy.empty_like(local_counts)
+        mpi_comm.Allreduce(local_counts, counts, op=MPI.SUM)
+        index = numpy.hstack(([0], numpy.cumsum(counts)))
+        header = cls._encode_header(record_type, int(index[-1]), n_targets, metadata)
+        fh = MPI.File.Open(mpi_comm, filename, MPI.MODE_CREATE | MPI.MODE_WRONLY)
+        fh.Set_size(0)
+        if mpi_comm.rank == 0:
+            fh.Write_at(0, header)
+            fh.Write_at(len(header) + int(index[-1]) * record_type.itemsize,
+                        index.astype('<i8'))
+        # since post-synaptic neurons are not shared between nodes, the
+        # records for each local target go in a single block at the offset
+        # given by the index
+        local_targets = numpy.nonzero(local_counts)[0]
+        etype = MPI.BYTE.Create_contiguous(record_type.itemsize).Commit()
+        filetype = etype.Create_indexed(local_counts[local_targets].tolist(),
+                                        index[local_targets].tolist()).Commit()
+        fh.Set_view(len(header), etype, filetype)
+        fh.Write_all([records.view(numpy.uint8), MPI.BYTE])
+        fh.Close()
+        filetype.Free()
+        etype.Free()
+
+    def rename(self, filename):
+        BaseFile.rename(self, filename)
+        self._header = None
+
+    def _read_header(self):
+        if self._header is None:
+            self._check_open()
+            self.fileobj.seek(0)
+            if self.fileobj.read(len(self.magic)) != self.magic:
+                raise IOError("%s is not a binary connection file" % self.name)
+            header_length, = struct.unpack("<Q", self.fileobj.read(8))
+            header = json.loads(self.fileobj.read(header_length).decode('utf-8'))
+            header["record_type"] = numpy.dtype([(str(name), str(dtype))
+                                                 for name, dtype in zip(header["columns"], header["dtypes"])])
+            header["data_offset"] = len(self.magic) + 8 + header_length
+            header["index_offset"] = header["data_offset"] + header["n_rows"] * header["record_type"].itemsize
+            self.fileobj.seek(0)
+            self._header = header
+        return self._header
+
+    def _records(self):
+        """Return the connection records as a memory-mapped structured array."""
+        header = self._read_header()
+        if header["n_rows"] == 0:
+            return numpy.empty((0,), dtype=header["record_type"])
+        return numpy.memmap(self.name, dtype=header["record_type"], mode='r',
+                            offset=header["data_offset"], shape=(header["n_rows"],))
+
+    def _index(self):
+        header = self._read_header()
+        return numpy.memmap(self.name, dtype='<i8', mode='r',
+                            offset=header["index_offset"], shape=(header["n_targets"] + 1,))
+
+    def _as_array(self, records):
+        return numpy.column_stack([records[name] for name in records.dtype.names]).astype(float)
+
+    def read(self):
+        __doc__ = BaseFile.read.__doc__
+        return self._as_array(self._records())
+
+    def read_chunks(self, chunk_size):
+        __doc__ = BaseFile.read_chunks.__doc__
+        records = self._records()
+        for start in range(0, records.size, chunk_size):
+            yield self._as_array(records[start:start + chunk_size])
+
+    def read_targets(self, targets, chunk_size):
+        """
+        Return an iterator over NumPy arrays containing the connections
+        whose post-synaptic index is in `targets` (an array of indices, in
+        ascending order), reading at most about `chunk_size` connections at a
+        time and seeking directly to the connections for each target.
+        """
+        records = self._records()
+        index = self._index()
+        targets = numpy.asarray(targets, dtype=int)
+        targets = targets[targets < index.size - 1]
+        starts = index[targets]
+        counts = index[targets + 1] - starts
+        cumulative_counts = numpy.cumsum(counts)
+        first = 0
+        while first < targets.size:
+            n_before = cumulative_counts[first] - counts[first]
+            last = max(numpy.searchsorted(cumulative_counts, n_before + chunk_size, 'right'),
+                       first + 1)
+            sizes = counts[first:last]
+            offsets = numpy.cumsum(sizes) - sizes
+            rows = numpy.repeat(starts[first:last] - offsets, sizes) + numpy.arange(sizes.sum())
+            yield self._as_array(records[rows])
+            first = last
+
+    def get_metadata(self):
+        __doc__ = BaseFile.get_metadata.__doc__
+        return self._read_header()["metadata"]
+
+
 if have_hdf5:
     class HDF5ArrayFile(BaseFile):
         """
@@ -273,6 +497,12 @@ if have_hdf5:
             __doc__ = BaseFile.read.__doc__
             return self.fileobj.root.data.read()
 
+        def read_chunks(self, chunk_size):
+            __doc__ = BaseFile.read_chunks.__doc__
+            node = self.fileobj.root.data
+            for start in range(0, node.nrows, chunk_size):
+                yield node.read(start, min(start + chunk_size, node.nrows))
+
         def get_metadata(self):
             __doc__ = BaseFile.get_metadata.__doc__
             D = {}
@@ -128,8 +128,111 @@ class Space(object):
         numpy.sqrt(d, d)
         return d.flatten()
 
+    def paired_distances(self, A, B):
+        """
+        Calculate the distances between corresponding points in two
+        equal-length sets of coordinates, given the topology of the current
+        space, i.e. the distance between A[k] and B[k] for each k.
+        """
+        assert A.shape == B.shape
+        assert A.shape[-1] == 3
+        B = self.scale_factor * (B + self.offset)
+        d = numpy.zeros(A.shape[:-1], dtype=float)
+        for axis in self.axes:
+            diff = A[..., axis] - B[..., axis]
+            if self.periodic_boundaries is not None:
+                boundaries = self.periodic_boundaries[axis]
+                if boundaries is not None:
+                    range = boundaries[1] - boundaries[0]
+                    ad = abs(diff)
+                    diff = numpy.minimum(ad, range - ad)
+            d += diff**2
+        return numpy.sqrt(d)
+
+    def pairs_within_distance(self, A, B, cutoff, block_size=None):
+        """
+        Find all pairs of points (A[i], B[j]) separated by no more than
+        `cutoff`, given the topology of the current space.
+
+        The points of A are placed in a uniform grid whose cells are at least
+        `cutoff` wide, so that each point of B need only be compared with the
+        points of A in the same and neighbouring cells.
+
+        Returns an iterator which, for each block of `block_size` points of B
+        (all of B if `block_size` is None), yields the arrays `(i, j, d)` of
+        indices into A, indices into B and distances, sorted by j then i.
+        """
+        assert A.shape[-1] == 3
+        assert B.shape[-1] == 3
+        if A.shape[0] == 0 or B.shape[0] == 0:
+            return
+        B_scaled = self.scale_factor * (B + self.offset)
+        lows = []
+        widths = []
+        n_cells = []
+        offsets = []
+        for axis in self.axes:
+            if self.periodic_boundaries is not None and self.periodic_boundaries[axis] is not None:
+                low, high = self.periodic_boundaries[axis]
+                n = max(1, int((high - low) // cutoff)) if cutoff > 0 else 1
+                width = (high - low) / n
+                offsets.append([0, 1, -1][:min(n, 3)])  # neighbouring cells wrap around
+            else:
+                low = min(A[:, axis].min(), B_scaled[:, axis].min())
+                extent = max(A[:, axis].max(), B_scaled[:, axis].max()) - low
+                width = cutoff if cutoff > 0 else max(extent, 1.0)
+                n = int(extent // width) + 1
+                offsets.append([0, 1, -1])
+            lows.append(low)
+            widths.append(width)
+            n_cells.append(n)
+        lows, widths, n_cells = numpy.array(lows), numpy.array(widths), numpy.array(n_cells)
+        periodic = numpy.array([self.periodic_boundaries is not None and self.periodic_boundaries[axis] is not None
+                                for axis in self.axes])
+        strides = numpy.hstack((numpy.cumprod(n_cells[::-1])[-2::-1], [1]))
+
+        def cell_coordinates(X):
+            c = numpy.floor((X[:, self.axes] - lows) / widths).astype(int)
+            c[:, periodic] %= n_cells[periodic]
+            return numpy.minimum(numpy.maximum(c, 0), n_cells - 1)
+
+        # sort the points of A by grid cell
+        cells_A = cell_coordinates(A).dot(strides)
+        order = numpy.argsort(cells_A, kind='mergesort')
+        cells_A = cells_A[order]
+
+        if block_size is None:
+            block_size = max(B.shape[0], 1)
+        for block_start in range(0, B.shape[0], block_size):
+            j_block = numpy.arange(block_start, min(block_start + block_size, B.shape[0]))
+            coords_B = cell_coordinates(B_scaled[j_block])
+            i_list = []
+            j_list = []
+            for offset in numpy.array(numpy.meshgrid(*offsets, indexing='ij')).reshape(len(offsets), -1).T:
+                neighbours = coords_B + offset
+                neighbours[:, periodic] %= n_cells[periodic]
+                valid = ((neighbours >= 0) & (neighbours < n_cells)).all(axis=1)
+                cells = neighbours.dot(strides)
+                starts = numpy.searchsorted(cells_A, cells, side='left')
+                counts = numpy.where(valid, numpy.searchsorted(cells_A, cells, side='right') - starts, 0)
+                first = numpy.cumsum(counts) - counts
+                i_list.append(order[numpy.repeat(starts - first, counts) + numpy.arange(counts.sum())])
+                j_list.append(numpy.repeat(j_block, counts))
+            i = numpy.hstack(i_list).astype(int)
+            j = numpy.hstack(j_list).astype(int)
+            d = self.paired_distances(A[i], B[j])
+            within = d <= cutoff
+            i, j, d = i[within], j[within], d[within]
+            sort_order = numpy.lexsort((i, j))
+            yield i[sort_order], j[sort_order], d[sort_order]
+
     def distance_generator(self, f, g):
         def distance_map(i, j):
+            if (isinstance(i, numpy.ndarray) and isinstance(j, numpy.ndarray)
+                and i.ndim == 1 and i.shape == j.shape):
+                # equal-length index arrays address individual (i, j) pairs,
+                # not the sub-matrix they span
+                return self.paired_distances(f(i), g(j))
             shape = []
             if isinstance(i, numpy.ndarray) and i.ndim == 2:
                 i = i[:, 0]
@@ -0,0 +1,93 @@
+"""
+Benchmark of connection throughput and memory use of the built-in connectors,
+using the mock backend, which stores connections column-wise in NumPy arrays,
+so that the cost of the connection algorithms themselves can be measured
+without a simulator.
+
+For each connector, prints the number of connections created, the number of
+connections created per second, the number of bytes per connection allocated
+by the projection's column buffers and, with Python 3, the peak memory
+allocated by Python during connection, also per connection.
+
+Usage: python connector_memory_benchmark.py [n_cells]
+
+:copyright: Copyright 2006-2016 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+from __future__ import print_function, division
+import sys
+import numpy
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+import pyNN.mock as sim
+from pyNN import connectors
+from pyNN.random import NumpyRNG
+from pyNN.space import RandomStructure, Cuboid
+from pyNN.utility import Timer
+
+
+class EveryThirdPair(connectors.IndexBasedExpression):
+
+    def __call__(self, i, j):
+        return numpy.array((i + j) % 3 == 0, dtype=float)
+
+
+def build_connectors(n):
+    rng = NumpyRNG(seed=76523)
+    connection_list = numpy.array([(i, j, 0.1, 1.0) for j in range(n) for i in range(0, n, 10)])
+    return [
+        ("AllToAllConnector", sim.AllToAllConnector()),
+        ("OneToOneConnector", sim.OneToOneConnector()),
+        ("FixedProbabilityConnector", sim.FixedProbabilityConnector(0.1, rng=rng)),
+        ("DistanceDependentProbabilityConnector",
+         sim.DistanceDependentProbabilityConnector("exp(-d/100.0)", rng=rng)),
+        ("FixedNumberPreConnector", sim.FixedNumberPreConnector(n // 10, rng=rng)),
+        ("FixedNumberPostConnector", sim.FixedNumberPostConnector(n // 10, rng=rng)),
+        ("FixedTotalNumberConnector", sim.FixedTotalNumberConnector(n * n // 10, rng=rng)),
+        ("SmallWorldConnector", sim.SmallWorldConnector(degree=200.0, rewiring=0.1, rng=rng)),
+        ("IndexBasedProbabilityConnector", sim.IndexBasedProbabilityConnector(EveryThirdPair(), rng=rng)),
+        ("DisplacementDependentProbabilityConnector",
+         sim.DisplacementDependentProbabilityConnector(lambda d: numpy.exp(-abs(d[0]) / 100.0), rng=rng)),
+        ("ArrayConnector", sim.ArrayConnector(numpy.arange(n * n).reshape((n, n)) % 10 == 0)),
+        ("FromListConnector", sim.FromListConnector(connection_list, column_names=["weight", "delay"])),
+    ]
+
+
+def run(n):
+    sim.setup()
+    structure = RandomStructure(Cuboid(1000.0, 1000.0, 1000.0), rng=NumpyRNG(seed=8734))
+    pre = sim.Population(n, sim.IF_cond_exp(), structure=structure)
+    post = sim.Population(n, sim.IF_cond_exp(), structure=structure)
+    synapse = sim.StaticSynapse(weight=0.1, delay=1.0)
+    timer = Timer()
+    print("%-45s %12s %14s %12s %12s" % ("Connector", "connections", "connections/s",
+                                         "bytes/conn", "peak/conn"))
+    for name, connector in build_connectors(n):
+        if tracemalloc:
+            tracemalloc.start()
+        timer.start()
+        try:
+            prj = sim.Projection(pre, post, connector, synapse)
+        except Exception as err:
+            print("%-45s failed: %s" % (name, err))
+            continue
+        finally:
+            elapsed = timer.elapsed_time()
+            if tracemalloc:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        n_connections = len(prj)
+        column_bytes = sum(column.nbytes for column in prj._columns.values())
+        print("%-45s %12d %14.0f %12.1f %12s" % (
+            name, n_connections, n_connections / elapsed,
+            column_bytes / max(n_connections, 1),
+            tracemalloc and "%.1f" % (peak / max(n_connections, 1)) or "-"))
+    sim.end()
+
+
+if __name__ == "__main__":
+    n = len(sys.argv) > 1 and int(sys.argv[1]) or 1000
+    run(n)
@@ -28,23 +28,34 @@ class TestProjection(unittest.TestCase):
         sim.setup()
         self.syn = sim.StaticSynapse(weight=0.123, delay=0.5)
 
-    def test_partitioning(self):
+    def test_group_and_ungroup_indices(self):
         p1 = sim.Population(5, sim.IF_cond_exp())
         p2 = sim.Population(7, sim.IF_cond_exp())
-        a = p1 + p2[1:4]
-        # [0 2 3 4 5][x 1 2 3 x x x]
+        a = p1 + p2[[4, 1, 2]]
         prj = sim.Projection(a, a, MockConnector(), synapse_type=self.syn)
-        presynaptic_indices = numpy.array([0, 3, 4, 6, 7])
-        partitions = prj._partition(presynaptic_indices)
-        self.assertEqual(len(partitions), 2)
-        assert_array_equal(partitions[0], numpy.array([0, 3, 4]))
-        assert_array_equal(partitions[1], numpy.array([2, 3]))
-
-        # [0 1 2 3 4][x 1 2 3 x]
-        self.assertEqual(prj._localize_index(0), (0, 0))
-        self.assertEqual(prj._localize_index(3), (0, 3))
-        self.assertEqual(prj._localize_index(5), (1, 1))
-        self.assertEqual(prj._localize_index(7), (1, 3))
+        indices = numpy.array([0, 3, 5, 6, 7])
+        groups, group_indices = prj._group_indices(a, indices)
+        assert_array_equal(groups, [0, 0, 1, 1, 1])
+        assert_array_equal(group_indices, [0, 3, 4, 1, 2])
+        assert_array_equal(prj._ungroup_indices(a, 1, group_indices[2:]), indices[2:])
+
+    def test_get_with_population_views(self):
+        p1 = sim.Population(5, sim.IF_cond_exp())
+        p2 = sim.Population(7, sim.IF_cond_exp())
+        prj = sim.Projection(p1[[4, 1, 2]], p2[3:6], sim.FromListConnector([(0, 0), (2, 1), (1, 2)]),
+                             synapse_type=self.syn)
+        connections = sorted((int(i), int(j)) for i, j, w in prj.get("weight", format="list"))
+        self.assertEqual(connections, [(0, 0), (1, 2), (2, 1)])
+
+    def test_set_with_multapses(self):
+        p1 = sim.Population(3, sim.IF_cond_exp())
+        p2 = sim.Population(2, sim.IF_cond_exp())
+        prj = sim.Projection(p1, p2, sim.FromListConnector([(0, 0), (0, 0), (2, 1)]),
+                             synapse_type=self.syn)
+        self.assertEqual(len(prj), 3)
+        prj.set(weight=numpy.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]))
+        weights = prj.get("weight", format="list")
+        assert_array_almost_equal(numpy.array(weights)[:, 2], [0.1, 0.1, 0.6])
 
 if __name__ == '__main__':
     unittest.main()
@@ -18,6 +18,11 @@ from numpy.testing import assert_array_equal, assert_array_almost_equal
 from .mocks import MockRNG, MockRNG2
 import pyNN.mock as sim
 
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
 from .backends.registry import register_class, register
 
 orig_mpi_get_config = random.get_mpi_config
@@ -464,6 +469,49 @@ class TestFromFileConnector(unittest.TestCase):
                           (2, 3, 0.3, 0.12, 120.0, 98.0, 88.8)])
 
 
+@unittest.skipUnless(MPI and MPI.COMM_WORLD.size == 2,
+                     "Requires mpi4py; run with 'mpirun -np 2'")
+class TestStreamedBinaryConnectionFile(unittest.TestCase):
+    """Unlike the other tests in this module, this one uses real MPI."""
+
+    def setUp(self, sim=sim):
+        self.mpi_comm = MPI.COMM_WORLD
+        sim.setup(num_processes=self.mpi_comm.size, rank=self.mpi_comm.rank, min_delay=0.123)
+        self.p1 = sim.Population(4, sim.IF_cond_exp(), structure=space.Line())
+        self.p2 = sim.Population(5, sim.HH_cond_exp(), structure=space.Line())
+        self.connection_list = [
+            (0, 0, 0.1, 0.1),
+            (3, 0, 0.2, 0.11),
+            (2, 3, 0.3, 0.12),
+            (2, 2, 0.4, 0.13),
+            (0, 1, 0.5, 0.14),
+            (1, 4, 0.6, 0.15),
+            ]
+
+    def tearDown(self, sim=sim):
+        self.mpi_comm.Barrier()
+        if self.mpi_comm.rank == 0 and os.path.exists("test.connections.stream"):
+            os.remove("test.connections.stream")
+        sim.end()
+
+    def test_save_and_connect_with_streamed_binary_file(self, sim=sim):
+        prj0 = sim.Projection(self.p1, self.p2, connectors.FromListConnector(self.connection_list),
+                              sim.StaticSynapse())
+        prj0.save(["weight", "delay"], "test.connections.stream", format='binary', gather='stream')
+        self.mpi_comm.Barrier()
+        # the file contains the connections from all nodes
+        file = recording.files.BinaryConnectionFile("test.connections.stream")
+        data = file.read()
+        file.close()
+        assert_array_almost_equal(sorted(tuple(row) for row in data),
+                                  sorted(self.connection_list))
+        # each node creates its own connections when reading it back
+        C = connectors.FromFileConnector("test.connections.stream", distributed=False)
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+        self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),
+                         prj0.get(["weight", "delay"], format='list', gather=False))
+
+
 @register_class()
 class TestFixedNumberPostConnector(unittest.TestCase):
 
@@ -478,11 +526,16 @@ class TestFixedNumberPostConnector(unittest.TestCase):
         C = connectors.FixedNumberPostConnector(n=3, rng=MockRNG(delta=1))
         syn = sim.StaticSynapse(weight="0.5*d")
         prj = sim.Projection(self.p1, self.p2, C, syn)
-        # MockRNG.permutation(arr) returns the reverse of arr, so each pre neuron will connect to neurons 4, 3, 2
-        # however, only neuron 3 is on the "local" (fake MPI) node
+        # connections as follows: (pre - list of post)
+        #   0 - 2 3 4
+        #   1 - 0 1 4
+        #   2 - 1 2 3
+        #   3 - 0 3 4
+        # however, only neurons 1 and 3 are on the "local" (fake MPI) node
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [(0, 3, 1.5, 0.123),
-                          (1, 3, 1.0, 0.123),
+                         [(1, 1, 0.0, 0.123),
+                          (2, 1, 0.5, 0.123),
+                          (0, 3, 1.5, 0.123),
                           (2, 3, 0.5, 0.123),
                           (3, 3, 0.0, 0.123)])
 
@@ -491,19 +544,22 @@ class TestFixedNumberPostConnector(unittest.TestCase):
         C = connectors.FixedNumberPostConnector(n=7, rng=MockRNG(delta=1))
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p1, self.p2, C, syn)
-        # each pre neuron will connect to all post neurons (population size 5 is less than n), then to 4, 3 (MockRNG.permutation)
+        # each pre neuron will connect to all post neurons (population size 5 is less than n), then to two more:
+        #   0 - 0 1
+        #   1 - 2 3
+        #   2 - 0 4
+        #   3 - 1 2
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
                          [(0, 1, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
                           (1, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
-                          (0, 3, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
                           (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),
-                          (3, 3, 0.0, 0.123),
                           (3, 3, 0.0, 0.123)])
 
     @register()
@@ -512,11 +568,11 @@ class TestFixedNumberPostConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
         # connections as follows: (pre - list of post)
-        #   0 - 1 2 3 4 4 3 2
-        #   1 - 0 2 3 4 4 3 2
-        #   2 - 0 1 3 4 4 3 1
-        #   3 - 0 1 2 4 4 2 1
-        #   4 - 0 1 2 3 3 2 1
+        #   0 - 1 2 3 4 2 3 4
+        #   1 - 0 2 3 4 0 3 4
+        #   2 - 0 1 3 4 0 1 4
+        #   3 - 0 1 2 4 0 1 2
+        #   4 - 0 1 2 3 1 2 3
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
                          [(0, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
@@ -530,9 +586,8 @@ class TestFixedNumberPostConnector(unittest.TestCase):
                           (1, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),
                           (4, 3, 0.0, 0.123),
-                          (4, 3, 0.0, 0.123),])
+                          (4, 3, 0.0, 0.123)])
 
     @register()
     def test_with_replacement(self, sim=sim):
@@ -571,16 +626,18 @@ class TestFixedNumberPostConnector(unittest.TestCase):
                                                allow_self_connections=False, rng=MockRNG(start=2, delta=1))
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
-        # 0 - 2 3 4
-        # 1 - 0 2 3
-        # 2 - 4 0 1
-        # 3 - 2 4 0
-        # 4 - 1 2 3
+        # 0 - 3 4 1
+        # 1 - 2 3 4
+        # 2 - 0 1 3
+        # 3 - 4 0 1
+        # 4 - 2 3 0
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [(2, 1, 0.0, 0.123),
-                          (4, 1, 0.0, 0.123),
+                         [(0, 1, 0.0, 0.123),
+                          (2, 1, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
                           (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123),
                           (4, 3, 0.0, 0.123)])
 
 
@@ -598,13 +655,13 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         C = connectors.FixedNumberPreConnector(n=3, rng=MockRNG(delta=1))
         syn = sim.StaticSynapse(weight="0.1*d")
         prj = sim.Projection(self.p1, self.p2, C, syn)
-        self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [(3, 1, 0.2, 0.123),
-                          (2, 1, 0.1, 0.123),
-                          (1, 1, 0.0, 0.123),
-                          (3, 3, 0.0, 0.123),
-                          (2, 3, 0.1, 0.123),
-                          (1, 3, 0.2, 0.123),])
+        assert_array_almost_equal(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
+                                  [(0, 1, 0.1, 0.123),
+                                   (2, 1, 0.1, 0.123),
+                                   (3, 1, 0.2, 0.123),
+                                   (0, 3, 0.3, 0.123),
+                                   (1, 3, 0.2, 0.123),
+                                   (2, 3, 0.1, 0.123)])
 
     @register()
     def test_with_n_larger_than_population_size(self, sim=sim):
@@ -616,16 +673,16 @@ class TestFixedNumberPreConnector(unittest.TestCase):
                           (1, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
-                          (3, 1, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
-                          (1, 1, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
                           (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
                           (3, 3, 0.0, 0.123),
-                          (3, 3, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),
-                          (1, 3, 0.0, 0.123),])
+                          (0, 3, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123)])
 
     @register()
     def test_with_n_larger_than_population_size_no_self_connections(self, sim=sim):
@@ -637,16 +694,16 @@ class TestFixedNumberPreConnector(unittest.TestCase):
                           (2, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
                           (4, 1, 0.0, 0.123),
-                          (4, 1, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
-                          (2, 1, 0.0, 0.123),
+                          (4, 1, 0.0, 0.123),
                           (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
                           (4, 3, 0.0, 0.123),
-                          (4, 3, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),
-                          (1, 3, 0.0, 0.123),])
+                          (0, 3, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123)])
 
     @register()
     def test_with_replacement(self, sim=sim):
@@ -689,21 +746,12 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [#(2, 0, 0.0, 0.123),  # [2, 3, 4] --> [2, 3, 4]
-                          #(3, 0, 0.0, 0.123),
-                          #(4, 0, 0.0, 0.123),
-                          (0, 1, 0.0, 0.123),   # [0, 1, 2] --> [0, 3, 2]
-                          #(1, 1, 0.0, 0.123),
+                         [(2, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
-                          (2, 1, 0.0, 0.123),
-                          #(4, 2, 0.0, 0.123),  # [4, 0, 1] --> [4, 0, 1]
-                          #(0, 2, 0.0, 0.123),
-                          #(1, 2, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),   # [2, 3, 4] --> [2, 0, 4]
-                          #(3, 3, 0.0, 0.123),
-                          (0, 3, 0.0, 0.123),
+                          (4, 1, 0.0, 0.123),
                           (4, 3, 0.0, 0.123),
-                          ])
+                          (0, 3, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123)])
 
     @register()
     def test_no_replacement_no_self_connections(self, sim=sim):
@@ -712,13 +760,12 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [(4, 1, 0.0, 0.123),
-                          (3, 1, 0.0, 0.123),
+                         [(0, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
-                          (4, 3, 0.0, 0.123),
-                          #(3, 3, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
-                          (1, 3, 0.0, 0.123),])
+                          (4, 3, 0.0, 0.123)])
 
     @register()
     def test_with_replacement_parallel_unsafe(self, sim=sim):
@@ -739,12 +786,12 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p1, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [(3, 1, 0.0, 0.123),
+                         [(1, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
-                          (1, 1, 0.0, 0.123),
-                          (3, 3, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
-                          (1, 3, 0.0, 0.123),])
+                          (3, 3, 0.0, 0.123)])
 
 
 @register_class()
@@ -783,10 +830,10 @@ class TestArrayConnector(unittest.TestCase):
             ], dtype=bool)
         C = connectors.ArrayConnector(connections, safe=False)
         prj = sim.Projection(self.p1, self.p2, C, syn)
-        self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
-                         [(1, 0, 0.0, 1.0),
-                          (0, 2, 3.0, 1.3),
-                          (2, 2, 4.0, 1.4000000000000001)])  # better to do an "almost-equal" check
+        assert_array_almost_equal(prj.get(["weight", "delay"], format='list', gather=False),  # use gather False because we are faking the MPI
+                                  [(1, 0, 0.0, 1.0),
+                                   (0, 2, 3.0, 1.3),
+                                   (2, 2, 4.0, 1.4)])
 
 
 @register_class()
@@ -808,17 +855,23 @@ class TestCloneConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         self.ref_prj = sim.Projection(self.p1, self.p2, list_connector, syn)
         self.orig_gather_dict = recording.gather_dict  # create reference to original function
-        # The gather_dict function in recording needs to be temporarily replaced so it can work with
-        # a mock version of the function to avoid it throwing an mpi4py import error when setting
-        # the rank in pyNN.mock by hand to > 1
+        self.orig_gather_columns = recording.gather_columns
+        # The gather_dict and gather_columns functions in recording need to be temporarily replaced
+        # so they can work with a mock version of the function to avoid them throwing an mpi4py
+        # import error when setting the rank in pyNN.mock by hand to > 1
 
         def mock_gather_dict(D, all=False):
             return D
         recording.gather_dict = mock_gather_dict
 
+        def mock_gather_columns(columns, all=False):
+            return columns
+        recording.gather_columns = mock_gather_columns
+
     def tearDown(self, sim=sim):
-        # restore original gather_dict function
+        # restore original gather_dict and gather_columns functions
         recording.gather_dict = self.orig_gather_dict
+        recording.gather_columns = self.orig_gather_columns
 
     @register()
     def test_connect(self, sim=sim):
@@ -829,6 +882,21 @@ class TestCloneConnector(unittest.TestCase):
                          [(0, 1, 5.0, 0.5),
                           (2, 3, 5.0, 0.5)])
 
+    @register()
+    def test_connect_with_parallel_safe_random_weights(self, sim=sim):
+        # the reference projection has attributes other than weight and delay,
+        # which must not be gathered
+        ref_prj = sim.Projection(self.p1, self.p2,
+                                 connectors.FromListConnector([(0, 1), (2, 3), (1, 3)]),
+                                 sim.TsodyksMarkramSynapse(U=0.2))
+        rd = random.RandomDistribution('uniform', (0, 1), rng=MockRNG(delta=1.0, parallel_safe=True))
+        C = connectors.CloneConnector(ref_prj)
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse(weight=rd, delay=0.5))
+        self.assertEqual(prj.get(["weight", "delay"], format='list', gather=False),
+                         [(0, 1, 0.0, 0.5),
+                          (1, 3, 1.0, 0.5),
+                          (2, 3, 2.0, 0.5)])
+
     @register()
     def test_connect_with_pre_post_mismatch(self, sim=sim):
         syn = sim.StaticSynapse()
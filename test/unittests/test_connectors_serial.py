@@ -15,6 +15,8 @@ import numpy
 from numpy import nan
 import os
 import sys
+import shutil
+import tempfile
 from numpy.testing import assert_array_equal, assert_array_almost_equal
 from .mocks import MockRNG, MockRNG2, MockRNG3
 import pyNN.mock as sim
@@ -112,6 +114,17 @@ class TestAllToAllConnector(unittest.TestCase):
                                         [5.0, 5.0, 5.0, 5.0, 5.0],
                                         [5.0, 5.0, 5.0, 5.0, 5.0]]))
 
+    @register()
+    def test_connect_in_several_blocks(self, sim=sim):
+        C1 = connectors.AllToAllConnector(safe=False)
+        C2 = connectors.AllToAllConnector(safe=False)
+        C2.block_size = 6
+        syn = sim.StaticSynapse(weight=numpy.arange(0.0, 2.0, 0.1).reshape(4, 5), delay=0.5)
+        prj1 = sim.Projection(self.p1, self.p2, C1, syn)
+        prj2 = sim.Projection(self.p1, self.p2, C2, syn)
+        self.assertEqual(prj1.get(["weight", "delay"], format='list'),
+                         prj2.get(["weight", "delay"], format='list'))
+
     @register()
     def test_connect_with_array_weights(self, sim=sim):
         C = connectors.AllToAllConnector(safe=False)
@@ -455,6 +468,51 @@ class TestDistanceDependentProbabilityConnector(unittest.TestCase):
                           (3, 3, 0.0, 0.123),
                           (3, 4, 0.0, 0.123)])
 
+    @register()
+    def test_connect_with_constant_expression_and_worker_processes(self, sim=sim):
+        C = connectors.DistanceDependentProbabilityConnector(d_expression="0.3",
+                                                             rng=random.NumpyRNG(seed=8327),
+                                                             n_workers=2)
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+        connections = prj.get([], format='list')
+        self.assertTrue(0 < len(connections) < self.p1.size * self.p2.size)
+
+    def test_cutoff_inferred_from_expression(self, sim=sim):
+        for d_expression, cutoff in (("d<1.5", 1.5), ("exp(-d)*(d <= 3)", 3.0),
+                                     ("(d<4)*(d<2)", 2.0), ("exp(-d)", None),
+                                     ("d>1", None), ("1 - (d<2)", None)):
+            C = connectors.DistanceDependentProbabilityConnector(d_expression=d_expression,
+                                                                 cutoff='auto')
+            self.assertEqual(C.cutoff, cutoff)
+        # by default, no cutoff is used, so as not to change the connections
+        # created for a given random seed
+        C = connectors.DistanceDependentProbabilityConnector(d_expression="d<1.5")
+        self.assertEqual(C.cutoff, None)
+
+    @register()
+    def test_connect_with_cutoff_and_periodic_boundaries(self, sim=sim):
+        p = sim.Population(10, sim.IF_cond_exp(), structure=space.Line())
+        C = connectors.DistanceDependentProbabilityConnector(d_expression="d<1.5",
+                                                             allow_self_connections=False,
+                                                             rng=MockRNG(delta=0.01),
+                                                             cutoff='auto')
+        C.cutoff_block_size = 3
+        prj = sim.Projection(p, p, C, sim.StaticSynapse(),
+                             space=space.Space(periodic_boundaries=((0, 10), None, None)))
+        self.assertEqual(sorted(c[:2] for c in prj.get(['weight'], format='list')),
+                         sorted([(i, (i + k) % 10) for i in range(10) for k in (1, 9)]))
+
+    @register()
+    def test_connect_with_explicit_cutoff(self, sim=sim):
+        C = connectors.DistanceDependentProbabilityConnector(d_expression="exp(-d)",
+                                                             cutoff=1.0,
+                                                             rng=MockRNG(delta=0.0))
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+        # with a constant random number of 0, every pair within the cutoff is connected
+        self.assertEqual(sorted(c[:2] for c in prj.get(['weight'], format='list')),
+                         [(0, 0), (0, 1), (1, 0), (1, 1), (1, 2),
+                          (2, 1), (2, 2), (2, 3), (3, 2), (3, 3), (3, 4)])
+
 
 @register_class()
 class TestFromListConnector(unittest.TestCase):
@@ -529,6 +587,25 @@ class TestFromListConnector(unittest.TestCase):
                           (2, 2, 0.4, 0.13, 88.8, 700.0, 103.0),
                           (2, 3, 0.3, 0.12, 88.8, 600.0, 102.0)])
 
+    @register()
+    def test_connect_in_chunks_from_memory_mapped_array(self, sim=sim):
+        connection_list = numpy.array([
+            (0, 0, 0.1, 0.18),
+            (3, 0, 0.2, 0.17),
+            (2, 3, 0.3, 0.16),
+            (2, 2, 0.4, 0.15),
+            (0, 1, 0.5, 0.14),
+            ])
+        numpy.save("test.connections.npy", connection_list)
+        try:
+            C = connectors.FromListConnector(numpy.load("test.connections.npy", mmap_mode='r'))
+            C.chunk_size = 2
+            prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+            self.assertEqual(sorted(prj.get(["weight", "delay"], format='list')),
+                             sorted(map(tuple, connection_list.tolist())))
+        finally:
+            os.remove("test.connections.npy")
+
 
 @register_class()
 class TestFromFileConnector(unittest.TestCase):
@@ -585,6 +662,75 @@ class TestFromFileConnector(unittest.TestCase):
                           (2, 2, 0.4, 0.13, 130.0, 97.0, 88.8),
                           (2, 3, 0.3, 0.12, 120.0, 98.0, 88.8)])
 
+    @register()
+    def test_connect_with_binary_file(self, sim=sim):
+        prj0 = sim.Projection(self.p1, self.p2, connectors.FromListConnector(self.connection_list),
+                              sim.StaticSynapse())
+        prj0.save(["weight", "delay"], "test.connections", format='binary')
+        C = connectors.FromFileConnector("test.connections", distributed=False)
+        C.chunk_size = 2
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         prj0.get(["weight", "delay"], format='list'))
+
+    @register()
+    def test_connect_with_streamed_binary_file(self, sim=sim):
+        # with a single process, gather='stream' writes the same file as gather=True
+        prj0 = sim.Projection(self.p1, self.p2, connectors.FromListConnector(self.connection_list),
+                              sim.StaticSynapse())
+        prj0.save(["weight", "delay"], "test.connections", format='binary', gather='stream')
+        C = connectors.FromFileConnector("test.connections", distributed=False)
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         prj0.get(["weight", "delay"], format='list'))
+
+    @register()
+    def test_connect_with_standard_text_file_in_chunks(self, sim=sim):
+        file = recording.files.StandardTextFile("test.connections.2", mode='wb')
+        file.write(self.connection_list, {"columns": ["i", "j", "weight", "delay"]})
+        C = connectors.FromFileConnector("test.connections.2", distributed=False)
+        C.chunk_size = 2
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+        self.assertEqual(sorted(prj.get(["weight", "delay"], format='list')),
+                         sorted(self.connection_list))
+
+
+@register_class()
+class TestFixedNumberPostConnector(unittest.TestCase):
+
+    def setUp(self, sim=sim, **extra):
+        sim.setup(min_delay=0.123, **extra)
+        self.p1 = sim.Population(40, sim.IF_cond_exp(), structure=space.Line())
+        self.p2 = sim.Population(50, sim.HH_cond_exp(), structure=space.Line())
+
+    def tearDown(self, sim=sim):
+        sim.end()
+
+    @register()
+    def test_no_replacement(self, sim=sim):
+        for n in (3, 30, 70):
+            C = connectors.FixedNumberPostConnector(n=n, rng=random.NumpyRNG(seed=8734))
+            prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+            connections = numpy.array(prj.get([], format='list'), dtype=int)
+            for i in range(self.p1.size):
+                targets = connections[connections[:, 0] == i, 1]
+                self.assertEqual(targets.size, n)
+                # each target is chosen at most once before all have been chosen
+                counts = numpy.bincount(targets, minlength=self.p2.size)
+                self.assertLessEqual(counts.max() - counts.min(), 1)
+
+    @register()
+    def test_no_self_connections(self, sim=sim):
+        for with_replacement in (True, False):
+            C = connectors.FixedNumberPostConnector(n=60, with_replacement=with_replacement,
+                                                    allow_self_connections=False,
+                                                    rng=random.NumpyRNG(seed=8734))
+            prj = sim.Projection(self.p2, self.p2, C, sim.StaticSynapse())
+            connections = numpy.array(prj.get([], format='list'), dtype=int)
+            self.assertEqual(connections.shape[0], 60 * self.p2.size)
+            self.assertFalse((connections[:, 0] == connections[:, 1]).any())
+            assert_array_equal(numpy.bincount(connections[:, 0]), 60 * numpy.ones(self.p2.size))
+
 
 @register_class()
 class TestFixedNumberPreConnector(unittest.TestCase):
@@ -604,21 +750,21 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         prj = sim.Projection(self.p1, self.p2, C, syn)
         rec = prj.get(["weight", "delay"], format='list')
         assert_array_almost_equal([list(r) for r in rec],  
-                         [(3, 0, 0.3, 0.123),
+                         [(1, 0, 0.1, 0.123),
                           (2, 0, 0.2, 0.123),
-                          (1, 0, 0.1, 0.123),
-                          (3, 1, 0.2, 0.123),
+                          (3, 0, 0.3, 0.123),
+                          (0, 1, 0.1, 0.123),
                           (2, 1, 0.1, 0.123),
-                          (1, 1, 0.0, 0.123),
-                          (3, 2, 0.1, 0.123),
-                          (2, 2, 0.0, 0.123),
+                          (3, 1, 0.2, 0.123),
+                          (0, 2, 0.2, 0.123),
                           (1, 2, 0.1, 0.123),
-                          (3, 3, 0.0, 0.123),
-                          (2, 3, 0.1, 0.123),
+                          (3, 2, 0.1, 0.123),
+                          (0, 3, 0.3, 0.123),
                           (1, 3, 0.2, 0.123),
-                          (3, 4, 0.1, 0.123),
+                          (2, 3, 0.1, 0.123),
+                          (1, 4, 0.3, 0.123),
                           (2, 4, 0.2, 0.123),
-                          (1, 4, 0.3, 0.123)])
+                          (3, 4, 0.1, 0.123)])
 
     @register()
     def test_with_n_larger_than_population_size(self, sim=sim):
@@ -630,37 +776,37 @@ class TestFixedNumberPreConnector(unittest.TestCase):
                           (1, 0, 0.0, 0.123),
                           (2, 0, 0.0, 0.123),
                           (3, 0, 0.0, 0.123),
-                          (3, 0, 0.0, 0.123),
-                          (2, 0, 0.0, 0.123),
                           (1, 0, 0.0, 0.123),
+                          (2, 0, 0.0, 0.123),
+                          (3, 0, 0.0, 0.123),
                           (0, 1, 0.0, 0.123),
                           (1, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
-                          (3, 1, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
-                          (1, 1, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
                           (0, 2, 0.0, 0.123),
                           (1, 2, 0.0, 0.123),
                           (2, 2, 0.0, 0.123),
                           (3, 2, 0.0, 0.123),
-                          (3, 2, 0.0, 0.123),
-                          (2, 2, 0.0, 0.123),
+                          (0, 2, 0.0, 0.123),
                           (1, 2, 0.0, 0.123),
+                          (3, 2, 0.0, 0.123),
                           (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
                           (3, 3, 0.0, 0.123),
-                          (3, 3, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123),
                           (0, 4, 0.0, 0.123),
                           (1, 4, 0.0, 0.123),
                           (2, 4, 0.0, 0.123),
                           (3, 4, 0.0, 0.123),
-                          (3, 4, 0.0, 0.123),
+                          (1, 4, 0.0, 0.123),
                           (2, 4, 0.0, 0.123),
-                          (1, 4, 0.0, 0.123)])
+                          (3, 4, 0.0, 0.123)])
 
     @register()
     def test_with_n_larger_than_population_size_no_self_connections(self, sim=sim):
@@ -672,37 +818,37 @@ class TestFixedNumberPreConnector(unittest.TestCase):
                           (2, 0, 0.0, 0.123),
                           (3, 0, 0.0, 0.123),
                           (4, 0, 0.0, 0.123),
-                          (4, 0, 0.0, 0.123),
-                          (3, 0, 0.0, 0.123),
                           (2, 0, 0.0, 0.123),
+                          (3, 0, 0.0, 0.123),
+                          (4, 0, 0.0, 0.123),
                           (0, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
                           (4, 1, 0.0, 0.123),
-                          (4, 1, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
                           (3, 1, 0.0, 0.123),
-                          (2, 1, 0.0, 0.123),
+                          (4, 1, 0.0, 0.123),
                           (0, 2, 0.0, 0.123),
                           (1, 2, 0.0, 0.123),
                           (3, 2, 0.0, 0.123),
                           (4, 2, 0.0, 0.123),
-                          (4, 2, 0.0, 0.123),
-                          (3, 2, 0.0, 0.123),
+                          (0, 2, 0.0, 0.123),
                           (1, 2, 0.0, 0.123),
+                          (4, 2, 0.0, 0.123),
                           (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
                           (4, 3, 0.0, 0.123),
-                          (4, 3, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123),
                           (0, 4, 0.0, 0.123),
                           (1, 4, 0.0, 0.123),
                           (2, 4, 0.0, 0.123),
                           (3, 4, 0.0, 0.123),
-                          (3, 4, 0.0, 0.123),
+                          (1, 4, 0.0, 0.123),
                           (2, 4, 0.0, 0.123),
-                          (1, 4, 0.0, 0.123)])
+                          (3, 4, 0.0, 0.123)])
 
     @register()
     def test_with_replacement(self, sim=sim):
@@ -764,24 +910,21 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list'),  
-                         [(2, 0, 0.0, 0.123),  # [2, 3, 4] --> [2, 3, 4]
-                          (3, 0, 0.0, 0.123),
+                         [(3, 0, 0.0, 0.123),
                           (4, 0, 0.0, 0.123),
-                          (0, 1, 0.0, 0.123),   # [0, 1, 2] --> [0, 3, 2]
-                          #(1, 1, 0.0, 0.123),
-                          (3, 1, 0.0, 0.123),
+                          (1, 0, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
-                          (4, 2, 0.0, 0.123),  # [4, 0, 1] --> [4, 0, 1]
+                          (3, 1, 0.0, 0.123),
+                          (4, 1, 0.0, 0.123),
                           (0, 2, 0.0, 0.123),
                           (1, 2, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),   # [2, 3, 4] --> [2, 0, 4]
-                          #(3, 3, 0.0, 0.123),
-                          (0, 3, 0.0, 0.123),
+                          (3, 2, 0.0, 0.123),
                           (4, 3, 0.0, 0.123),
-                          (1, 4, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
+                          (1, 3, 0.0, 0.123),
                           (2, 4, 0.0, 0.123),
                           (3, 4, 0.0, 0.123),
-                          ])
+                          (0, 4, 0.0, 0.123)])
 
     @register()
     #TOCHECK
@@ -791,21 +934,21 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p2, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list'),  
-                         [(4, 0, 0.0, 0.123),
-                          (3, 0, 0.0, 0.123),
+                         [(1, 0, 0.0, 0.123),
                           (2, 0, 0.0, 0.123),
-                          (4, 1, 0.0, 0.123),
-                          (3, 1, 0.0, 0.123),
+                          (4, 0, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
-                          (4, 2, 0.0, 0.123),
-                          (3, 2, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
                           (1, 2, 0.0, 0.123),
-                          (4, 3, 0.0, 0.123),
+                          (3, 2, 0.0, 0.123),
+                          (4, 2, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
                           (2, 3, 0.0, 0.123),
-                          (1, 3, 0.0, 0.123),
-                          (3, 4, 0.0, 0.123),
-                          (2, 4, 0.0, 0.123),
-                          (1, 4, 0.0, 0.123)])
+                          (4, 3, 0.0, 0.123),
+                          (0, 4, 0.0, 0.123),
+                          (1, 4, 0.0, 0.123),
+                          (3, 4, 0.0, 0.123)])
 
     @register()
     #TOCHECK
@@ -836,21 +979,21 @@ class TestFixedNumberPreConnector(unittest.TestCase):
         syn = sim.StaticSynapse()
         prj = sim.Projection(self.p1, self.p2, C, syn)
         self.assertEqual(prj.get(["weight", "delay"], format='list'),  
-                         [(3, 0, 0.0, 0.123),
+                         [(1, 0, 0.0, 0.123),
                           (2, 0, 0.0, 0.123),
-                          (1, 0, 0.0, 0.123),
-                          (3, 1, 0.0, 0.123),
+                          (3, 0, 0.0, 0.123),
+                          (0, 1, 0.0, 0.123),
                           (2, 1, 0.0, 0.123),
-                          (1, 1, 0.0, 0.123),
-                          (3, 2, 0.0, 0.123),
-                          (2, 2, 0.0, 0.123),
+                          (3, 1, 0.0, 0.123),
+                          (0, 2, 0.0, 0.123),
                           (1, 2, 0.0, 0.123),
-                          (3, 3, 0.0, 0.123),
-                          (2, 3, 0.0, 0.123),
+                          (3, 2, 0.0, 0.123),
+                          (0, 3, 0.0, 0.123),
                           (1, 3, 0.0, 0.123),
-                          (3, 4, 0.0, 0.123),
+                          (2, 3, 0.0, 0.123),
+                          (1, 4, 0.0, 0.123),
                           (2, 4, 0.0, 0.123),
-                          (1, 4, 0.0, 0.123),])
+                          (3, 4, 0.0, 0.123)])
 
 
 @register_class()
@@ -904,6 +1047,68 @@ class TestArrayConnector(unittest.TestCase):
                           (1, 3, 5.0, 1.5)]) 
 
 
+@unittest.skipUnless(connectors.haveCSA, "Requires csa")
+@register_class()
+class TestCSAConnector(unittest.TestCase):
+
+    def setUp(self, sim=sim, **extra):
+        sim.setup(min_delay=0.123, **extra)
+        self.p1 = sim.Population(5, sim.IF_cond_exp(), structure=space.Line())
+        self.p2 = sim.Population(5, sim.HH_cond_exp(), structure=space.Line())
+
+    def tearDown(self, sim=sim):
+        sim.end()
+
+    @register()
+    def test_connect_with_one_to_one(self, sim=sim):
+        C = connectors.CSAConnector(connectors.csa.oneToOne)
+        C.columns_per_block = 2
+        syn = sim.StaticSynapse(weight=5.0, delay=0.5)
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(0, 0, 5.0, 0.5),
+                          (1, 1, 5.0, 0.5),
+                          (2, 2, 5.0, 0.5),
+                          (3, 3, 5.0, 0.5),
+                          (4, 4, 5.0, 0.5)])
+
+    @register()
+    def test_connect_with_random_mask(self, sim=sim):
+        csa = connectors.csa
+        cset = csa.random(0.5)
+        C = connectors.CSAConnector(cset)
+        syn = sim.StaticSynapse(weight=5.0, delay=0.5)
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        expected = sorted(((i, j) for i, j in csa.cross((0, 4), (0, 4)) * cset),
+                          key=lambda x: (x[1], x[0]))
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(i, j, 5.0, 0.5) for i, j in expected])
+
+    @register()
+    def test_connect_with_random_weights_over_several_blocks(self, sim=sim):
+        rd_w = random.RandomDistribution('uniform', (0, 1), rng=MockRNG(delta=1.0))
+        C = connectors.CSAConnector(connectors.csa.full - connectors.csa.oneToOne)
+        C.columns_per_block = 2
+        syn = sim.StaticSynapse(weight=rd_w, delay=0.5)
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        expected = [(i, j) for j in range(5) for i in range(5) if i != j]
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(i, j, float(k), 0.5) for k, (i, j) in enumerate(expected)])
+
+    @register()
+    def test_connect_with_connection_set_over_several_blocks(self, sim=sim):
+        csa = connectors.csa
+        cset = csa.cset(csa.full - csa.oneToOne, lambda i, j: i + 10.0 * j, 1.5)
+        C = connectors.CSAConnector(cset)
+        C.columns_per_block = 2
+        syn = sim.StaticSynapse()
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(i, j, i + 10.0 * j, 1.5)
+                          for j in range(5) for i in range(5) if i != j])
+
+
 @register_class()
 class TestCloneConnector(unittest.TestCase):
 
@@ -947,6 +1152,16 @@ class TestCloneConnector(unittest.TestCase):
                           (2, 2, 5.0, 0.5),
                           (2, 3, 5.0, 0.5)])
 
+    @register()
+    def test_connect_with_multapses(self, sim=sim):
+        ref_prj = sim.Projection(self.p1, self.p2,
+                                 connectors.FromListConnector([(1, 2), (1, 2), (0, 2)]),
+                                 sim.StaticSynapse())
+        C = connectors.CloneConnector(ref_prj)
+        prj = sim.Projection(self.p1, self.p2, C, sim.StaticSynapse(weight=2.0))
+        self.assertEqual(prj.get("weight", format='list'),
+                         [(0, 2, 2.0), (1, 2, 2.0), (1, 2, 2.0)])
+
     @register()
     def test_connect_with_pre_post_mismatch(self, sim=sim):
         syn = sim.StaticSynapse()
@@ -963,6 +1178,11 @@ class TestIndexBasedProbabilityConnector(unittest.TestCase):
         def __call__(self, i, j):
             return numpy.array((i + j) % 3 == 0, dtype=float)
 
+    class HalfIndexBasedProbability(connectors.IndexBasedExpression):
+
+        def __call__(self, i, j):
+            return 0.5 * numpy.array((i + j) % 3 == 0, dtype=float)
+
     class IndexBasedWeights(connectors.IndexBasedExpression):
 
         def __call__(self, i, j):
@@ -1026,6 +1246,38 @@ class TestIndexBasedProbabilityConnector(unittest.TestCase):
                           (3, 3, 1., 7),
                           (2, 4, 1., 7)])
 
+    @register()
+    def test_connect_with_worker_processes(self, sim=sim):
+        syn = sim.StaticSynapse(weight=self.IndexBasedWeights(), delay=2)
+        C = connectors.IndexBasedProbabilityConnector(self.IndexBasedProbability(), n_workers=1)
+        prj = sim.Projection(self.p1, self.p2, C, syn)
+        # the probabilities are 0 or 1, so the connections are the same as without workers
+        self.assertEqual(prj.get(["weight", "delay"], format='list'),
+                         [(0, 0, 1., 2),
+                          (3, 0, 1., 2),
+                          (2, 1, 3., 2),
+                          (1, 2, 3., 2),
+                          (4, 2, 9., 2),
+                          (0, 3, 1., 2),
+                          (3, 3, 10., 2),
+                          (2, 4, 9., 2)])
+
+    @register()
+    def test_connections_do_not_depend_on_number_of_workers(self, sim=sim):
+        p = sim.Population(60, sim.IF_cond_exp())
+        connections = []
+        for n_workers in (1, 3):
+            C = connectors.IndexBasedProbabilityConnector(self.HalfIndexBasedProbability(),
+                                                          allow_self_connections='NoMutual',
+                                                          rng=random.NumpyRNG(seed=8327),
+                                                          n_workers=n_workers)
+            C.block_size = 100  # several blocks
+            prj = sim.Projection(p, p, C, sim.StaticSynapse())
+            connections.append(prj.get([], format='list'))
+        self.assertEqual(connections[0], connections[1])
+        self.assertTrue(0 < len(connections[0]) < 60 * 59 / 6)
+        self.assertTrue(all(c[0] > c[1] for c in connections[0]))
+
 
 #TOCHECK, not included
 #class TestDisplacementDependentProbabilityConnector(unittest.TestCase):
@@ -1124,6 +1376,51 @@ class CheckTest(unittest.TestCase):
         self.assertRaises(errors.ConnectionError, connectors.check_delays, 3.0, self.MIN_DELAY, 2.0)
 
 
+@register_class()
+class TestSmallWorldConnector(unittest.TestCase):
+
+    def setUp(self, sim=sim, **extra):
+        sim.setup(num_processes=1, rank=0, min_delay=0.123, **extra)
+        self.p = sim.Population(20, sim.IF_cond_exp(), structure=space.Line())
+
+    def tearDown(self, sim=sim):
+        sim.end()
+
+    @register()
+    def test_connect_without_rewiring(self, sim=sim):
+        C = connectors.SmallWorldConnector(degree=1.5, rewiring=0.0,
+                                           allow_self_connections=False,
+                                           rng=random.NumpyRNG(seed=42))
+        prj = sim.Projection(self.p, self.p, C, sim.StaticSynapse())
+        connections = [c[:2] for c in prj.get([], format='list')]
+        expected = [(i, j) for j in range(20) for i in (j - 1, j + 1) if 0 <= i < 20]
+        self.assertEqual(connections, expected)
+
+    @register()
+    def test_connect_with_n_connections(self, sim=sim):
+        C = connectors.SmallWorldConnector(degree=5.5, rewiring=0.0, n_connections=3,
+                                           allow_self_connections=True,
+                                           rng=random.NumpyRNG(seed=42))
+        prj = sim.Projection(self.p, self.p, C, sim.StaticSynapse())
+        connections = numpy.array([c[:2] for c in prj.get([], format='list')])
+        assert_array_equal(numpy.bincount(connections[:, 0]), 3 * numpy.ones(20))
+        self.assertTrue((abs(connections[:, 0] - connections[:, 1]) <= 2).all())
+
+    @register()
+    def test_connect_with_rewiring(self, sim=sim):
+        C = connectors.SmallWorldConnector(degree=3.5, rewiring=1.0,
+                                           allow_self_connections=False,
+                                           rng=random.NumpyRNG(seed=42))
+        prj = sim.Projection(self.p, self.p, C, sim.StaticSynapse())
+        connections = numpy.array([c[:2] for c in prj.get([], format='list')])
+        self.assertEqual(len(connections), 2 * (3 + 4 + 5) + 14 * 6)
+        self.assertFalse((connections[:, 0] == connections[:, 1]).any())
+        # efferent connections are rewired, so the out-degree is unchanged
+        assert_array_equal(numpy.bincount(connections[:, 0]),
+                           [3, 4, 5] + [6] * 14 + [5, 4, 3])
+        self.assertTrue((abs(connections[:, 0] - connections[:, 1]) > 3).any())
+
+
 @register_class()
 class TestFixedTotalNumberConnector(unittest.TestCase):
 
@@ -1141,6 +1438,90 @@ class TestFixedTotalNumberConnector(unittest.TestCase):
         self.assertEqual(len(connections), 12)
 
 
+
+@register_class()
+class TestConnectivityCache(unittest.TestCase):
+
+    def setUp(self, sim=sim):
+        sim.setup(min_delay=0.123)
+        self.p1 = sim.Population(40, sim.IF_cond_exp(), structure=space.Line())
+        self.p2 = sim.Population(50, sim.HH_cond_exp(), structure=space.Line())
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self, sim=sim):
+        sim.end()
+        shutil.rmtree(self.directory)
+
+    def _connect(self, cache, synapse_type, seed=3872):
+        rng = random.NumpyRNG(seed=seed)
+        C = connectors.FixedProbabilityConnector(0.2, rng=rng)
+        C.cache = cache
+        prj = sim.Projection(self.p1, self.p2, C, synapse_type)
+        return prj, rng
+
+    @register()
+    def test_replay(self, sim=sim):
+        cache = connectors.ConnectivityCache(self.directory)
+        syn = sim.StaticSynapse(weight=0.5, delay="0.2 + 0.1*d")
+        prj1, rng1 = self._connect(cache, syn)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        prj2, rng2 = self._connect(cache, syn)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertEqual(prj2.get(["weight", "delay"], format='list'),
+                         prj1.get(["weight", "delay"], format='list'))
+        # the RNG is left in the same state as after generating the connections
+        self.assertEqual(rng2.next(3, 'uniform', {'low': 0, 'high': 1}).tolist(),
+                         rng1.next(3, 'uniform', {'low': 0, 'high': 1}).tolist())
+        self._connect(cache, syn, seed=3873)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    @register()
+    def test_replay_with_parameters(self, sim=sim):
+        cache = connectors.ConnectivityCache(self.directory, store_parameters=True)
+        weights = random.RandomDistribution('uniform', (0.1, 0.5), rng=random.NumpyRNG(seed=28))
+        prj1, rng1 = self._connect(cache, sim.StaticSynapse(weight=weights))
+        weights = random.RandomDistribution('uniform', (0.1, 0.5), rng=random.NumpyRNG(seed=28))
+        prj2, rng2 = self._connect(cache, sim.StaticSynapse(weight=weights))
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertEqual(prj2.get(["weight", "delay"], format='list'),
+                         prj1.get(["weight", "delay"], format='list'))
+
+    @register()
+    def test_with_replacement_is_part_of_key(self, sim=sim):
+        cache = connectors.ConnectivityCache(self.directory)
+        prjs = []
+        for with_replacement in (True, False):
+            C = connectors.FixedNumberPreConnector(n=4, with_replacement=with_replacement,
+                                                   rng=random.NumpyRNG(seed=1))
+            C.cache = cache
+            prjs.append(sim.Projection(self.p1, self.p2, C, sim.StaticSynapse()))
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertNotEqual(prjs[0]._connectivity_cache_key, prjs[1]._connectivity_cache_key)
+        connections = [c[:2] for c in prjs[1].get([], format='list')]
+        self.assertEqual(len(set(connections)), len(connections))
+
+    def test_not_cached_without_accessible_rng_state(self, sim=sim):
+        cache = connectors.ConnectivityCache(self.directory)
+        C = connectors.FixedProbabilityConnector(0.2, rng=MockRNG(delta=0.1))
+        C.cache = cache
+        sim.Projection(self.p1, self.p2, C, sim.StaticSynapse())
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_eviction_and_invalidation(self, sim=sim):
+        cache = connectors.ConnectivityCache(self.directory)
+        syn = sim.StaticSynapse()
+        prj, rng = self._connect(cache, syn)
+        entry_size = os.path.getsize(os.path.join(self.directory, os.listdir(self.directory)[0]))
+        cache.max_size = 2.5 * entry_size
+        for seed in range(3):
+            self._connect(cache, syn, seed=seed)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        prj, rng = self._connect(cache, syn, seed=2)
+        cache.invalidate(prj)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        cache.invalidate()
+        self.assertEqual(os.listdir(self.directory), [])
+
 if __name__ == "__main__":
     unittest.main()
     
@@ -120,3 +120,23 @@ def test_HDF5ArrayFile():
         h5f.close()
     
         os.remove("tmp.h5")
+
+
+def test_BinaryConnectionFile():
+    bcf = files.BinaryConnectionFile("tmp.connections", "wb")
+    data = [(0, 2, 0.1, 1.5), (1, 0, 0.2, 1.6), (2, 2, 0.3, 1.7), (0, 3, 0.4, 1.8)]
+    metadata = {'columns': ['i', 'j', 'weight', 'delay']}
+    bcf.write(data, metadata)
+    bcf.close()
+    assert files.BinaryConnectionFile.is_binary_connection_file("tmp.connections")
+
+    bcf = files.BinaryConnectionFile("tmp.connections", "rb")
+    assert_equal(bcf.get_metadata(), metadata)
+    sorted_by_target = numpy.array([data[1], data[0], data[2], data[3]])
+    assert_arrays_equal(bcf.read(), sorted_by_target)
+    assert_arrays_equal(numpy.vstack(bcf.read_chunks(3)), sorted_by_target)
+    assert_arrays_equal(numpy.vstack(bcf.read_targets(numpy.array([1, 2, 5]), 1)),
+                        sorted_by_target[1:3])
+    bcf.close()
+
+    os.remove("tmp.connections")
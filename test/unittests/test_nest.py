@@ -4,6 +4,7 @@ try:
 except ImportError:
     nest = False
 from pyNN.standardmodels import StandardCellType
+from pyNN.parameters import Sequence
 try:
     import unittest2 as unittest
 except ImportError:
@@ -80,6 +81,17 @@ class TestPopulation(unittest.TestCase):
     def test_set_parameters_scalar(self):
         self.p[0:1].set(tau_m=20.)
 
+    def test_get_spikes_and_counts(self):
+        spike_times = [[1.0, 3.0], [2.0], [], [4.0, 5.0, 6.0], [0.5]]
+        p = sim.Population(5, sim.SpikeSourceArray(spike_times=[Sequence(t) for t in spike_times]))
+        p.record('spikes')
+        sim.run(10.0)
+        spiketrains = p.get_data().segments[0].spiketrains
+        for st, expected in zip(spiketrains, spike_times):
+            assert_array_almost_equal(st.magnitude, expected)
+        self.assertEqual(p.get_spike_counts(),
+                         dict((int(id), len(t)) for id, t in zip(p, spike_times)))
+
 
 @unittest.skipUnless(nest, "Requires NEST")
 class TestProjection(unittest.TestCase):
@@ -145,6 +157,24 @@ class TestProjection(unittest.TestCase):
         prj.set(weight=weight_array)
         self.assertTrue((weight_array == prj.get("weight", format="array")).all())
 
+    def test_set_heterogeneous_array(self):
+        prj = sim.Projection(self.p1, self.p2, self.random_connect)
+        weight_array = 0.1 + 0.01 * numpy.arange(7 * 4).reshape(prj.shape)
+        prj.set(weight=weight_array)
+        weights = prj.get("weight", format="array")
+        connected = ~numpy.isnan(weights)
+        self.assertEqual(connected.sum(), 7 * 2)
+        numpy.testing.assert_array_almost_equal(weights[connected], weight_array[connected])
+
+    def test_len_and_getitem(self):
+        prj = sim.Projection(self.p1, self.p2, self.random_connect, synapse_type=self.syn_rnd)
+        self.assertEqual(len(prj), 7 * 2)
+        self.assertEqual(prj.connection_table.shape[0], 7 * 2)
+        connection = prj[3]
+        self.assertEqual(connection.source, prj.pre[prj.connection_indices[0][3]])
+        self.assertEqual(connection.target, prj.post[prj.connection_indices[1][3]])
+        self.assertAlmostEqual(connection.weight, 0.123)
+
     def test_single_postsynaptic_neuron(self):
         prj = sim.Projection(self.p1, self.p4, sim.AllToAllConnector(),
                              synapse_type=sim.StaticSynapse(weight=0.123))
@@ -181,5 +211,88 @@ class TestProjection(unittest.TestCase):
         prj.set(weight=weight_array)
         self.assertTrue((weight_array == prj.get("weight", format="array")).all())
 
+
+@unittest.skipUnless(nest, "Requires NEST")
+class TestConnectors(unittest.TestCase):
+
+    def setUp(self):
+        sim.setup()
+        self.p1 = sim.Population(7, sim.IF_cond_exp())
+        self.p2 = sim.Population(4, sim.IF_cond_exp())
+        self.p3 = sim.Population(4, sim.IF_cond_exp())
+        self.native_rng = sim.NativeRNG(seed=8658764)
+
+    def test_one_to_one_rule_params(self):
+        C = sim.OneToOneConnector()
+        prj = sim.Projection(self.p2, self.p3, C)
+        self.assertEqual(C.rule_params(prj), {'rule': 'one_to_one'})
+        self.assertEqual(C.rule_params(sim.Projection(self.p1, self.p2, sim.AllToAllConnector())), None)
+
+    def test_fixed_number_pre_rule_params(self):
+        C = sim.FixedNumberPreConnector(n=3, allow_self_connections=False, rng=self.native_rng)
+        prj = sim.Projection(self.p1, self.p2, C)
+        self.assertEqual(C.rule_params(prj),
+                         {'autapses': False, 'multapses': False,
+                          'rule': 'fixed_indegree', 'indegree': 3})
+        self.assertEqual(len(prj), 3 * self.p2.size)
+
+    def test_fixed_number_post_rule_params(self):
+        C = sim.FixedNumberPostConnector(n=2, with_replacement=True, rng=self.native_rng)
+        prj = sim.Projection(self.p1, self.p2, C)
+        self.assertEqual(C.rule_params(prj),
+                         {'autapses': True, 'multapses': True,
+                          'rule': 'fixed_outdegree', 'outdegree': 2})
+        self.assertEqual(len(prj), 2 * self.p1.size)
+
+    def test_fixed_total_number_rule_params(self):
+        C = sim.FixedTotalNumberConnector(n=10, rng=self.native_rng)
+        prj = sim.Projection(self.p1, self.p2, C)
+        self.assertEqual(C.rule_params(prj),
+                         {'autapses': True, 'multapses': True,
+                          'rule': 'fixed_total_number', 'N': 10})
+        self.assertEqual(len(prj), 10)
+
+    def test_rule_params_with_n_greater_than_population_size(self):
+        prj = sim.Projection(self.p1, self.p2, sim.AllToAllConnector())
+        # without replacement, PyNN's semantics differ from those of NEST
+        self.assertEqual(sim.FixedNumberPreConnector(n=9, rng=self.native_rng).rule_params(prj), None)
+        self.assertEqual(sim.FixedNumberPostConnector(n=5, rng=self.native_rng).rule_params(prj), None)
+        self.assertEqual(sim.FixedTotalNumberConnector(n=29, with_replacement=False,
+                                                       rng=self.native_rng).rule_params(prj), None)
+        self.assertEqual(sim.FixedNumberPreConnector(n=9, with_replacement=True,
+                                                     rng=self.native_rng).rule_params(prj)['indegree'], 9)
+        C = sim.FixedNumberPreConnector(n=9, rng=self.native_rng)
+        prj = sim.Projection(self.p1, self.p2, C)
+        self.assertEqual(len(prj), 9 * self.p2.size)
+
+    def test_native_connect_possible(self):
+        prj = sim.Projection(self.p1, self.p2, sim.AllToAllConnector())
+        # without NEST's RNGs, PyNN's own connection algorithm is used
+        self.assertFalse(sim.FixedNumberPreConnector(n=3).native_connect_possible(prj))
+        self.assertTrue(sim.FixedNumberPreConnector(n=3, rng=self.native_rng).native_connect_possible(prj))
+        # configurations that cannot be expressed as a NEST connection rule
+        n = sim.RandomDistribution('binomial', (4, 0.5), rng=sim.NumpyRNG(seed=9274))
+        C = sim.FixedNumberPreConnector(n=n, rng=self.native_rng)
+        self.assertEqual(C.rule_params(prj), None)
+        self.assertFalse(C.native_connect_possible(prj))
+        C = sim.FixedProbabilityConnector(0.5, allow_self_connections='NoMutual', rng=self.native_rng)
+        self.assertEqual(C.rule_params(prj), None)
+        self.assertFalse(C.native_connect_possible(prj))
+        # random synaptic parameters drawn by PyNN
+        syn = sim.StaticSynapse(weight=sim.RandomDistribution('uniform', (0.1, 0.2),
+                                                              rng=sim.NumpyRNG(seed=9274)))
+        prj = sim.Projection(self.p1, self.p2, sim.AllToAllConnector(), syn)
+        self.assertFalse(sim.FixedNumberPreConnector(n=3, rng=self.native_rng).native_connect_possible(prj))
+
+    def test_python_connect_replaces_native_rng(self):
+        C = sim.FixedProbabilityConnector(0.5, allow_self_connections='NoMutual', rng=self.native_rng)
+        with self.assertLogs('PyNN', level='WARNING') as logs:
+            prj = sim.Projection(self.p2, self.p2, C)
+        self.assertTrue(any("Using a NumpyRNG instead" in line for line in logs.output))
+        self.assertIs(C.rng, self.native_rng)
+        for i, j, weight in prj.get("weight", format='list'):
+            self.assertGreater(i, j)
+
+
 if __name__ == '__main__':
     unittest.main()
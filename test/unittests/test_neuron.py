@@ -347,6 +347,24 @@ class TestProjection(unittest.TestCase):
         prj = sim.Projection(self.p1, self.p2, self.all2all,
                              synapse_type=sim.TsodyksMarkramSynapse())
 
+    def test_static_connections_are_stored_as_columns(self):
+        prj = sim.Projection(self.p1, self.p2, self.random_connect, self.syn1)
+        self.assertEqual(len(prj), 7 * 2)
+        presynaptic_indices, postsynaptic_indices = prj.connection_indices
+        self.assertEqual(presynaptic_indices.size, 7 * 2)
+        connection = prj[3]
+        self.assertEqual(connection.presynaptic_index, presynaptic_indices[3])
+        self.assertEqual(connection.postsynaptic_index, postsynaptic_indices[3])
+        self.assertAlmostEqual(connection.weight, 0.123)
+
+    def test_set_heterogeneous_weights(self):
+        prj = sim.Projection(self.p1, self.p2, self.random_connect, self.syn1)
+        weight_array = 0.1 + 0.01 * numpy.arange(7 * 4).reshape(prj.shape)
+        prj.set(weight=weight_array)
+        weights = prj.get("weight", format="array")
+        connected = ~numpy.isnan(weights)
+        assert_array_almost_equal(weights[connected], weight_array[connected])
+
 
 @unittest.skipUnless(sim, "Requires NEURON")
 class TestCurrentSources(unittest.TestCase):
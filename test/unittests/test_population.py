@@ -15,6 +15,7 @@ try:
 except NameError:
     basestring = str
 import numpy
+import os
 import sys
 from numpy.testing import assert_array_equal, assert_array_almost_equal
 import quantities as pq
@@ -522,7 +523,52 @@ class PopulationTest(unittest.TestCase):
         self.assertEqual(w.shape, (num_points, p.size))
         self.assertEqual(v.t_start, 0.0)
         self.assertEqual(len(seg1.spiketrains), p.size)
-            
+
+    @register(exclude=['hardware.brainscales'])
+    def test_get_data_with_stream(self, sim=sim):
+        t1 = 12.3
+        t2 = 13.4
+        t3 = 14.5
+        filename = "test_get_data_with_stream.pkl"
+        p = sim.Population(14, sim.EIF_cond_exp_isfa_ista())
+        p.record('v', stream_to=filename, flush_interval=5.0)
+        sim.run(t1)
+        sim.run(t2)
+        self.assertGreater(len(list(p.recorder.stream_to)), 4)
+        sim.reset()
+        sim.run(t3)
+        data = p.get_data()
+        self.assertEqual(len(data.segments), 2)
+        v0 = data.segments[0].analogsignalarrays[0]
+        self.assertEqual(v0.shape, (int(round((t1 + t2) / sim.get_time_step())) + 1, p.size))
+        self.assertEqual(v0.t_start, 0.0 * pq.ms)
+        v1 = data.segments[1].analogsignalarrays[0]
+        self.assertEqual(v1.shape, (int(round(t3 / sim.get_time_step())) + 1, p.size))
+        os.remove(filename)
+
+    @register(exclude=['hardware.brainscales'])
+    def test_get_data_as_arrays(self, sim=sim):
+        p = sim.Population(14, sim.EIF_cond_exp_isfa_ista())
+        p.record('v')
+        sim.run(12.3)
+        sim.reset()
+        p[3:7].record('spikes')
+        sim.run(14.5)
+        data = p.get_data(format='arrays')
+        self.assertEqual(len(data), 2)
+        self.assertEqual(set(data[0].keys()), set(['v']))
+        v = data[0]['v']
+        self.assertEqual(v['values'].shape, (int(round(12.3 / sim.get_time_step())) + 1, p.size))
+        assert_array_almost_equal(v['times'], numpy.arange(v['values'].shape[0]) * sim.get_time_step())
+        assert_array_equal(v['index'], numpy.arange(p.size))
+        spikes = data[1]['spikes']
+        block = p.get_data('spikes')
+        expected = sorted((st.annotations['source_index'], t)
+                          for st in block.segments[1].spiketrains for t in st.magnitude)
+        assert_array_equal(spikes['index'], [i for i, t in expected])
+        assert_array_almost_equal(numpy.sort(spikes['times']), sorted(t for i, t in expected))
+        self.assertRaises(ValueError, p.get_data, format='csv')
+
     @register(exclude=['nest', 'neuron', 'brian', 'hardware.brainscales', 'spiNNaker'])
     def test_get_spikes_with_gather(self, sim=sim):
         t1 = 12.3
@@ -11,6 +11,7 @@ try:
 except ImportError:
     import unittest
 import numpy
+import os
 import sys
 from numpy.testing import assert_array_equal, assert_array_almost_equal
 import quantities as pq
@@ -542,6 +543,48 @@ class PopulationViewTest(unittest.TestCase):
         assert_array_equal(seg1.spiketrains[2],
                         numpy.array([p.first_id + 6, p.first_id + 6 + 5]) % t3)
 
+    @register(exclude=['hardware.brainscales'])
+    def test_get_data_with_stream(self, sim=sim):
+        filename = "test_populationview_get_data_with_stream.pkl"
+        p = sim.Population(10, sim.EIF_cond_exp_isfa_ista())
+        p.record('v', stream_to=filename, flush_interval=5.0)
+        sim.run(12.3)
+        pv = p[2:5]
+        data = pv.get_data()
+        self.assertEqual(len(data.segments), 1)
+        v = data.segments[0].analogsignalarrays[0]
+        self.assertEqual(v.shape, (int(round(12.3 / sim.get_time_step())) + 1, pv.size))
+        assert_array_equal(v.channel_index, [2, 3, 4])
+        assert_array_equal(v.annotations['source_ids'], pv.all_cells.astype(int))
+        os.remove(filename)
+
+    @register(exclude=['hardware.brainscales'])
+    def test_get_data_as_arrays_from_cache(self, sim=sim):
+        p = sim.Population(10, sim.EIF_cond_exp_isfa_ista())
+        p.record('v')
+        sim.run(12.3)
+        sim.reset()
+        pv = p[2:5]
+        data = pv.get_data(format='arrays')
+        self.assertEqual(len(data), 1)
+        v = data[0]['v']
+        self.assertEqual(v['values'].shape, (int(round(12.3 / sim.get_time_step())) + 1, pv.size))
+        assert_array_equal(v['index'], [2, 3, 4])
+
+    @register(exclude=['hardware.brainscales'])
+    def test_get_data_as_arrays_with_stream(self, sim=sim):
+        filename = "test_populationview_get_data_as_arrays_with_stream.pkl"
+        p = sim.Population(10, sim.EIF_cond_exp_isfa_ista())
+        p.record('v', stream_to=filename, flush_interval=5.0)
+        sim.run(12.3)
+        pv = p[2:5]
+        data = pv.get_data(format='arrays')
+        self.assertEqual(len(data), 1)
+        v = data[0]['v']
+        self.assertEqual(v['values'].shape, (int(round(12.3 / sim.get_time_step())) + 1, pv.size))
+        assert_array_equal(v['index'], [2, 3, 4])
+        os.remove(filename)
+
     #def test_get_data_no_gather(self, sim=sim):
     #    self.fail()
 
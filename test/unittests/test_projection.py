@@ -23,6 +23,11 @@ try:
     basestring
 except NameError:
     basestring = str
+try:
+    import scipy.sparse
+    have_scipy = True
+except ImportError:
+    have_scipy = False
 from .mocks import MockRNG
 import pyNN.mock as sim
 
@@ -177,16 +182,73 @@ class ProjectionTest(unittest.TestCase):
     def test_get_weights_as_array_with_multapses(self, sim=sim):
         C = sim.FixedNumberPreConnector(n=7, rng=MockRNG(delta=1))
         prj = sim.Projection(self.p2, self.p3, C, synapse_type=self.syn1)
-        # because we use a fake RNG, it is always the last three presynaptic cells which receive the double connection
+        # because we use a fake RNG, the presynaptic cell which does not receive the double
+        # connection is cell 0 for the first postsynaptic cell, cell 1 for the second, etc.
         target = numpy.array([
-            [0.006, 0.006, 0.006, 0.006, 0.006],
-            [0.012, 0.012, 0.012, 0.012, 0.012],
-            [0.012, 0.012, 0.012, 0.012, 0.012],
-            [0.012, 0.012, 0.012, 0.012, 0.012],
+            [0.006, 0.012, 0.012, 0.012, 0.006],
+            [0.012, 0.006, 0.012, 0.012, 0.012],
+            [0.012, 0.012, 0.006, 0.012, 0.012],
+            [0.012, 0.012, 0.012, 0.006, 0.012],
             ])
         weights = prj.get("weight", format="array", gather=False)  # use gather False because we are faking the MPI
         assert_array_equal(weights, target)
 
+    @register()
+    def test_get_multiple_attributes_as_array_with_missing_connections(self, sim=sim):
+        prj = sim.Projection(self.p2, self.p2, sim.OneToOneConnector(), synapse_type=self.syn1)
+        weights, delays = prj.get(["weight", "delay"], format="array", gather=False)
+        target = numpy.nan * numpy.ones((4, 4))
+        numpy.fill_diagonal(target, 0.006)
+        assert_array_equal(weights, target)
+        numpy.fill_diagonal(target, 0.5)
+        assert_array_equal(delays, target)
+
+    @register()
+    @unittest.skipUnless(have_scipy, "Requires scipy")
+    def test_get_weights_as_sparse_matrix_with_multapses(self, sim=sim):
+        C = sim.FixedNumberPreConnector(n=7, rng=MockRNG(delta=1))
+        prj = sim.Projection(self.p2, self.p3, C, synapse_type=self.syn1)
+        weights = prj.get("weight", format="sparse", gather=False)
+        self.assertEqual(weights.shape, (4, 5))
+        self.assertEqual(weights.nnz, 20)
+        assert_array_equal(weights.toarray(),
+                           numpy.nan_to_num(prj.get("weight", format="array", gather=False)))
+
+    @register()
+    def test_get_attributes_as_columns(self, sim=sim):
+        prj = sim.Projection(self.p2, self.p2, sim.OneToOneConnector(), synapse_type=self.syn1)
+        columns = prj.get(["weight", "delay"], format="columns", gather=False)
+        self.assertEqual(set(columns),
+                         set(["presynaptic_index", "postsynaptic_index", "weight", "delay"]))
+        order = numpy.argsort(columns["postsynaptic_index"])
+        assert_array_equal(columns["presynaptic_index"][order], numpy.arange(4))
+        assert_array_equal(columns["postsynaptic_index"][order], numpy.arange(4))
+        assert_array_equal(columns["weight"], 0.006 * numpy.ones((4,)))
+        assert_array_equal(columns["delay"], 0.5 * numpy.ones((4,)))
+        columns = prj.get("weight", format="columns", gather=False, with_address=False)
+        self.assertEqual(list(columns), ["weight"])
+
+    @register()
+    def test_set_weights_with_array(self, sim=sim):
+        prj = sim.Projection(self.p2, self.p3, self.random_connect, synapse_type=self.syn1)
+        weight_array = 0.001 * numpy.arange(4 * 5).reshape(prj.shape)
+        prj.set(weight=weight_array)
+        weights = prj.get("weight", format="array", gather=False)
+        connected = ~numpy.isnan(weights)
+        self.assertEqual(connected.sum(), 4 * 2)
+        assert_array_equal(weights[connected], weight_array[connected])
+
+    @register()
+    def test_getitem(self, sim=sim):
+        prj = sim.Projection(self.p2, self.p3, self.all2all, synapse_type=self.syn1)
+        connection = prj[6]
+        self.assertEqual((connection.presynaptic_index, connection.postsynaptic_index), (2, 1))
+        self.assertEqual(connection.WEIGHT, 0.006)  # the mock backend uses upper-case native names
+        connection.WEIGHT = 0.007
+        self.assertEqual(prj.get("weight", format="list")[6], (2, 1, 0.007))
+        self.assertEqual(len(prj[2:5]), 3)
+        self.assertRaises(IndexError, prj.__getitem__, 20)
+
     @register()
     def test_synapse_with_lambda_parameter(self, sim=sim):
         syn = sim.StaticSynapse(weight=lambda d: 0.01 + 0.001 * d)
@@ -287,3 +349,21 @@ class ProjectionTest(unittest.TestCase):
         n, bins = prj.weightHistogram(min=0.0, max=0.05)
         assert_array_equal(bins, numpy.linspace(0, 0.05, num=11))
         assert_array_equal(n, numpy.array([0, 0, prj.size(), 0, 0, 0, 0, 0, 0, 0]))
+
+    @register()
+    def test_summarize(self, sim=sim):
+        prj = sim.Projection(self.p1, self.p2, connector=self.all2all,
+                             synapse_type=self.syn2)
+        prj.set(weight=numpy.arange(28, dtype=float) / 1000.0)
+        weights = numpy.array(prj.get('weight', format='list', with_address=False))
+        summary = prj.summarize('weight')
+        self.assertEqual(set(summary.keys()), set(['mean', 'std', 'min', 'max', 'hist']))
+        self.assertAlmostEqual(summary['mean'], weights.mean())
+        self.assertAlmostEqual(summary['std'], weights.std())
+        self.assertAlmostEqual(summary['min'], 0.0)
+        self.assertAlmostEqual(summary['max'], 0.027)
+        n, bins = summary['hist']
+        assert_array_equal(n, numpy.histogram(weights, bins=10)[0])
+        self.assertEqual(prj.summarize('delay', stats=('count', 'max')),
+                         {'count': 28, 'max': 0.4})
+        self.assertRaises(ValueError, prj.summarize, 'weight', stats=('median',))
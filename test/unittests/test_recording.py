@@ -7,6 +7,7 @@ except ImportError:
 import numpy
 import os
 from datetime import datetime
+import quantities as pq
 from collections import defaultdict
 from pyNN.utility import assert_arrays_equal
 
@@ -194,3 +195,179 @@ def test_metadata_property():
 
 #def test_count__other():
 
+
+
+def test_DataCache_store():
+    import neo
+    cache = recording.DataCache()
+    segment = neo.Segment(name="segment000", rec_datetime=datetime.now())
+    cache.store(segment)
+    cache.store(segment)
+    assert_equal(len(cache), 1)
+    cache.clear()
+    assert_equal(list(cache), [])
+
+
+def test_DiskDataCache():
+    import neo
+    cache = recording.DiskDataCache(max_in_memory=1)
+    segments = [neo.Segment(name="segment%03d" % i, rec_datetime=datetime.now())
+                for i in range(3)]
+    for segment in segments:
+        segment.analogsignalarrays.append(
+            neo.AnalogSignalArray(numpy.arange(6.0).reshape((3, 2)), units='mV',
+                                  sampling_period=0.1 * pq.ms, name='v'))
+        cache.store(segment)
+    cache.store(segments[-1])
+    assert_equal(len(cache), 3)
+    assert_equal(len(os.listdir(cache.directory)), 3)
+    assert_equal(len(cache._working_set), 1)
+    assert_equal([segment.name for segment in cache],
+                 ["segment000", "segment001", "segment002"])
+    assert_arrays_equal(list(cache)[0].analogsignalarrays[0].magnitude,
+                        numpy.arange(6.0).reshape((3, 2)))
+    cache.clear()
+    assert_equal(os.listdir(cache.directory), [])
+    directory = cache.directory
+    del cache
+    assert not os.path.exists(directory)
+
+
+def test_DiskDataCache_with_directory():
+    import neo
+    import shutil
+    import tempfile
+    directory = tempfile.mkdtemp()
+    try:
+        cache = recording.DiskDataCache(directory=directory)
+        cache.store(neo.Segment(name="segment000", rec_datetime=datetime.now()))
+        del cache
+        # the data are kept when the cache is garbage-collected
+        assert_equal(len(os.listdir(directory)), 1)
+    finally:
+        shutil.rmtree(directory)
+    # at interpreter shutdown, modules may already have been torn down
+    cache = recording.DiskDataCache()
+    orig_shutil = recording.shutil
+    recording.shutil = None
+    try:
+        cache.__del__()
+    finally:
+        recording.shutil = orig_shutil
+    shutil.rmtree(cache.directory)
+
+
+def test_gather_columns_agrees_on_types():
+
+    class MockComm(object):
+        rank = 0
+        size = 2
+
+        def __init__(self, other_node_info):
+            self.other_node_info = other_node_info
+            self.types = []
+
+        def allgather(self, x):
+            return [x, self.other_node_info]
+
+        def Gatherv(self, sendbuf, recvbuf, root=0):
+            self.types.append(sendbuf[2])
+            recvbuf[0][:sendbuf[1]] = sendbuf[0]
+
+    mpi_flags = {'INT': 'INT', 'INT64': 'INT64', 'DOUBLE': 'DOUBLE'}
+    columns = [numpy.array([2**31, 3]), numpy.array([1, 2]), numpy.array([0.5, 1.5])]
+    orig_get_mpi_comm = recording.get_mpi_comm
+    try:
+        # the other node has no data, and returns empty float columns
+        comm = MockComm((0, [(False, False, 0)] * 3))
+        recording.get_mpi_comm = lambda: (comm, mpi_flags)
+        gathered = recording.gather_columns(columns)
+        assert_equal(comm.types, ['INT64', 'INT', 'DOUBLE'])
+        assert_arrays_equal(gathered[0], numpy.array([2**31, 3]))
+        assert_equal(gathered[0].dtype, numpy.int64)
+        # the other node has float data for the first column
+        comm = MockComm((1, [(False, True, 0), (True, True, 7), (False, True, 0)]))
+        recording.get_mpi_comm = lambda: (comm, mpi_flags)
+        recording.gather_columns(columns)
+        assert_equal(comm.types, ['DOUBLE', 'INT', 'DOUBLE'])
+    finally:
+        recording.get_mpi_comm = orig_get_mpi_comm
+
+
+def test_gather_blocks_single_node():
+    import neo
+
+    class MockComm(object):
+        rank = 0
+        size = 1
+
+        def allgather(self, x):
+            return [x]
+
+    orig_get_mpi_comm = recording.get_mpi_comm
+    orig_gather_columns = recording.gather_columns
+    recording.get_mpi_comm = lambda: (MockComm(), {})
+    recording.gather_columns = lambda columns, all=False: columns
+    try:
+        segment = neo.Segment(name="segment000", rec_datetime=datetime.now())
+        segment.spiketrains = [
+            neo.SpikeTrain(times, t_start=0.0, t_stop=10.0, units='ms',
+                           source_population="p", source_id=id, source_index=id - 100)
+            for id, times in ((103, [2.0, 5.0]), (101, []), (102, [7.5]))]
+        segment.analogsignalarrays.append(
+            neo.AnalogSignalArray(numpy.arange(12.0).reshape((4, 3)), units='mV',
+                                  t_start=0.0 * pq.ms, sampling_period=0.1 * pq.ms, name='v',
+                                  channel_index=numpy.array([2, 0, 1]),
+                                  source_population="p",
+                                  source_ids=numpy.array([102, 100, 101])))
+        block = neo.Block(name="p")
+        block.segments.append(segment)
+        gathered = recording.gather_blocks(block)
+        assert_equal(gathered.name, "p")
+        spiketrains = gathered.segments[0].spiketrains
+        assert_equal([st.annotations['source_id'] for st in spiketrains], [101, 102, 103])
+        assert_arrays_equal(spiketrains[2].magnitude, numpy.array([2.0, 5.0]))
+        assert_equal(spiketrains[0].size, 0)
+        assert_equal(spiketrains[1].t_stop, 10.0 * pq.ms)
+        v = gathered.segments[0].analogsignalarrays[0]
+        assert_arrays_equal(v.channel_index, numpy.array([0, 1, 2]))
+        assert_arrays_equal(v.annotations['source_ids'], numpy.array([100, 101, 102]))
+        assert_arrays_equal(v.magnitude, numpy.arange(12.0).reshape((4, 3))[:, [1, 2, 0]])
+        assert_equal(v.units, pq.mV)
+        assert_equal(v.sampling_period, 0.1 * pq.ms)
+    finally:
+        recording.get_mpi_comm = orig_get_mpi_comm
+        recording.gather_columns = orig_gather_columns
+
+
+def test_gather_arrays_with_variables_missing_on_this_node():
+    # the other node has recorded 'v', this one only spikes
+
+    class MockComm(object):
+        rank = 1
+        size = 2
+
+        def allgather(self, x):
+            return [['spikes', 'v'], x]
+
+    gathered_columns = []
+
+    def mock_gather_columns(columns, all=False):
+        gathered_columns.append(columns)
+        return columns
+
+    orig_get_mpi_comm = recording.get_mpi_comm
+    orig_gather_columns = recording.gather_columns
+    recording.get_mpi_comm = lambda: (MockComm(), {})
+    recording.gather_columns = mock_gather_columns
+    try:
+        data = {'spikes': {'index': numpy.array([3, 3]), 'times': numpy.array([1.5, 7.0])}}
+        gathered = recording.gather_arrays(data)
+        assert_equal(sorted(gathered.keys()), ['spikes', 'v'])
+        assert_equal(len(gathered_columns), 4)
+        assert_arrays_equal(gathered['spikes']['times'], numpy.array([1.5, 7.0]))
+        assert_equal(gathered['v']['index'].size, 0)
+        assert_equal(gathered['v']['values'].shape, (0, 0))
+    finally:
+        recording.get_mpi_comm = orig_get_mpi_comm
+        recording.gather_columns = orig_gather_columns
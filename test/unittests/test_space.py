@@ -94,6 +94,33 @@ class SpaceTest(unittest.TestCase):
                                          (sqrt(3), sqrt(12), 0.0, sqrt(50.0)),
                                          (sqrt(29), sqrt(14), sqrt(50.0), 0.0)]))
 
+    def test_generator_with_paired_indices(self):
+        s = space.Space()
+        f = lambda i: self.ABCD[i]
+        g = lambda j: self.ABCD[j]
+        self.assertArraysEqual(s.distance_generator(f, g)(numpy.array([0, 1, 3]), numpy.array([1, 2, 2])),
+                               numpy.array([sqrt(3), sqrt(12), sqrt(50.0)]))
+
+    def test_paired_distances_with_periodic_boundaries(self):
+        s = space.Space(periodic_boundaries=((-1, 4), (-1, 4), (-1, 4)))
+        assert_arrays_equal(s.paired_distances(self.ABCD, self.ABCD[::-1]),
+                            numpy.array([3.0, sqrt(12), sqrt(12), 3.0]))
+
+    def test_pairs_within_distance(self):
+        numpy.random.seed(2847)
+        A = numpy.random.uniform(0, 10, size=(50, 3))
+        B = numpy.random.uniform(0, 10, size=(40, 3))
+        for s in (space.Space(), space.Space(axes='xy'),
+                  space.Space(periodic_boundaries=((0, 10), None, (0, 10)))):
+            D = s.distances(A, B).reshape(50, 40)
+            pairs = list(s.pairs_within_distance(A, B, 3.0, block_size=15))
+            self.assertEqual(len(pairs), 3)
+            i, j, d = (numpy.hstack(x) for x in zip(*pairs))
+            expected_j, expected_i = numpy.nonzero(D.T <= 3.0)
+            assert_arrays_equal(i, expected_i)
+            assert_arrays_equal(j, expected_j)
+            assert_arrays_almost_equal(d, D[expected_i, expected_j], 1e-12)
+
     def test_infinite_space_with_collapsed_axes(self):
         s_x = space.Space(axes='x')
         s_xy = space.Space(axes='xy')
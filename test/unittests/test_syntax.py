@@ -0,0 +1,20 @@
+"""
+Check that all modules in the pyNN package compile, including the backends
+whose simulators are not installed, and whose other tests are therefore skipped.
+
+:copyright: Copyright 2006-2016 by the PyNN team, see AUTHORS.
+:license: CeCILL, see LICENSE for details.
+"""
+
+import os
+import pyNN
+
+
+def test_all_modules_compile():
+    package_dir = os.path.dirname(pyNN.__file__)
+    for dirpath, dirnames, filenames in os.walk(package_dir):
+        for filename in filenames:
+            if filename.endswith(".py"):
+                path = os.path.join(dirpath, filename)
+                with open(path, 'rb') as f:
+                    compile(f.read(), path, 'exec')  # raises SyntaxError if invalid